@@ -37,15 +37,18 @@ export interface PaginationOptions {
   limit?: number
   sortBy?: 'created_at' | 'updated_at' | 'bytes'
   sortOrder?: 'asc' | 'desc'
+  mode?: 'offset' | 'cursor' // 'cursor' : pagination keyset via nextCursor
+  cursor?: string
 }
 
 export interface AssetsResponse {
   assets: Asset[]
-  total: number
+  total: number | null // null sur les pages keyset suivantes
   page: number
-  totalPages: number
+  totalPages: number | null
   hasNext: boolean
   hasPrev: boolean
+  nextCursor: string | null
 }
 
 export interface UpdateAssetData {
@@ -79,6 +82,8 @@ export function useAssetsQuery(
       if (pagination.value.limit) params.set('limit', pagination.value.limit.toString())
       if (pagination.value.sortBy) params.set('sortBy', pagination.value.sortBy)
       if (pagination.value.sortOrder) params.set('sortOrder', pagination.value.sortOrder)
+      if (pagination.value.mode) params.set('mode', pagination.value.mode)
+      if (pagination.value.cursor) params.set('cursor', pagination.value.cursor)
 
       const response = await $fetch<{
         success: boolean
@@ -221,12 +226,13 @@ export function useUploadAssetMutation() {
       }
     }): Promise<Asset> => {
       const formData = new FormData()
-      formData.append('file', file)
 
+      // Métadonnées avant le fichier : le serveur les lit avant de streamer le fichier vers Cloudinary
       if (metadata?.alt_text) formData.append('alt_text', metadata.alt_text)
       if (metadata?.caption) formData.append('caption', metadata.caption)
       if (metadata?.folder) formData.append('folder', metadata.folder)
       if (metadata?.tags) formData.append('tags', JSON.stringify(metadata.tags))
+      formData.append('file', file)
 
       const response = await $fetch<{
         success: boolean
@@ -11,6 +11,12 @@ import type {
   BundleCalculation,
   BundlePricing
 } from '../types/domain/Bundle'
+import {
+  applyBundleLineChange,
+  bundleLineSubtotal,
+  computeBundleTotals,
+  type BundleTotals
+} from '@ns2po/pricing'
 import { calculateBundleFromProducts } from '../utils/BundleAdapter'
 
 /**
@@ -22,20 +28,8 @@ export function useBundleCalculations(
 ) {
   const productsRef = isRef(products) ? products : ref(products)
 
-  // 🧮 Core Calculations (Reactive)
-  const calculations = computed((): BundleCalculation => {
-    if (!productsRef.value || productsRef.value.length === 0) {
-      return {
-        originalTotal: 0,
-        estimatedTotal: 0,
-        savings: 0,
-        discountPercentage: 0,
-        totalProducts: 0
-      }
-    }
-
-    return calculateBundleFromProducts(productsRef.value)
-  })
+  // 🧮 Core Calculations (Reactive) - une seule passe sur les produits via le moteur de tarification
+  const calculations = computed((): BundleTotals => computeBundleTotals(productsRef.value || []))
 
   // 💰 Financial Metrics
   const originalTotal = computed(() => calculations.value.originalTotal)
@@ -45,9 +39,7 @@ export function useBundleCalculations(
   const totalProducts = computed(() => calculations.value.totalProducts)
 
   // 📊 Additional Metrics
-  const totalQuantity = computed(() =>
-    productsRef.value.reduce((sum, product) => sum + product.quantity, 0)
-  )
+  const totalQuantity = computed(() => calculations.value.totalQuantity)
 
   const averageProductPrice = computed(() => {
     const products = productsRef.value
@@ -151,30 +143,27 @@ export function useBundleCalculations(
     return recs
   })
 
-  // 🔄 Dynamic Calculations
-  const calculateWithNewProduct = (newProduct: Omit<BundleProduct, 'id'>) => {
-    const tempProduct: BundleProduct = {
-      id: `temp-${Date.now()}`,
-      ...newProduct
-    }
-
-    const newProducts = [...productsRef.value, tempProduct]
-    return calculateBundleFromProducts(newProducts)
+  // 🔄 Dynamic Calculations - incrémentales : seule la ligne concernée est recalculée
+  const calculateWithNewProduct = (newProduct: Omit<BundleProduct, 'id'>): BundleCalculation => {
+    return applyBundleLineChange(calculations.value, null, newProduct)
   }
 
-  const calculateWithUpdatedQuantity = (productId: string, newQuantity: number) => {
-    const updatedProducts = productsRef.value.map(product =>
-      product.id === productId
-        ? { ...product, quantity: newQuantity, subtotal: product.basePrice * newQuantity }
-        : product
-    )
+  const calculateWithUpdatedQuantity = (productId: string, newQuantity: number): BundleCalculation => {
+    const product = productsRef.value.find(p => p.id === productId)
+    if (!product) return calculations.value
 
-    return calculateBundleFromProducts(updatedProducts)
+    return applyBundleLineChange(calculations.value, product, {
+      basePrice: product.basePrice,
+      quantity: newQuantity,
+      subtotal: bundleLineSubtotal(product.basePrice, newQuantity)
+    })
   }
 
-  const calculateWithRemovedProduct = (productId: string) => {
-    const filteredProducts = productsRef.value.filter(product => product.id !== productId)
-    return calculateBundleFromProducts(filteredProducts)
+  const calculateWithRemovedProduct = (productId: string): BundleCalculation => {
+    const product = productsRef.value.find(p => p.id === productId)
+    if (!product) return calculations.value
+
+    return applyBundleLineChange(calculations.value, product, null)
   }
 
   // 💼 Business Logic Helpers
@@ -273,7 +262,7 @@ export function useBundleCalculations(
     updateProductQuantity: (productId: string, quantity: number) => {
       productsRef.value = productsRef.value.map(product =>
         product.id === productId
-          ? { ...product, quantity, subtotal: product.basePrice * quantity }
+          ? { ...product, quantity, subtotal: bundleLineSubtotal(product.basePrice, quantity) }
           : product
       )
     }
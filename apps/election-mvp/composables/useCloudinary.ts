@@ -45,9 +45,9 @@ export const useCloudinary = () => {
       }, 200)
 
       const formData = new FormData()
-      formData.append('file', file)
       formData.append('preset', preset)
       formData.append('folder', folder)
+      formData.append('file', file) // En dernier : upload streamé côté serveur
 
       const response = await $fetch<{
         success: boolean
@@ -15,8 +15,14 @@ import type {
   QuoteCalculatorOptions,
   QuoteCalculatorResult,
   ValidationError,
-  VolumeDiscount,
 } from "@ns2po/types";
+import {
+  DEFAULT_CUSTOMER_TYPE_DISCOUNTS,
+  DEFAULT_VOLUME_DISCOUNTS,
+  QuoteBatch,
+  createPricingEngine,
+  getPricingEngine,
+} from "@ns2po/pricing";
 
 // Fonction d'observabilité pour les devtools
 const logToConsole = (
@@ -60,22 +66,31 @@ export const useQuoteCalculator = (
     locale: "fr-CI",
     roundingPrecision: 0, // Pas de décimales pour le FCFA
     discountRules: {
-      volumeDiscounts: [
-        { minQuantity: 50, maxQuantity: 99, discountPercentage: 5 },
-        { minQuantity: 100, maxQuantity: 249, discountPercentage: 10 },
-        { minQuantity: 250, maxQuantity: 499, discountPercentage: 15 },
-        { minQuantity: 500, discountPercentage: 20 },
-      ],
+      volumeDiscounts: DEFAULT_VOLUME_DISCOUNTS,
       seasonalDiscounts: [],
-      customerTypeDiscounts: [
-        { customerType: "party", discountPercentage: 12 },
-        { customerType: "organization", discountPercentage: 8 },
-      ],
+      customerTypeDiscounts: DEFAULT_CUSTOMER_TYPE_DISCOUNTS,
     },
   };
 
   const config = { ...defaultConfig, ...options };
 
+  // Moteur partagé (mémoïsation commune) sauf configuration tarifaire spécifique
+  const engine =
+    options.taxRate === undefined &&
+    options.discountRules === undefined &&
+    options.roundingPrecision === undefined
+      ? getPricingEngine()
+      : createPricingEngine({
+          taxRate: config.taxRate,
+          roundingPrecision: config.roundingPrecision,
+          volumeDiscounts: config.discountRules?.volumeDiscounts || [],
+          customerTypeDiscounts:
+            config.discountRules?.customerTypeDiscounts || [],
+        });
+
+  // Colonnes réutilisées d'un calcul à l'autre
+  const batch = new QuoteBatch();
+
   // État réactif
   const isCalculating = ref(false);
   const lastCalculation = ref<QuoteCalculation | null>(null);
@@ -98,49 +113,55 @@ export const useQuoteCalculator = (
         throw new Error("Erreurs de validation dans la demande de devis");
       }
 
-      // Calcul des items
-      const calculatedItems: CalculatedItem[] = [];
-      let subtotal = 0;
-
-      for (const item of quoteRequest.items || []) {
-        const calculatedItem = await calculateItem(item);
-        calculatedItems.push(calculatedItem);
-        subtotal += calculatedItem.totalPrice;
+      // Calcul des items en un seul passage sur les colonnes du batch
+      const items = quoteRequest.items || [];
+      batch.reset();
+      for (const item of items) {
+        batch.push(
+          item.product.basePrice,
+          item.quantity,
+          sumCustomizations(item.customizations)
+        );
       }
-
-      // Application des remises
-      const discounts = calculateDiscounts(
-        calculatedItems,
+      const { subtotal, totalQuantity } = engine.evaluateBatch(batch);
+
+      const calculatedItems: CalculatedItem[] = items.map((item, index) => ({
+        id: item.id,
+        productId: item.productId,
+        quantity: item.quantity,
+        basePrice: roundAmount(item.product.basePrice),
+        customizationsCost: roundAmount(batch.customizationsCost[index]),
+        appliedRules: engine.appliedRules(
+          batch.tier[index],
+          item.product.basePrice
+        ) as AppliedRule[],
+        unitPrice: roundAmount(batch.unitPrice[index]),
+        totalPrice: batch.totalPrice[index],
+      }));
+
+      // Remises, taxes et total
+      const totals = engine.quoteTotals(
+        subtotal,
+        totalQuantity,
         quoteRequest.customer?.customerType
       );
-      const discountAmount = discounts.reduce(
-        (total, discount) => total + discount.amount,
-        0
-      );
-
-      // Calcul des taxes
-      const taxableAmount = subtotal - discountAmount;
-      const taxAmount = calculateTax(taxableAmount, config.taxRate!);
-
-      // Total final
-      const totalAmount = taxableAmount + taxAmount;
 
       // Génération du breakdown
       const breakdown = generatePriceBreakdown(
         calculatedItems,
-        discounts,
-        taxAmount,
-        totalAmount
+        totals.discounts,
+        totals.taxAmount,
+        totals.totalAmount
       );
 
       const calculation: QuoteCalculation = {
         items: calculatedItems,
-        subtotal: roundAmount(subtotal),
+        subtotal: totals.subtotal,
         taxRate: config.taxRate!,
-        taxAmount: roundAmount(taxAmount),
-        discounts,
-        discountAmount: roundAmount(discountAmount),
-        totalAmount: roundAmount(totalAmount),
+        taxAmount: totals.taxAmount,
+        discounts: totals.discounts,
+        discountAmount: totals.discountAmount,
+        totalAmount: totals.totalAmount,
         breakdown,
       };
 
@@ -174,157 +195,37 @@ export const useQuoteCalculator = (
       throw new Error(`Produit manquant pour l'item ${item.id}`);
     }
 
-    const basePrice = item.product.basePrice;
-    let customizationsCost = 0;
-    const appliedRules: AppliedRule[] = [];
-
-    // Calcul des coûts de personnalisation
-    for (const customization of item.customizations || []) {
-      customizationsCost += customization.priceModifier;
-    }
-
-    // Application des règles de prix (remises quantité, urgence, etc.)
-    const quantityRules = applyQuantityRules(item.quantity, basePrice);
-    appliedRules.push(...quantityRules);
-
-    const ruleModifier = appliedRules.reduce(
-      (total, rule) => total + rule.modifier,
-      0
-    );
-    const unitPrice = basePrice + customizationsCost + ruleModifier;
-    const totalPrice = unitPrice * item.quantity;
+    // Prix unitaire mémoïsé par (produit, tranche de quantité, personnalisations)
+    const pricing = engine.priceLine({
+      productId: item.productId,
+      basePrice: item.product.basePrice,
+      quantity: item.quantity,
+      customizations: item.customizations,
+    });
 
     return {
       id: item.id,
       productId: item.productId,
       quantity: item.quantity,
-      basePrice: roundAmount(basePrice),
-      customizationsCost: roundAmount(customizationsCost),
-      appliedRules,
-      unitPrice: roundAmount(unitPrice),
-      totalPrice: roundAmount(totalPrice),
+      basePrice: roundAmount(item.product.basePrice),
+      customizationsCost: pricing.customizationsCost,
+      appliedRules: pricing.appliedRules as AppliedRule[],
+      unitPrice: pricing.unitPrice,
+      totalPrice: engine.lineTotal(pricing, item.quantity),
     };
   };
 
   /**
-   * Applique les règles de prix basées sur la quantité
-   */
-  const applyQuantityRules = (
-    quantity: number,
-    basePrice: number
-  ): AppliedRule[] => {
-    const rules: AppliedRule[] = [];
-
-    // Règle de remise progressive pour grosses quantités
-    if (quantity >= 1000) {
-      rules.push({
-        ruleId: "bulk-1000",
-        ruleName: "Remise volume 1000+",
-        modifier: -basePrice * 0.25, // -25%
-        reason: `Remise 25% pour commande de ${quantity} unités`,
-      });
-    } else if (quantity >= 500) {
-      rules.push({
-        ruleId: "bulk-500",
-        ruleName: "Remise volume 500+",
-        modifier: -basePrice * 0.2, // -20%
-        reason: `Remise 20% pour commande de ${quantity} unités`,
-      });
-    } else if (quantity >= 100) {
-      rules.push({
-        ruleId: "bulk-100",
-        ruleName: "Remise volume 100+",
-        modifier: -basePrice * 0.15, // -15%
-        reason: `Remise 15% pour commande de ${quantity} unités`,
-      });
-    }
-
-    // Règle de surcoût pour petites quantités
-    if (quantity < 10) {
-      rules.push({
-        ruleId: "small-quantity",
-        ruleName: "Surcoût petite quantité",
-        modifier: basePrice * 0.2, // +20%
-        reason: `Surcoût 20% pour commande inférieure à 10 unités`,
-      });
-    }
-
-    return rules;
-  };
-
-  /**
-   * Calcule les remises applicables
+   * Somme des surcoûts de personnalisation d'un item
    */
-  const calculateDiscounts = (
-    items: CalculatedItem[],
-    customerType?: string
-  ): AppliedDiscount[] => {
-    const discounts: AppliedDiscount[] = [];
-    const totalQuantity = items.reduce((sum, item) => sum + item.quantity, 0);
-    const subtotal = items.reduce((sum, item) => sum + item.totalPrice, 0);
-
-    // Remises volume basées sur la quantité totale
-    const volumeDiscount = findApplicableVolumeDiscount(totalQuantity);
-    if (volumeDiscount) {
-      discounts.push({
-        id: `volume-${volumeDiscount.minQuantity}`,
-        name: `Remise volume ${volumeDiscount.minQuantity}+`,
-        type: "percentage",
-        value: volumeDiscount.discountPercentage,
-        amount: roundAmount(
-          subtotal * (volumeDiscount.discountPercentage / 100)
-        ),
-        reason: `${volumeDiscount.discountPercentage}% de remise pour ${totalQuantity} articles`,
-      });
-    }
-
-    // Remises par type de client
-    if (customerType && config.discountRules?.customerTypeDiscounts) {
-      const customerDiscount = config.discountRules.customerTypeDiscounts.find(
-        (d) => d.customerType === customerType
-      );
-
-      if (customerDiscount) {
-        discounts.push({
-          id: `customer-${customerType}`,
-          name: `Remise ${customerType}`,
-          type: "percentage",
-          value: customerDiscount.discountPercentage,
-          amount: roundAmount(
-            subtotal * (customerDiscount.discountPercentage / 100)
-          ),
-          reason: `Remise spéciale client ${customerType}`,
-        });
-      }
+  const sumCustomizations = (
+    customizations: Array<{ priceModifier?: number }> = []
+  ): number => {
+    let total = 0;
+    for (const customization of customizations) {
+      total += customization?.priceModifier || 0;
     }
-
-    return discounts;
-  };
-
-  /**
-   * Trouve la remise volume applicable
-   */
-  const findApplicableVolumeDiscount = (
-    quantity: number
-  ): VolumeDiscount | null => {
-    if (!config.discountRules?.volumeDiscounts) return null;
-
-    return (
-      config.discountRules.volumeDiscounts
-        .filter(
-          (discount) =>
-            quantity >= discount.minQuantity &&
-            (!discount.maxQuantity || quantity <= discount.maxQuantity)
-        )
-        .sort((a, b) => b.discountPercentage - a.discountPercentage)[0] || null
-    );
-  };
-
-  /**
-   * Calcule les taxes
-   */
-  const calculateTax = (taxableAmount: number, taxRate: number): number => {
-    return taxableAmount * taxRate;
+    return total;
   };
 
   /**
@@ -450,10 +351,7 @@ export const useQuoteCalculator = (
   /**
    * Arrondit un montant selon la précision configurée
    */
-  const roundAmount = (amount: number): number => {
-    const factor = Math.pow(10, config.roundingPrecision!);
-    return Math.round(amount * factor) / factor;
-  };
+  const roundAmount = (amount: number): number => engine.round(amount);
 
   /**
    * Formate un montant selon la locale
@@ -481,24 +379,14 @@ export const useQuoteCalculator = (
       customizations,
     });
 
-    const customizationsCost = customizations.reduce(
-      (sum, c) => sum + (c?.priceModifier || 0),
-      0
-    );
-    const quantityRules = applyQuantityRules(quantity, basePrice);
-    const ruleModifier = quantityRules.reduce(
-      (sum, rule) => sum + rule.modifier,
-      0
-    );
-
-    const unitPrice = basePrice + customizationsCost + ruleModifier;
-    const totalPrice = unitPrice * quantity;
+    // Appelé à chaque rendu : le prix unitaire et les règles viennent du cache du moteur
+    const pricing = engine.priceLine({ basePrice, quantity, customizations });
 
     const result = {
-      unitPrice: roundAmount(unitPrice),
-      totalPrice: roundAmount(totalPrice),
-      customizationsCost: roundAmount(customizationsCost),
-      appliedRules: quantityRules,
+      unitPrice: pricing.unitPrice,
+      totalPrice: engine.lineTotal(pricing, quantity),
+      customizationsCost: pricing.customizationsCost,
+      appliedRules: pricing.appliedRules as AppliedRule[],
     };
 
     logToConsole("calculateProductPrice:result", result);
@@ -1,15 +1,34 @@
+import { useQueryClient } from '@tanstack/vue-query'
 import { useProductsStore } from '../stores/products'
 import { useBundleStore } from '../stores/useBundleStore'
+import { productQueryKeys } from './useProductsQuery'
+import { bundleQueryKeys } from './useBundlesQuery'
+import { categoryQueryKeys } from './useCategoriesQuery'
+import { productBundleQueryKeys } from './useProductBundlesQuery'
 // Auto-imported via Nuxt 3: globalNotifications
 
 interface SSEMessage {
-  type: 'connected' | 'ping' | 'product:updated' | 'product:created' | 'product:deleted' | 'bundle:updated'
+  type: 'connected' | 'ping' | 'resync' | 'product:updated' | 'product:created' | 'product:deleted' | 'bundle:updated'
   data?: any
   timestamp?: number
 }
 
+// Canaux utiles à l'admin : les événements assets/orders ne sont pas envoyés à ce client
+const SSE_CHANNELS = 'products,bundles'
+
+// Requêtes alimentées par ces canaux (products porte aussi les événements category:*)
+const RESYNC_QUERY_KEYS = [
+  productQueryKeys.all,
+  categoryQueryKeys.all,
+  bundleQueryKeys.all,
+  productBundleQueryKeys.all
+]
+
 export const useSSEUpdates = () => {
+  const queryClient = useQueryClient()
   const eventSource = ref<EventSource | null>(null)
+  // Dernier id reçu : transmis à la reconnexion pour rejouer les événements manqués
+  const lastEventId = ref<string | null>(null)
   const isConnected = ref(false)
   const reconnectAttempts = ref(0)
   const maxReconnectAttempts = 5
@@ -34,7 +53,11 @@ export const useSSEUpdates = () => {
     console.log('🔌 Connexion SSE...')
 
     try {
-      eventSource.value = new EventSource('/api/sse')
+      const params = new URLSearchParams({ channels: SSE_CHANNELS })
+      if (lastEventId.value) {
+        params.set('lastEventId', lastEventId.value)
+      }
+      eventSource.value = new EventSource(`/api/sse?${params}`)
 
       eventSource.value.onopen = () => {
         console.log('✅ SSE connecté avec succès')
@@ -44,6 +67,9 @@ export const useSSEUpdates = () => {
 
       eventSource.value.onmessage = (event) => {
         try {
+          if (event.lastEventId) {
+            lastEventId.value = event.lastEventId
+          }
           const message: SSEMessage = JSON.parse(event.data)
           handleSSEMessage(message)
         } catch (error) {
@@ -87,6 +113,16 @@ export const useSSEUpdates = () => {
         // Heartbeat, ne rien faire
         break
 
+      case 'resync':
+        // Événements manqués hors du buffer de rejeu serveur : recharger les données
+        console.log('🔄 Resynchronisation SSE demandée par le serveur')
+        store.fetchProducts(true)
+        bundleStore.clearCache()
+        for (const queryKey of RESYNC_QUERY_KEYS) {
+          queryClient.invalidateQueries({ queryKey })
+        }
+        break
+
       case 'product:updated':
         console.log('📝 Mise à jour produit reçue via SSE:', message.data?.name)
         if (message.data) {
@@ -26,7 +26,7 @@ export default defineNuxtConfig({
 
   // Build configuration
   build: {
-    transpile: ["@ns2po/ui", "@ns2po/composables"],
+    transpile: ["@ns2po/ui", "@ns2po/composables", "@ns2po/pricing"],
   },
 
   // Runtime config for environment variables
@@ -35,6 +35,9 @@ export default defineNuxtConfig({
     turso: {
       databaseUrl: process.env.TURSO_DATABASE_URL,
       authToken: process.env.TURSO_AUTH_TOKEN,
+      // Réplica embarqué optionnel : fichier SQLite local synchronisé depuis databaseUrl
+      replicaPath: process.env.TURSO_REPLICA_PATH,
+      replicaSyncInterval: process.env.TURSO_REPLICA_SYNC_INTERVAL,
     },
     cloudinaryCloudName: process.env.CLOUDINARY_CLOUD_NAME,
     cloudinaryApiKey: process.env.CLOUDINARY_API_KEY,
@@ -1,4 +1,5 @@
 import { z } from 'zod'
+import { bundleLineSubtotal, computeBundleTotals } from '@ns2po/pricing'
 
 // Bundle Product Schema
 export const bundleProductSchema = z.object({
@@ -222,7 +223,7 @@ export function validateBundleProducts(products: any[]): string[] {
       bundleProductSchema.parse(product)
 
       // Additional validation: subtotal should match quantity * basePrice
-      const expectedSubtotal = product.quantity * product.basePrice
+      const expectedSubtotal = bundleLineSubtotal(product.basePrice, product.quantity)
       if (Math.abs(product.subtotal - expectedSubtotal) > 0.01) {
         errors.push(`Sous-total incorrect pour le produit ${index + 1}`)
       }
@@ -245,9 +246,7 @@ export function validateBundleTotal(bundle: any): string[] {
     return errors
   }
 
-  const calculatedTotal = bundle.products.reduce((total: number, product: any) => {
-    return total + (product.subtotal || 0)
-  }, 0)
+  const calculatedTotal = computeBundleTotals(bundle.products).estimatedTotal
 
   // Allow small floating point differences
   if (Math.abs(bundle.estimatedTotal - calculatedTotal) > 0.01) {
@@ -0,0 +1,132 @@
+#!/usr/bin/env tsx
+
+/**
+ * Benchmark recherche produits : LIKE multi-colonnes vs index FTS5 (migration 006)
+ * Catalogue synthétique de 50k produits dans une base SQLite locale (aucun accès Turso)
+ *
+ * Usage: pnpm bench:search [nombreDeProduits]
+ */
+
+import { createClient } from '@libsql/client'
+import { readFileSync, rmSync } from 'node:fs'
+import { tmpdir } from 'node:os'
+import { join, dirname } from 'node:path'
+import { fileURLToPath } from 'node:url'
+import { buildFtsMatchQuery, bm25Expression, PRODUCTS_FTS_WEIGHTS } from '../server/utils/search'
+
+const __dirname = dirname(fileURLToPath(import.meta.url))
+const ROW_COUNT = Number(process.argv[2]) || 50_000
+const ITERATIONS = 20
+const DB_PATH = join(tmpdir(), `ns2po-bench-search-${process.pid}.db`)
+
+const NAMES = ['T-shirt', 'Casquette', 'Polo', 'Écharpe', 'Affiche', 'Banderole', 'Kakémono', 'Stylo', 'Gobelet', 'Bracelet', 'Parapluie', 'Drapeau', 'Calendrier', 'Autocollant', 'Visière']
+const ADJECTIVES = ['personnalisé', 'brodé', 'imprimé', 'sérigraphié', 'premium', 'économique', 'coloré', 'élégant']
+const CATEGORIES = ['textile', 'accessoire', 'impression', 'goodies', 'signalétique']
+const MATERIALS = ['coton', 'polyester', 'papier', 'vinyle', 'silicone', 'satin', 'bois']
+const QUERIES = ['echarpe', 'kakemono brode', 'coton', 'tsh', 'banderole vinyle', 'introuvable']
+
+const pick = <T>(list: T[], i: number) => list[i % list.length]
+
+async function main() {
+  const db = createClient({ url: `file:${DB_PATH}` })
+
+  try {
+    console.log(`🏗️  Génération de ${ROW_COUNT} produits synthétiques...`)
+
+    await db.executeMultiple(`
+      CREATE TABLE products (
+        id TEXT PRIMARY KEY, name TEXT NOT NULL, description TEXT, category TEXT NOT NULL,
+        subcategory TEXT, base_price REAL NOT NULL, min_quantity INTEGER DEFAULT 1,
+        max_quantity INTEGER, unit TEXT DEFAULT 'pièce', production_time_days INTEGER DEFAULT 7,
+        customizable BOOLEAN DEFAULT TRUE, materials TEXT, colors TEXT, sizes TEXT,
+        image_url TEXT, gallery_urls TEXT, specifications TEXT, is_active BOOLEAN DEFAULT TRUE,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP, updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+      );
+      CREATE TABLE assets (
+        id TEXT PRIMARY KEY, public_id TEXT NOT NULL UNIQUE, secure_url TEXT NOT NULL,
+        alt_text TEXT, caption TEXT, is_deleted INTEGER DEFAULT 0
+      );
+    `)
+
+    const BATCH = 1000
+    for (let start = 0; start < ROW_COUNT; start += BATCH) {
+      const statements = []
+      for (let i = start; i < Math.min(start + BATCH, ROW_COUNT); i++) {
+        const name = `${pick(NAMES, i)} ${pick(ADJECTIVES, i * 7)} ${i}`
+        statements.push({
+          sql: `INSERT INTO products (id, name, description, category, subcategory, base_price, materials, is_active)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)`,
+          args: [
+            `prod-${i}`,
+            name,
+            `${name} pour campagne électorale, finition ${pick(ADJECTIVES, i * 3)}`,
+            pick(CATEGORIES, i),
+            pick(CATEGORIES, i * 11),
+            1000 + (i % 50) * 100,
+            pick(MATERIALS, i * 5),
+            i % 10 === 0 ? 0 : 1
+          ]
+        })
+      }
+      await db.batch(statements, 'write')
+    }
+
+    console.log('🔎 Application de la migration 006 (FTS5)...')
+    const indexStart = Date.now()
+    await db.executeMultiple(readFileSync(join(__dirname, '../server/database/migrations/006_create_search_fts.sql'), 'utf8'))
+    console.log(`   Indexation: ${Date.now() - indexStart}ms`)
+
+    console.log(`\n⏱️  ${ITERATIONS} itérations par requête\n`)
+    console.log('requête'.padEnd(20), 'LIKE (ms)'.padStart(12), 'FTS5 (ms)'.padStart(12), 'gain'.padStart(8), 'résultats'.padStart(14))
+
+    for (const term of QUERIES) {
+      const pattern = `%${term}%`
+      const likeQuery = {
+        sql: `SELECT id FROM products
+              WHERE is_active = true
+                AND (name LIKE ? OR description LIKE ? OR category LIKE ? OR subcategory LIKE ? OR materials LIKE ?)
+              ORDER BY CASE WHEN name LIKE ? THEN 1 WHEN category LIKE ? THEN 2 WHEN description LIKE ? THEN 3 ELSE 4 END, name`,
+        args: [pattern, pattern, pattern, pattern, pattern, pattern, pattern, pattern]
+      }
+      const ftsQuery = {
+        sql: `SELECT p.id FROM products_fts
+              JOIN products_search_keys k ON k.search_key = products_fts.rowid
+              JOIN products p ON p.id = k.product_id
+              WHERE products_fts MATCH ? AND p.is_active = true
+              ORDER BY ${bm25Expression('products_fts', PRODUCTS_FTS_WEIGHTS)}, p.name`,
+        args: [buildFtsMatchQuery(term) as string]
+      }
+
+      const like = await measure(() => db.execute(likeQuery))
+      const fts = await measure(() => db.execute(ftsQuery))
+
+      console.log(
+        term.padEnd(20),
+        like.avg.toFixed(2).padStart(12),
+        fts.avg.toFixed(2).padStart(12),
+        `x${(like.avg / Math.max(fts.avg, 0.001)).toFixed(1)}`.padStart(8),
+        `${like.rows}/${fts.rows}`.padStart(14)
+      )
+    }
+
+    console.log('\nNote: LIKE ne trouve ni les variantes accentuées ("echarpe" ≠ "Écharpe") ni les mots non contigus.')
+  } finally {
+    db.close()
+    rmSync(DB_PATH, { force: true })
+  }
+}
+
+async function measure(run: () => Promise<{ rows: unknown[] }>) {
+  let rows = 0
+  await run() // warm-up
+  const start = performance.now()
+  for (let i = 0; i < ITERATIONS; i++) {
+    rows = (await run()).rows.length
+  }
+  return { avg: (performance.now() - start) / ITERATIONS, rows }
+}
+
+main().catch((error) => {
+  console.error('❌ Benchmark échoué:', error)
+  process.exit(1)
+})
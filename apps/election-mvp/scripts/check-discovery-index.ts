@@ -0,0 +1,161 @@
+#!/usr/bin/env tsx
+
+/**
+ * Vérification de l'index auto-discovery (migrations 008 et 009) contre un stand-in local de l'API Search Cloudinary
+ * Base SQLite locale, aucun accès Turso ni Cloudinary
+ *
+ * Usage: pnpm check:discovery
+ */
+
+import { createClient } from '@libsql/client'
+import assert from 'node:assert/strict'
+import { readFileSync, rmSync } from 'node:fs'
+import { tmpdir } from 'node:os'
+import { join, dirname } from 'node:path'
+import { fileURLToPath } from 'node:url'
+import { syncDiscoveryIndex, readDiscoveryIndex, getDiscoveryState } from '../server/utils/cloudinary-discovery-index'
+import type { CreativeSearchParams } from '../server/utils/cloudinary-discovery'
+
+const __dirname = dirname(fileURLToPath(import.meta.url))
+const DB_PATH = join(tmpdir(), `ns2po-check-discovery-${process.pid}.db`)
+const FOLDER = 'ns2po/gallery/creative'
+
+/**
+ * Stand-in de cloudinary.search : filtre uploaded_at>="...", tri uploaded_at asc, pagination next_cursor
+ * `failOnCall` simule une coupure réseau sur le n-ième appel
+ */
+function createSearchStandIn() {
+  const resources = new Map<string, any>()
+  const calls: CreativeSearchParams[] = []
+  const control = { failOnCall: 0 }
+
+  const put = (name: string, uploadedAt: string) => {
+    const publicId = `${FOLDER}/${name}`
+    resources.set(publicId, {
+      public_id: publicId,
+      secure_url: `https://res.cloudinary.com/demo/image/upload/${publicId}.jpg`,
+      format: 'jpg',
+      bytes: 1024,
+      width: 800,
+      height: 600,
+      created_at: resources.get(publicId)?.created_at ?? uploadedAt,
+      uploaded_at: uploadedAt
+    })
+  }
+
+  const search = async (params: CreativeSearchParams) => {
+    calls.push(params)
+    if (calls.length === control.failOnCall) throw new Error('Coupure réseau (simulée)')
+    const since = params.expression.match(/uploaded_at>="([^"]+)"/)?.[1]
+    const matching = [...resources.values()]
+      .filter(resource => !since || resource.uploaded_at >= since)
+      .sort((a, b) => a.uploaded_at.localeCompare(b.uploaded_at))
+
+    const offset = params.nextCursor ? Number(params.nextCursor) : 0
+    const page = matching.slice(offset, offset + params.maxResults)
+    const next = offset + params.maxResults
+    return { resources: page, next_cursor: next < matching.length ? String(next) : undefined }
+  }
+
+  return { put, remove: (name: string) => resources.delete(`${FOLDER}/${name}`), search, calls, control }
+}
+
+async function main() {
+  const db = createClient({ url: `file:${DB_PATH}` })
+  const cloudinary = createSearchStandIn()
+
+  try {
+    for (const migration of ['008_create_cloudinary_discovery_index.sql', '009_discovery_sync_resume.sql']) {
+      await db.executeMultiple(readFileSync(join(__dirname, '../server/database/migrations', migration), 'utf8'))
+    }
+    await db.execute(`CREATE TABLE realisation_blacklist (
+      id INTEGER PRIMARY KEY AUTOINCREMENT, public_id TEXT UNIQUE NOT NULL, original_title TEXT,
+      reason TEXT DEFAULT 'user_deleted', blacklisted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP, blacklisted_by TEXT DEFAULT 'admin'
+    )`)
+
+    cloudinary.put('banderole-001.jpg', '2025-01-01T10:00:00Z')
+    cloudinary.put('tshirt-rouge.jpg', '2025-01-02T10:00:00Z')
+    cloudinary.put('casquette.png', '2025-01-03T10:00:00Z')
+    cloudinary.put('mug-002.jpg', '2025-01-04T10:00:00Z')
+    cloudinary.put('affiche-campagne.jpg', '2025-01-05T10:00:00Z')
+
+    console.log('1. Synchronisation initiale (complète, pages de 2)')
+    const initial = await syncDiscoveryIndex(db, { search: cloudinary.search, pageSize: 2 })
+    assert.equal(initial.mode, 'full')
+    assert.equal(initial.pages, 3)
+    assert.equal(initial.indexed, 5)
+    assert.equal(initial.watermark, '2025-01-05T10:00:00Z')
+
+    const { realisations } = await readDiscoveryIndex(db)
+    assert.equal(realisations.length, 5)
+    const banderole = realisations.find(r => r.cloudinaryPublicIds[0] === `${FOLDER}/banderole-001.jpg`)
+    assert.ok(banderole, 'banderole indexée')
+    assert.equal(banderole.id, 'cloudinary_ns2po_gallery_creative_banderole_001_jpg')
+    assert.deepEqual(banderole.tags, ['Textile', 'Campagne'])
+    const cloudName = process.env.CLOUDINARY_CLOUD_NAME || 'demo'
+    assert.equal(banderole.cloudinaryUrls[0], `https://res.cloudinary.com/${cloudName}/image/upload/w_800,h_600,c_fit,f_auto,q_auto/${FOLDER}/banderole-001.jpg`)
+
+    console.log('2. Synchronisation incrémentale sans changement')
+    const idle = await syncDiscoveryIndex(db, { search: cloudinary.search, pageSize: 2 })
+    assert.equal(idle.mode, 'incremental')
+    assert.equal(idle.changed, 0)
+    assert.match(cloudinary.calls.at(-1)!.expression, /uploaded_at>="2025-01-05T10:00:00Z"/)
+
+    console.log('3. Nouvelle image et ré-upload')
+    cloudinary.put('drapeau-003.jpg', '2025-01-06T10:00:00Z')
+    cloudinary.put('tshirt-rouge.jpg', '2025-01-07T10:00:00Z')
+    const delta = await syncDiscoveryIndex(db, { search: cloudinary.search, pageSize: 2 })
+    assert.equal(delta.mode, 'incremental')
+    assert.equal(delta.indexed, 3, 'seules les images uploadées depuis le watermark (inclus) sont relues')
+    assert.equal(delta.changed, 2)
+    assert.equal(delta.watermark, '2025-01-07T10:00:00Z')
+
+    console.log('4. Blacklist filtrée à la lecture')
+    await db.execute({
+      sql: 'INSERT INTO realisation_blacklist (public_id) VALUES (?)',
+      args: ['cloudinary_ns2po_gallery_creative_mug_002_jpg']
+    })
+    assert.equal((await readDiscoveryIndex(db)).realisations.length, 5)
+
+    console.log('5. Scan complet : image supprimée de Cloudinary')
+    cloudinary.remove('casquette.png')
+    const full = await syncDiscoveryIndex(db, { search: cloudinary.search, full: true })
+    assert.equal(full.removed, 1)
+    const afterFull = await readDiscoveryIndex(db)
+    assert.equal(afterFull.realisations.length, 4)
+    assert.ok(!afterFull.realisations.some(r => r.cloudinaryPublicIds[0].endsWith('casquette.png')))
+
+    const state = await getDiscoveryState(db)
+    assert.equal(state?.lastStatus, 'success')
+    assert.equal(state?.indexedCount, 5)
+
+    console.log('6. Scan complet interrompu puis repris au curseur enregistré')
+    cloudinary.control.failOnCall = cloudinary.calls.length + 2
+    await assert.rejects(syncDiscoveryIndex(db, { search: cloudinary.search, full: true, pageSize: 2 }))
+    const interrupted = await getDiscoveryState(db)
+    assert.equal(interrupted?.lastStatus, 'error')
+    assert.equal(interrupted?.syncMode, 'full')
+    assert.equal(interrupted?.syncCursor, '2')
+    assert.equal(interrupted?.watermark, '2025-01-07T10:00:00Z', 'le watermark validé ne bouge pas avant la fin')
+
+    const resumed = await syncDiscoveryIndex(db, { search: cloudinary.search, pageSize: 2 })
+    assert.equal(resumed.mode, 'full')
+    assert.equal(resumed.pages, 2, 'seules les pages restantes sont relues')
+    assert.equal(cloudinary.calls.at(-2)!.nextCursor, '2')
+    assert.equal(resumed.removed, 0, 'les images de la première page restent vues par la synchro reprise')
+    const completed = await getDiscoveryState(db)
+    assert.equal(completed?.lastStatus, 'success')
+    assert.equal(completed?.syncCursor, null)
+    assert.equal((await readDiscoveryIndex(db)).realisations.length, 4)
+
+    console.log('\n✅ Index auto-discovery: tous les contrôles passent')
+  } finally {
+    db.close()
+    rmSync(DB_PATH, { force: true })
+  }
+}
+
+main().catch((error) => {
+  console.error('❌ Vérification échouée:', error)
+  process.exit(1)
+})
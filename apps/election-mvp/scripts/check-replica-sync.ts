@@ -0,0 +1,173 @@
+#!/usr/bin/env tsx
+
+/**
+ * Vérification du mode réplica embarqué (server/utils/replica-sync.ts)
+ * 1. Logique de synchronisation avec un client factice : sync unique en vol, regroupement, fraîcheur, panne
+ * 2. Réplica libsql réel contre un serveur local (turso dev / sqld), entièrement hors ligne :
+ *    lectures locales, écritures transmises au primaire, rattrapage après sync
+ *
+ * Usage: pnpm check:replica [urlServeurLocal]   (défaut http://127.0.0.1:8080, lancer `turso dev` avant)
+ */
+
+import assert from 'node:assert/strict'
+import { mkdtempSync, rmSync } from 'node:fs'
+import { tmpdir } from 'node:os'
+import { join } from 'node:path'
+import { createClient } from '@libsql/client'
+import { ReplicaSync, type SyncableClient } from '../server/utils/replica-sync'
+
+const SERVER_URL = process.argv[2] || process.env.REPLICA_CHECK_URL || 'http://127.0.0.1:8080'
+const READS = 2000
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms))
+
+/**
+ * Faux client : chaque sync prend `delayMs` et rapporte une frame ; `failing` simule un primaire injoignable
+ */
+function createStandIn(delayMs = 20) {
+  const state = { calls: 0, frameNo: 0, failing: false }
+  const client: SyncableClient = {
+    async sync() {
+      state.calls++
+      await sleep(delayMs)
+      if (state.failing) throw new Error('Primaire injoignable (simulé)')
+      state.frameNo++
+      return { frame_no: state.frameNo, frames_synced: 1 }
+    }
+  }
+  return { client, state }
+}
+
+async function checkSyncLogic() {
+  console.log('\n🧪 Logique de synchronisation (client factice)')
+
+  // Appels concurrents : un sync en vol + un seul sync suivant partagé
+  const { client, state } = createStandIn()
+  const replica = new ReplicaSync(client, { intervalMs: 0, staleAfterMs: 100 })
+  assert.equal(replica.getStatus().health, 'stale')
+
+  const results = await Promise.all(Array.from({ length: 10 }, (_, i) => replica.sync(`burst-${i}`)))
+  assert.equal(state.calls, 2)
+  assert.equal(results[0].frameNo, 1)
+  assert.ok(results.slice(1).every(result => result.frameNo === 2))
+  assert.equal(replica.getStatus().health, 'up')
+  console.log(`   10 sync() concurrents → ${state.calls} synchronisations (${replica.getStatus().stats.coalesced} regroupés)`)
+
+  // requestSync() en rafale : une seule synchronisation différée
+  const debounced = createStandIn(1)
+  const eventReplica = new ReplicaSync(debounced.client, { intervalMs: 0, debounceMs: 30 })
+  for (let i = 0; i < 20; i++) eventReplica.requestSync('webhook')
+  await sleep(80)
+  assert.equal(debounced.state.calls, 1)
+  console.log('   20 requestSync() en rafale → 1 synchronisation')
+
+  // Fraîcheur puis panne du primaire
+  await sleep(120)
+  assert.equal(replica.getStatus().health, 'stale')
+  state.failing = true
+  await assert.rejects(replica.sync('interval'))
+  const failed = replica.getStatus()
+  assert.equal(failed.health, 'stale')
+  assert.equal(failed.consecutiveFailures, 1)
+  assert.ok(failed.stalenessMs !== null && failed.stalenessMs > 100)
+  state.failing = false
+  await replica.sync('recovery')
+  assert.equal(replica.getStatus().health, 'up')
+  assert.equal(replica.getStatus().consecutiveFailures, 0)
+  console.log(`   Primaire injoignable → stale (${failed.stalenessMs}ms), rétabli au sync suivant`)
+
+  // Jamais synchronisé et primaire injoignable : down
+  const down = createStandIn(1)
+  down.state.failing = true
+  const coldReplica = new ReplicaSync(down.client, { intervalMs: 0 })
+  await assert.rejects(coldReplica.sync('startup'))
+  assert.equal(coldReplica.getStatus().health, 'down')
+  console.log('   Réplica jamais synchronisé + primaire injoignable → down')
+
+  // Synchronisation périodique
+  const periodic = createStandIn(1)
+  const periodicReplica = new ReplicaSync(periodic.client, { intervalMs: 25 })
+  periodicReplica.start()
+  await sleep(90)
+  periodicReplica.stop()
+  assert.ok(periodic.state.calls >= 2)
+  console.log(`   Synchronisation périodique (25ms) → ${periodic.state.calls} synchronisations en 90ms`)
+
+  // Période invalide (TURSO_REPLICA_SYNC_INTERVAL=abc) : période par défaut, pas un timer à 1ms
+  for (const intervalMs of [NaN, Infinity, -5]) {
+    const invalid = new ReplicaSync(createStandIn(1).client, { intervalMs })
+    assert.ok(invalid.getStatus().intervalMs >= 1000)
+  }
+  console.log('   Période NaN/Infinity/négative → période par défaut')
+}
+
+async function serverAvailable(url: string): Promise<boolean> {
+  const probe = createClient({ url })
+  try {
+    await Promise.race([probe.execute('SELECT 1'), sleep(2000).then(() => { throw new Error('timeout') })])
+    return true
+  } catch {
+    return false
+  } finally {
+    probe.close()
+  }
+}
+
+async function checkEmbeddedReplica() {
+  console.log(`\n💾 Réplica libsql embarqué ← ${SERVER_URL}`)
+
+  if (!(await serverAvailable(SERVER_URL))) {
+    console.log('   ⏭️ Serveur libsql local injoignable : lancer `turso dev --port 8080` (ou sqld) puis relancer')
+    return
+  }
+
+  const table = `replica_check_${Date.now()}`
+  const dir = mkdtempSync(join(tmpdir(), 'ns2po-replica-'))
+  const primary = createClient({ url: SERVER_URL })
+  const local = createClient({ url: `file:${join(dir, 'replica.db')}`, syncUrl: SERVER_URL })
+  const replica = new ReplicaSync(local, { intervalMs: 0, path: join(dir, 'replica.db'), syncUrl: SERVER_URL })
+
+  try {
+    await primary.execute(`CREATE TABLE ${table} (id INTEGER PRIMARY KEY, label TEXT)`)
+    await primary.execute({ sql: `INSERT INTO ${table} (label) VALUES (?)`, args: ['primaire-1'] })
+
+    const first = await replica.sync('startup')
+    assert.ok(first.framesSynced > 0)
+    assert.equal((await local.execute(`SELECT COUNT(*) AS count FROM ${table}`)).rows[0].count, 1)
+
+    // Écriture d'une autre instance : invisible jusqu'au prochain sync
+    await primary.execute({ sql: `INSERT INTO ${table} (label) VALUES (?)`, args: ['primaire-2'] })
+    assert.equal((await local.execute(`SELECT COUNT(*) AS count FROM ${table}`)).rows[0].count, 1)
+    await replica.sync('webhook')
+    assert.equal((await local.execute(`SELECT COUNT(*) AS count FROM ${table}`)).rows[0].count, 2)
+    console.log('   Écriture sur le primaire visible après sync')
+
+    // Écriture via le réplica : transmise au primaire, relue localement
+    await local.execute({ sql: `INSERT INTO ${table} (label) VALUES (?)`, args: ['replica-1'] })
+    assert.equal((await primary.execute(`SELECT COUNT(*) AS count FROM ${table}`)).rows[0].count, 3)
+    assert.equal((await local.execute(`SELECT COUNT(*) AS count FROM ${table}`)).rows[0].count, 3)
+    console.log('   Écriture via le réplica transmise au primaire')
+
+    const timeReads = async (client: typeof local) => {
+      const start = performance.now()
+      for (let i = 0; i < READS; i++) {
+        await client.execute({ sql: `SELECT label FROM ${table} WHERE id = ?`, args: [1 + (i % 3)] })
+      }
+      return ((performance.now() - start) * 1000) / READS
+    }
+    const localRead = await timeReads(local)
+    const remoteRead = await timeReads(primary)
+    console.log(`   Lecture locale ${localRead.toFixed(1)} µs, distante ${remoteRead.toFixed(1)} µs (×${(remoteRead / localRead).toFixed(1)})`)
+
+    assert.equal(replica.getStatus().health, 'up')
+  } finally {
+    await primary.execute(`DROP TABLE IF EXISTS ${table}`).catch(() => undefined)
+    primary.close()
+    local.close()
+    rmSync(dir, { recursive: true, force: true })
+  }
+}
+
+await checkSyncLogic()
+await checkEmbeddedReplica()
+console.log('\n✅ Vérification réplica terminée')
@@ -0,0 +1,83 @@
+#!/usr/bin/env tsx
+
+/**
+ * Vérification du rejeu SSE (server/utils/sse-hub.ts) avec des sockets factices
+ * Un lecteur lent perd des messages, son buffer se vide, il se reconnecte avec Last-Event-ID :
+ * il doit recevoir exactement les messages perdus, dans l'ordre.
+ *
+ * Usage: pnpm check:sse
+ */
+
+import assert from 'node:assert/strict'
+import { EventEmitter } from 'node:events'
+import type { IncomingMessage, ServerResponse } from 'node:http'
+import { SSEHub } from '../server/utils/sse-hub'
+
+/**
+ * Réponse factice : writableLength est piloté par le test pour simuler un socket saturé
+ */
+class FakeResponse extends EventEmitter {
+  chunks: string[] = []
+  writableLength = 0
+  writableEnded = false
+  destroyed = false
+
+  writeHead() {
+    return this
+  }
+
+  write(chunk: string | Buffer) {
+    this.chunks.push(chunk.toString())
+    return true
+  }
+
+  end() {
+    this.writableEnded = true
+    this.emit('close')
+  }
+
+  destroy() {
+    this.destroyed = true
+    this.emit('close')
+  }
+
+  /** Ids SSE reçus, dans l'ordre */
+  ids(): string[] {
+    return this.chunks.flatMap(chunk => [...chunk.matchAll(/^id: (.+)$/gm)].map(match => match[1]))
+  }
+}
+
+const fakeRequest = () => ({ socket: { setNoDelay() {}, setTimeout() {} } }) as unknown as IncomingMessage
+
+function connect(hub: SSEHub, lastEventId?: string) {
+  const res = new FakeResponse()
+  hub.connect(fakeRequest(), res as unknown as ServerResponse, { channels: ['products'], lastEventId })
+  return res
+}
+
+const hub = new SSEHub({ heartbeatMs: 60_000, maxBufferedBytes: 100, maxDroppedMessages: 20 })
+const broadcast = (n: number) => hub.broadcast({ type: 'product:updated', data: { n } }).id
+
+console.log('1. Lecteur lent : messages perdus pendant la saturation')
+const slow = connect(hub)
+const first = broadcast(1)
+slow.writableLength = 1000
+const dropped = [broadcast(2), broadcast(3)]
+
+// Buffer redescendu sous la limite mais 'drain' pas encore émis : rien ne doit passer
+slow.writableLength = 0
+dropped.push(broadcast(4))
+assert.deepEqual(slow.ids(), [first], 'aucun message plus récent avant la déconnexion')
+
+slow.emit('drain')
+assert.ok(slow.writableEnded, 'déconnecté au drain')
+assert.equal(hub.getStats().clients, 0)
+
+console.log('2. Reconnexion avec Last-Event-ID : rejeu des messages perdus')
+const resumed = connect(hub, slow.ids().at(-1))
+assert.deepEqual(resumed.ids(), dropped)
+const next = broadcast(5)
+assert.deepEqual(resumed.ids(), [...dropped, next])
+
+hub.close()
+console.log('\n✅ Rejeu SSE: tous les contrôles passent')
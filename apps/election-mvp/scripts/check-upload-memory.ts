@@ -0,0 +1,223 @@
+#!/usr/bin/env tsx
+
+/**
+ * Vérification du pipeline d'upload en streaming (server/utils/streaming-upload.ts)
+ * Faux puits Cloudinary local : mesure le pic de RSS, la concurrence de la file et le retry depuis le spool,
+ * puis vérifie le rejet des champs reçus après le fichier et l'annulation d'un upload en attente dans la file
+ *
+ * Usage: pnpm check:upload [tailleEnMo]
+ */
+
+import { createServer, request, type IncomingMessage, type ServerResponse } from 'node:http'
+import { Readable, Writable } from 'node:stream'
+import assert from 'node:assert/strict'
+import type { AddressInfo } from 'node:net'
+import { streamMultipartUpload } from '../server/utils/streaming-upload'
+import { UploadQueue } from '../server/utils/upload-queue'
+import type { UploadSink } from '../server/utils/cloudinaryService'
+
+const FILE_MB = Number(process.argv[2]) || 200
+const MAX_RSS_GROWTH_MB = 64
+const BOUNDARY = '----ns2po-check-upload'
+const CHUNK = Buffer.alloc(64 * 1024, 0x5a)
+
+/**
+ * Faux upload_stream : consomme les octets au rythme d'un réseau (une pause par chunk) sans les garder
+ */
+function createMockSink(options: { failAfterBytes?: number } = {}): UploadSink {
+  let bytes = 0
+  let resolveResult: (value: any) => void
+  let rejectResult: (error: Error) => void
+  const result = new Promise<any>((resolve, reject) => {
+    resolveResult = resolve
+    rejectResult = reject
+  })
+
+  const stream = new Writable({
+    highWaterMark: 64 * 1024,
+    write(chunk: Buffer, _encoding, callback) {
+      bytes += chunk.length
+      if (options.failAfterBytes && bytes > options.failAfterBytes) {
+        const error = new Error('Connexion Cloudinary interrompue (simulée)')
+        rejectResult(error)
+        callback(error)
+        return
+      }
+      setImmediate(callback)
+    },
+    final(callback) {
+      resolveResult({
+        public_id: `check/upload-${Date.now()}`,
+        secure_url: 'https://res.cloudinary.com/demo/image/upload/check.jpg',
+        url: 'http://res.cloudinary.com/demo/image/upload/check.jpg',
+        width: 1,
+        height: 1,
+        format: 'jpg',
+        resource_type: 'image',
+        bytes,
+        version: 1
+      })
+      callback()
+    }
+  })
+
+  return { stream, result }
+}
+
+/**
+ * Corps multipart généré à la volée : champ folder puis fichier de sizeMb Mo (ou l'inverse avec folderLast)
+ */
+function multipartBody(sizeMb: number, folderLast = false): Readable {
+  const folder = `--${BOUNDARY}\r\nContent-Disposition: form-data; name="folder"\r\n\r\nns2po/check\r\n`
+  return Readable.from((function* () {
+    yield Buffer.from(
+      (folderLast ? '' : folder) +
+      `--${BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="banderole.jpg"\r\nContent-Type: image/jpeg\r\n\r\n`
+    )
+    for (let sent = 0; sent < sizeMb * 1024 * 1024; sent += CHUNK.length) {
+      yield CHUNK
+    }
+    yield Buffer.from(`\r\n${folderLast ? folder : ''}--${BOUNDARY}--\r\n`)
+  })())
+}
+
+function postUpload(port: number, sizeMb: number, folderLast = false): Promise<any> {
+  return new Promise((resolve, reject) => {
+    const req = request({
+      port,
+      host: '127.0.0.1',
+      method: 'POST',
+      headers: { 'content-type': `multipart/form-data; boundary=${BOUNDARY}` }
+    }, (res) => {
+      let body = ''
+      res.setEncoding('utf8')
+      res.on('data', (chunk) => { body += chunk })
+      res.on('end', () => resolve({ status: res.statusCode, ...JSON.parse(body) }))
+    })
+    req.on('error', reject)
+    multipartBody(sizeMb, folderLast).pipe(req)
+  })
+}
+
+async function withServer(
+  handler: (req: IncomingMessage) => Promise<unknown>,
+  run: (port: number) => Promise<void>
+) {
+  const server = createServer(async (req: IncomingMessage, res: ServerResponse) => {
+    try {
+      const body = await handler(req)
+      res.writeHead(200, { 'content-type': 'application/json' }).end(JSON.stringify(body))
+    } catch (error: any) {
+      res.writeHead(error?.statusCode || 500, { 'content-type': 'application/json' })
+        .end(JSON.stringify({ error: error?.message }))
+    }
+  })
+  await new Promise<void>(resolve => server.listen(0, '127.0.0.1', resolve))
+  try {
+    await run((server.address() as AddressInfo).port)
+  } finally {
+    await new Promise(resolve => server.close(resolve))
+  }
+}
+
+function trackPeakRss() {
+  const baseline = process.memoryUsage().rss
+  let peak = baseline
+  const timer = setInterval(() => {
+    peak = Math.max(peak, process.memoryUsage().rss)
+  }, 20)
+  return () => {
+    clearInterval(timer)
+    return (Math.max(peak, process.memoryUsage().rss) - baseline) / 1024 / 1024
+  }
+}
+
+async function main() {
+  console.log(`1. Upload streaming de ${FILE_MB} Mo`)
+  const queue = new UploadQueue({ concurrency: 2, retries: 1, retryDelayMs: 10 })
+  await withServer(
+    async (req) => {
+      const { upload, fields } = await streamMultipartUpload(req, {
+        sink: () => createMockSink(),
+        queue,
+        maxFileSize: 1024 * 1024 * 1024,
+        uploadOptions: fields => ({ folder: fields.folder })
+      })
+      return { bytes: upload.bytes, folder: fields.folder }
+    },
+    async (port) => {
+      const stop = trackPeakRss()
+      const response = await postUpload(port, FILE_MB)
+      const growth = stop()
+      console.log(`   Pic RSS: +${growth.toFixed(1)} Mo pour ${FILE_MB} Mo transférés`)
+      assert.equal(response.status, 200)
+      assert.equal(response.bytes, FILE_MB * 1024 * 1024)
+      assert.equal(response.folder, 'ns2po/check')
+      assert.ok(growth < MAX_RSS_GROWTH_MB, `pic RSS ${growth.toFixed(1)} Mo > ${MAX_RSS_GROWTH_MB} Mo`)
+
+      console.log('2. 6 uploads simultanés de 20 Mo, concurrence 2')
+      const responses = await Promise.all(Array.from({ length: 6 }, () => postUpload(port, 20)))
+      assert.ok(responses.every(r => r.status === 200 && r.bytes === 20 * 1024 * 1024))
+      assert.equal(queue.getStats().maxActive, 2)
+    }
+  )
+
+  console.log('3. Échec Cloudinary à mi-parcours : retry depuis le spool disque')
+  let attempts = 0
+  await withServer(
+    async (req) => {
+      const { upload } = await streamMultipartUpload(req, {
+        sink: () => createMockSink({ failAfterBytes: attempts++ === 0 ? 5 * 1024 * 1024 : undefined }),
+        queue,
+        maxFileSize: 1024 * 1024 * 1024,
+        uploadOptions: () => ({})
+      })
+      return { bytes: upload.bytes }
+    },
+    async (port) => {
+      const response = await postUpload(port, 20)
+      assert.equal(response.status, 200)
+      assert.equal(response.bytes, 20 * 1024 * 1024)
+      assert.equal(attempts, 2)
+      assert.equal(queue.getStats().retries, 1)
+    }
+  )
+
+  console.log('4. Champ folder reçu après le fichier : 400')
+  await withServer(
+    async (req) => {
+      const { upload } = await streamMultipartUpload(req, {
+        sink: () => createMockSink(),
+        queue,
+        uploadFields: ['folder'],
+        uploadOptions: fields => ({ folder: fields.folder })
+      })
+      return { bytes: upload.bytes }
+    },
+    async (port) => {
+      const response = await postUpload(port, 1, true)
+      assert.equal(response.status, 400)
+      assert.match(response.error, /folder/)
+    }
+  )
+
+  console.log('5. Upload annulé pendant qu\'il attend sa place dans la file')
+  const single = new UploadQueue({ concurrency: 1, retries: 0 })
+  let releaseSlot: () => void = () => {}
+  const running = single.add({ run: () => new Promise<void>(resolve => { releaseSlot = resolve }) })
+  const controller = new AbortController()
+  const queued = single.add({ run: async () => 'exécuté', signal: controller.signal })
+  controller.abort(new Error('Requête échouée'))
+  await assert.rejects(queued, /Requête échouée/)
+  assert.equal(single.getStats().waiting, 0)
+  assert.equal(single.getStats().cancelled, 1)
+  releaseSlot()
+  await running
+
+  console.log('\n✅ Pipeline d\'upload: tous les contrôles passent')
+}
+
+main().catch((error) => {
+  console.error('❌ Vérification échouée:', error)
+  process.exit(1)
+})
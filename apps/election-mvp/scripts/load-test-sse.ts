@@ -0,0 +1,143 @@
+#!/usr/bin/env tsx
+
+/**
+ * Test de charge du hub SSE : latence de diffusion pour 1k / 5k connexions
+ * Serveur HTTP local + clients dans le même process (mesure pessimiste : le client partage l'event loop)
+ *
+ * Usage: pnpm load:sse [connexions,...]   ex: pnpm load:sse 1000,5000
+ * Nécessite un ulimit -n supérieur à 2 × connexions.
+ */
+
+import { createServer, request, Agent } from 'node:http'
+import type { AddressInfo } from 'node:net'
+import { SSEHub, parseChannels } from '../server/utils/sse-hub'
+
+const LEVELS = (process.argv[2] || '1000,5000').split(',').map(Number).filter(Boolean)
+const BROADCASTS = 20
+const SLOW_READERS = 50
+const BURST_MESSAGES = 200
+
+interface LoadClient {
+  received: Map<number, number>
+  destroy: () => void
+}
+
+async function main() {
+  for (const connections of LEVELS) {
+    await runLevel(connections)
+  }
+}
+
+async function runLevel(connections: number) {
+  const hub = new SSEHub({ heartbeatMs: 5_000, maxBufferedBytes: 64 * 1024 })
+  const server = createServer((req, res) => {
+    const url = new URL(req.url || '/', 'http://localhost')
+    hub.connect(req, res, { channels: parseChannels(url.searchParams.get('channels')) })
+  })
+  await new Promise<void>(resolve => server.listen(0, '127.0.0.1', resolve))
+  const { port } = server.address() as AddressInfo
+  const agent = new Agent({ keepAlive: false, maxSockets: Infinity })
+
+  console.log(`\n🔌 ${connections} connexions (canal products) + ${SLOW_READERS} lecteurs bloqués`)
+  const connectStart = performance.now()
+  const clients = await Promise.all(
+    Array.from({ length: connections }, (_, i) => openClient(port, agent, i % 2 === 0 ? 'products' : 'products,bundles'))
+  )
+  const slowClients = await Promise.all(
+    Array.from({ length: SLOW_READERS }, () => openClient(port, agent, 'products,orders', true))
+  )
+  console.log(`   Connexion: ${(performance.now() - connectStart).toFixed(0)}ms, RSS ${(process.memoryUsage().rss / 1024 / 1024).toFixed(0)} MB`)
+
+  const broadcastTimes: number[] = []
+  const latencies: number[] = []
+  // Charge utile réaliste (~2 KB, comparable à un bundle:updated)
+  const payload = { products: Array.from({ length: 20 }, (_, i) => ({ id: `prod-${i}`, name: `Produit ${i}`, quantity: 10 })) }
+
+  for (let seq = 1; seq <= BROADCASTS; seq++) {
+    const sentAt = performance.now()
+    hub.broadcast({ type: 'product:updated', seq, sentAt, data: payload })
+    broadcastTimes.push(performance.now() - sentAt)
+
+    await waitFor(() => clients.every(client => client.received.has(seq)), 10_000)
+    for (const client of clients) {
+      const receivedAt = client.received.get(seq)
+      if (receivedAt !== undefined) latencies.push(receivedAt - sentAt)
+    }
+  }
+
+  // Rafale sur le canal orders (seuls les lecteurs bloqués y sont abonnés) : leur file sature
+  const blob = 'x'.repeat(32 * 1024)
+  for (let i = 0; i < BURST_MESSAGES; i++) {
+    hub.broadcast({ type: 'order:created', data: blob })
+    await new Promise(resolve => setImmediate(resolve))
+  }
+
+  const stats = hub.getStats()
+  console.log(`   broadcast() synchrone: p50 ${percentile(broadcastTimes, 50)}ms, p99 ${percentile(broadcastTimes, 99)}ms`)
+  console.log(`   Latence de réception:  p50 ${percentile(latencies, 50)}ms, p95 ${percentile(latencies, 95)}ms, p99 ${percentile(latencies, 99)}ms, max ${percentile(latencies, 100)}ms`)
+  console.log(`   Messages écrits ${stats.messagesWritten}, abandonnés ${stats.messagesDropped}, lecteurs lents déconnectés ${stats.slowDisconnects}`)
+  console.log(`   RSS ${(process.memoryUsage().rss / 1024 / 1024).toFixed(0)} MB`)
+
+  for (const client of [...clients, ...slowClients]) client.destroy()
+  hub.close()
+  agent.destroy()
+  await new Promise(resolve => server.close(resolve))
+}
+
+function openClient(port: number, agent: Agent, channels: string, paused = false): Promise<LoadClient> {
+  return new Promise((resolve, reject) => {
+    const received = new Map<number, number>()
+    const req = request({ port, host: '127.0.0.1', path: `/?channels=${channels}`, agent }, (res) => {
+      if (paused) {
+        // Lecteur bloqué : ne consomme jamais le flux, le buffer serveur se remplit
+        res.pause()
+        resolve({ received, destroy: () => req.destroy() })
+        return
+      }
+
+      let buffer = ''
+      res.setEncoding('utf8')
+      res.on('data', (chunk: string) => {
+        const now = performance.now()
+        buffer += chunk
+        let separator = buffer.indexOf('\n\n')
+        while (separator !== -1) {
+          const message = buffer.slice(0, separator)
+          buffer = buffer.slice(separator + 2)
+          const data = message.split('\n').find(line => line.startsWith('data: '))
+          if (data) {
+            const parsed = JSON.parse(data.slice(6))
+            if (parsed.seq) received.set(parsed.seq, now)
+          }
+          separator = buffer.indexOf('\n\n')
+        }
+      })
+      resolve({ received, destroy: () => req.destroy() })
+    })
+    req.on('error', reject)
+    req.end()
+  })
+}
+
+async function waitFor(condition: () => boolean, timeoutMs: number) {
+  const start = performance.now()
+  while (!condition()) {
+    if (performance.now() - start > timeoutMs) {
+      console.warn('   ⚠️ Timeout : certains clients n\'ont pas reçu le message')
+      return
+    }
+    await new Promise(resolve => setImmediate(resolve))
+  }
+}
+
+function percentile(values: number[], p: number): string {
+  if (values.length === 0) return '-'
+  const sorted = [...values].sort((a, b) => a - b)
+  const index = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)
+  return sorted[Math.max(0, index)].toFixed(2)
+}
+
+main().catch((error) => {
+  console.error('❌ Test de charge échoué:', error)
+  process.exit(1)
+})
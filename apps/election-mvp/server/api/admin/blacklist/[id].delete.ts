@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from "../../../utils/database"
+import { invalidateCatalogTags } from "../../../utils/catalog-cache"
 
 export default defineEventHandler(async (event) => {
   const startTime = Date.now()
@@ -53,6 +54,7 @@ export default defineEventHandler(async (event) => {
     }
 
     console.log(`✅ Retiré de la blacklist: ${decodedPublicId}`)
+    invalidateCatalogTags(['realisations'])
 
     return {
       success: true,
@@ -0,0 +1,22 @@
+/**
+ * API Route: GET /api/admin/cache-stats
+ * Statistiques du cache catalogue serveur (hits, misses, évictions)
+ */
+
+import { getCatalogCache } from "../../utils/catalog-cache"
+
+export default defineEventHandler(async (event) => {
+  const query = getQuery(event)
+  const includeEntries = query.entries === "true"
+
+  const cache = getCatalogCache()
+
+  setHeader(event, "Cache-Control", "no-cache")
+
+  return {
+    success: true,
+    stats: cache.getStats(),
+    entries: includeEntries ? cache.getEntries() : undefined,
+    timestamp: new Date().toISOString()
+  }
+})
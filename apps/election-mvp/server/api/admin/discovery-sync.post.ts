@@ -0,0 +1,49 @@
+/**
+ * API Route: POST /api/admin/discovery-sync
+ * Synchronise l'index auto-discovery Cloudinary (incrémental, ou complet avec ?full=true)
+ * Passe par la même file que le rafraîchissement en arrière-plan : jamais deux synchros concurrentes
+ */
+
+import { getDatabase, tableExists } from "../../utils/database"
+import { invalidateCatalogTags } from "../../utils/catalog-cache"
+import { runDiscoverySync, getDiscoveryState } from "../../utils/cloudinary-discovery-index"
+
+export default defineEventHandler(async (event) => {
+  const query = getQuery(event)
+  const full = query.full === "true"
+
+  const db = getDatabase()
+  if (!db) {
+    throw createError({
+      statusCode: 500,
+      statusMessage: 'Base de données non disponible'
+    })
+  }
+
+  if (!(await tableExists(db, 'cloudinary_discovery'))) {
+    throw createError({
+      statusCode: 409,
+      statusMessage: 'Index auto-discovery absent (appliquer la migration 008)'
+    })
+  }
+
+  try {
+    const result = await runDiscoverySync(db, { full }, () => invalidateCatalogTags(['realisations']))
+
+    setHeader(event, "Cache-Control", "no-cache")
+
+    return {
+      success: true,
+      result,
+      state: await getDiscoveryState(db),
+      timestamp: new Date().toISOString()
+    }
+  } catch (error: any) {
+    console.error('❌ Erreur POST /api/admin/discovery-sync:', error)
+    throw createError({
+      statusCode: 502,
+      statusMessage: 'Échec de la synchronisation Cloudinary',
+      data: { error: error?.message }
+    })
+  }
+})
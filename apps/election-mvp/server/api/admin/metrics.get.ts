@@ -0,0 +1,25 @@
+/**
+ * API Route: GET /api/admin/metrics
+ * Métriques des requêtes base (latences par requête normalisée, allers-retours par requête HTTP,
+ * requêtes lentes, N+1) au format texte Prometheus, ou en JSON avec ?format=json
+ */
+
+import { getQueryMetrics } from "@ns2po/database"
+
+export default defineEventHandler(async (event) => {
+  const metrics = getQueryMetrics()
+  const query = getQuery(event)
+
+  setHeader(event, "Cache-Control", "no-cache")
+
+  if (query.format === "json") {
+    return {
+      success: true,
+      stats: metrics.getSnapshot(Number(query.limit) || 50),
+      timestamp: new Date().toISOString()
+    }
+  }
+
+  setHeader(event, "Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+  return metrics.renderPrometheus()
+})
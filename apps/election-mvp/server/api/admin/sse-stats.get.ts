@@ -0,0 +1,16 @@
+/**
+ * API Route: GET /api/admin/sse-stats
+ * Statistiques du hub SSE (connexions par canal, messages abandonnés, rejeux)
+ */
+
+import { getSSEHub } from "../../utils/sse-hub"
+
+export default defineEventHandler(async (event) => {
+  setHeader(event, "Cache-Control", "no-cache")
+
+  return {
+    success: true,
+    stats: getSSEHub().getStats(),
+    timestamp: new Date().toISOString()
+  }
+})
@@ -3,7 +3,7 @@
  * Retourne le statut de synchronisation des données
  */
 
-import { getDatabase } from "../../../utils/database"
+import { getDatabase, getReplicaSync } from "../../../utils/database"
 
 export default defineEventHandler(async (event) => {
   const startTime = Date.now()
@@ -140,11 +140,15 @@ export default defineEventHandler(async (event) => {
       console.warn('⚠️ Impossible de récupérer les logs de sync:', error)
     }
 
+    // Réplica embarqué : fraîcheur des lectures locales par rapport au primaire
+    const replicaStatus = getReplicaSync()?.getStatus() || null
+
     // Statut global
     const globalStatus = {
       overall: 'operational',
       services: {
         turso: 'operational',
+        replica: replicaStatus ? replicaStatus.health : 'disabled',
         airtable: 'migrated' // Migration completed - Vue Query active
       },
       migration: {
@@ -159,7 +163,7 @@ export default defineEventHandler(async (event) => {
     const hasErrors = [stats.products, stats.bundles, stats.categories]
       .some(item => item.syncStatus === 'error')
 
-    if (hasErrors) {
+    if (hasErrors || (replicaStatus && replicaStatus.health !== 'up')) {
       globalStatus.overall = 'degraded'
     }
 
@@ -168,6 +172,7 @@ export default defineEventHandler(async (event) => {
       data: {
         status: globalStatus,
         stats,
+        replica: replicaStatus,
         lastUpdate: new Date().toISOString(),
         migration: {
           fromAirtable: true,
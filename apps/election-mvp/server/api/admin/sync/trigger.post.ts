@@ -1,12 +1,19 @@
 /**
  * API Admin: Déclenchement synchronisation manuelle
  * Permet de synchroniser les données depuis les sources externes
+ * En mode réplica embarqué, rapatrie immédiatement les écritures du primaire.
  */
 
+import { getReplicaSync } from "../../../utils/database"
+
 export default defineEventHandler(async (event) => {
   try {
     console.log('🔄 API Admin: Déclenchement synchronisation manuelle...')
 
+    // Réplica embarqué : synchronisation réelle (attendue, contrairement au webhook)
+    const replica = getReplicaSync()
+    const replicaResult = replica ? await replica.sync('admin') : null
+
     // Simulated sync process - À adapter selon les besoins futurs
     const syncResults = {
       timestamp: new Date().toISOString(),
@@ -27,7 +34,14 @@ export default defineEventHandler(async (event) => {
           synced: 0,
           errors: 0,
           duration: '0ms'
-        }
+        },
+        replica: replicaResult
+          ? {
+              framesSynced: replicaResult.framesSynced,
+              frameNo: replicaResult.frameNo,
+              duration: `${replicaResult.durationMs}ms`
+            }
+          : null
       }
     }
 
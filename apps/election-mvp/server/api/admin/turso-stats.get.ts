@@ -3,11 +3,13 @@
  * Récupère les statistiques temps réel de la base Turso
  */
 
+import { getRequestQueryStats } from "@ns2po/database";
 import { getDatabase } from "../../utils/database";
 
 export default defineEventHandler(async (event) => {
   try {
     const tursoClient = getDatabase()
+    const startTime = Date.now()
 
     if (!tursoClient) {
       throw new Error('Turso database not available')
@@ -21,29 +23,47 @@ export default defineEventHandler(async (event) => {
 
     const tables = tablesResult.rows.map(row => row.name as string)
 
-    // Compter les enregistrements par table
-    const tableStats = []
+    // Comptages + vérification de santé en un seul aller-retour
+    const tableStats: { name: string; records: number }[] = []
     let totalRecords = 0
+    let healthy = false
 
-    for (const table of tables) {
-      try {
-        const countResult = await tursoClient.execute({
-          sql: `SELECT COUNT(*) as count FROM ${table}`,
-          args: []
-        })
-        const count = Number(countResult.rows[0]?.count) || 0
-        tableStats.push({
-          name: table,
-          records: count
-        })
+    try {
+      const results = await tursoClient.batch([
+        ...tables.map(table => ({ sql: `SELECT COUNT(*) as count FROM "${table}"`, args: [] })),
+        { sql: "SELECT 1 as healthy", args: [] }
+      ], 'read')
+
+      tables.forEach((table, index) => {
+        const count = Number(results[index]?.rows[0]?.count) || 0
+        tableStats.push({ name: table, records: count })
         totalRecords += count
-      } catch (error) {
-        console.warn(`Could not count records for table ${table}:`, error)
-        tableStats.push({
-          name: table,
-          records: 0
-        })
+      })
+      healthy = (results[tables.length]?.rows.length || 0) > 0
+    } catch (batchError) {
+      // Une table illisible fait échouer tout le lot : repli table par table
+      console.warn('⚠️ Comptage groupé impossible, repli table par table:', batchError)
+
+      for (const table of tables) {
+        try {
+          const countResult = await tursoClient.execute({
+            sql: `SELECT COUNT(*) as count FROM "${table}"`,
+            args: []
+          })
+          const count = Number(countResult.rows[0]?.count) || 0
+          tableStats.push({ name: table, records: count })
+          totalRecords += count
+        } catch (error) {
+          console.warn(`Could not count records for table ${table}:`, error)
+          tableStats.push({ name: table, records: 0 })
+        }
       }
+
+      const healthCheck = await tursoClient.execute({
+        sql: "SELECT 1 as healthy",
+        args: []
+      })
+      healthy = healthCheck.rows.length > 0
     }
 
     // Statistiques par table importante
@@ -54,12 +74,6 @@ export default defineEventHandler(async (event) => {
       return acc
     }, {} as Record<string, number>)
 
-    // Vérification de la santé de la base
-    const healthCheck = await tursoClient.execute({
-      sql: "SELECT 1 as healthy",
-      args: []
-    })
-
     // Extract database info from environment
     const databaseUrl = process.env.TURSO_DATABASE_URL || ''
     const urlMatch = databaseUrl.match(/libsql:\/\/([^.]+)\.([^\/]+)/)
@@ -70,7 +84,7 @@ export default defineEventHandler(async (event) => {
       success: true,
       connection: {
         status: 'connected',
-        healthy: healthCheck.rows.length > 0,
+        healthy,
         lastCheck: new Date().toISOString(),
         databaseName,
         host
@@ -82,8 +96,9 @@ export default defineEventHandler(async (event) => {
         keyTables: keyStats
       },
       performance: {
-        responseTime: Date.now() - Date.now(), // Will be calculated properly
-        queriesExecuted: tables.length + 1
+        responseTime: Date.now() - startTime,
+        queriesExecuted: tables.length + 2,
+        roundTrips: getRequestQueryStats()?.roundTrips ?? null
       }
     }
 
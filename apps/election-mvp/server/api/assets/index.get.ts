@@ -59,12 +59,22 @@ export default defineEventHandler(async (event) => {
       }
     }
 
+    // Pagination keyset (?mode=cursor&cursor=...) pour la navigation profonde
+    if (query.mode === 'cursor') {
+      pagination.mode = 'cursor'
+      if (query.cursor && typeof query.cursor === 'string') {
+        pagination.cursor = query.cursor
+      }
+    }
+
     const result = await assetService.getAssets(filters, pagination)
 
     return {
       success: true,
       data: result,
-      message: `${result.assets.length} assets récupérés (page ${result.page}/${result.totalPages})`
+      message: pagination.mode === 'cursor'
+        ? `${result.assets.length} assets récupérés${result.hasNext ? ' (page suivante disponible)' : ''}`
+        : `${result.assets.length} assets récupérés (page ${result.page}/${result.totalPages})`
     }
 
   } catch (error: any) {
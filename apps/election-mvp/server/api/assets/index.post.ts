@@ -1,62 +1,48 @@
 /**
  * API POST /api/assets - Création d'un nouvel asset
- * Utilise upload direct vers Cloudinary puis enregistrement en base
+ * Upload en streaming vers Cloudinary (sans charger le fichier en mémoire) puis enregistrement en base
+ * Les champs folder et tags doivent précéder le fichier dans le formulaire (sinon 400) :
+ * ils sont transmis à Cloudinary à l'ouverture du flux d'upload.
  */
 
 import { assetService } from '../../services/assetService'
 import { cloudinaryService } from '../../utils/cloudinaryService'
+import { streamMultipartUpload } from '../../utils/streaming-upload'
 import type { UpdateAssetData } from '../../services/assetService'
 
-export default defineEventHandler(async (event) => {
-  try {
-    const formData = await readMultipartFormData(event)
+/**
+ * Parsing des tags (JSON ou liste séparée par des virgules)
+ */
+function parseTags(tagsString?: string): string[] {
+  if (!tagsString) return []
 
-    if (!formData || formData.length === 0) {
-      throw createError({
-        statusCode: 400,
-        statusMessage: 'Aucun fichier fourni'
-      })
-    }
+  try {
+    const tags = JSON.parse(tagsString)
+    if (Array.isArray(tags)) return tags
+  } catch {
+    // Format liste
+  }
+  return tagsString.split(',').map(tag => tag.trim()).filter(Boolean)
+}
 
-    const fileEntry = formData.find(entry => entry.name === 'file')
-    if (!fileEntry || !fileEntry.data) {
-      throw createError({
-        statusCode: 400,
-        statusMessage: 'Fichier manquant'
+export default defineEventHandler(async (event) => {
+  try {
+    // Upload vers Cloudinary au fil de la réception (file d'upload partagée)
+    console.log('📤 Upload vers Cloudinary (streaming)...')
+    const { upload: cloudinaryResult, fields } = await streamMultipartUpload(event.node.req, {
+      sink: options => cloudinaryService.createUploadStream(options),
+      uploadFields: ['folder', 'tags'],
+      uploadOptions: fields => ({
+        folder: fields.folder || 'ns2po/products',
+        tags: [...parseTags(fields.tags), 'ns2po', 'api-upload']
       })
-    }
-
-    // Récupération des métadonnées optionnelles
-    const getFormValue = (name: string): string | undefined => {
-      const entry = formData.find(e => e.name === name)
-      return entry?.data ? new TextDecoder().decode(entry.data) : undefined
-    }
-
-    const altText = getFormValue('alt_text')
-    const caption = getFormValue('caption')
-    const tagsString = getFormValue('tags')
-    const folder = getFormValue('folder') || 'ns2po/products'
-
-    // Parsing des tags
-    let tags: string[] = []
-    if (tagsString) {
-      try {
-        tags = JSON.parse(tagsString)
-        if (!Array.isArray(tags)) {
-          tags = tagsString.split(',').map(tag => tag.trim()).filter(Boolean)
-        }
-      } catch {
-        tags = tagsString.split(',').map(tag => tag.trim()).filter(Boolean)
-      }
-    }
-
-    // Upload vers Cloudinary
-    console.log('📤 Upload vers Cloudinary...')
-    const cloudinaryResult = await cloudinaryService.uploadFile(fileEntry.data, {
-      folder,
-      tags: [...tags, 'ns2po', 'api-upload']
     })
 
+    // Récupération des métadonnées optionnelles (y compris celles placées après le fichier)
+    const altText = fields.alt_text
+    const caption = fields.caption
+    const tags = parseTags(fields.tags)
+
     // Préparation des métadonnées
     const metadata: Partial<UpdateAssetData> = {}
     if (altText) metadata.alt_text = altText
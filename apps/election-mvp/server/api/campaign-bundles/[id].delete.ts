@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { invalidateCatalogTags } from "../../utils/catalog-cache"
 
 /**
  * Vérifie les contraintes référentielles avant suppression d'un bundle
@@ -137,6 +138,7 @@ export default defineEventHandler(async (event) => {
         })
 
         console.log(`✅ Bundle désactivé avec succès: ${bundleId} (${bundleName})`)
+        invalidateCatalogTags(['bundles'])
 
         const response = {
           success: true,
@@ -165,6 +167,7 @@ export default defineEventHandler(async (event) => {
         })
 
         console.log(`✅ Bundle supprimé avec succès: ${bundleId} (${bundleName})`)
+        invalidateCatalogTags(['bundles'])
 
         const response = {
           success: true,
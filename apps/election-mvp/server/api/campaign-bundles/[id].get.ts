@@ -5,6 +5,7 @@
  */
 
 import { getDatabase } from "../../utils/database";
+import { computeBundleTotals } from "@ns2po/pricing";
 import type { BundleApiResponse, CampaignBundle, BundleProduct as ExternalBundleProduct } from "@ns2po/types";
 import {
   adaptCampaignBundleToBundle,
@@ -149,7 +150,7 @@ export default defineEventHandler(async (event): Promise<BundleApiResponse> => {
         }))
 
         // Calculate totals
-        const originalTotal = externalProducts.reduce((sum, p) => sum + (p.basePrice * p.quantity), 0)
+        const originalTotal = computeBundleTotals(externalProducts).originalTotal
         campaignBundle.originalTotal = originalTotal
         campaignBundle.savings = Math.max(0, originalTotal - campaignBundle.estimatedTotal)
 
@@ -4,6 +4,8 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { createWriteBatch } from "../../utils/db-batch"
+import { bundleDiscountPercentage, computeBundleTotals } from "@ns2po/pricing"
 import { campaignBundleUpdateSchema, validateBundleProducts, validateBundleTotal, validateBundleBusinessRules, validateFeaturedBundleLimit } from "~/schemas/bundle"
 import { broadcastSSEEvent } from '~/server/api/sse'
 import { z } from "zod"
@@ -119,10 +121,10 @@ export default defineEventHandler(async (event) => {
       let basePrice = validatedData.originalTotal
 
       if (validatedData.products) {
-        const productsTotal = validatedData.products.reduce((total, product) => total + product.subtotal, 0)
+        const productsTotal = computeBundleTotals(validatedData.products).estimatedTotal
         calculatedTotal = productsTotal
         basePrice = validatedData.originalTotal || productsTotal
-        discountPercentage = basePrice > 0 ? ((basePrice - calculatedTotal) / basePrice * 100) : 0
+        discountPercentage = bundleDiscountPercentage(basePrice, calculatedTotal)
       }
 
       // Construire la requête UPDATE dynamiquement
@@ -183,12 +185,13 @@ export default defineEventHandler(async (event) => {
       updateFields.push('updated_at = CURRENT_TIMESTAMP')
       updateFields.push('version = version + 1')
 
+      // Toutes les écritures partent en un seul lot atomique (un aller-retour Turso)
+      const batch = createWriteBatch(db)
+
       if (updateFields.length > 2) { // Plus que juste updated_at et version
         updateArgs.push(bundleId) // Pour la clause WHERE
-        const sql = `UPDATE campaign_bundles SET ${updateFields.join(', ')} WHERE id = ?`
-
-        await db.execute({
-          sql,
+        batch.add({
+          sql: `UPDATE campaign_bundles SET ${updateFields.join(', ')} WHERE id = ?`,
           args: updateArgs
         })
       }
@@ -281,63 +284,30 @@ export default defineEventHandler(async (event) => {
           })
         }
 
-        // 🔧 Phase 3: Modification des données (maintenant sûre)
-        console.log('🔄 Phase 3: Suppression des anciens produits...')
-        try {
-          await db.execute({
-            sql: 'DELETE FROM bundle_products WHERE bundle_id = ?',
-            args: [bundleId]
-          })
-          console.log(`✅ Anciens produits du bundle ${bundleId} supprimés`)
-        } catch (deleteError) {
-          console.error('❌ Erreur lors de la suppression:', deleteError)
-          throw createError({
-            statusCode: 500,
-            statusMessage: 'Erreur lors de la suppression des anciens produits',
-            data: { error: deleteError.message }
-          })
-        }
-
-        // Phase 4: Insertion des nouveaux produits
-        console.log('🔄 Phase 4: Insertion des nouveaux produits...')
-        for (let i = 0; i < productIds.length; i++) {
-          const { id: productId, product } = productIds[i]
-
-          try {
-            await db.execute({
-              sql: `INSERT INTO bundle_products (
-                bundle_id, product_id, quantity, custom_price, is_required, display_order
-              ) VALUES (?, ?, ?, ?, ?, ?)`,
-              args: [
-                bundleId,
-                productId,
-                product.quantity,
-                product.basePrice,
-                product.isRequired !== false ? 1 : 0,
-                i + 1
-              ]
-            })
-          } catch (insertError) {
-            console.error(`❌ Erreur insertion produit ${productId}:`, insertError)
-            // Rollback en supprimant les insertions partielles
-            await db.execute({
-              sql: 'DELETE FROM bundle_products WHERE bundle_id = ?',
-              args: [bundleId]
-            })
-            throw createError({
-              statusCode: 500,
-              statusMessage: `Erreur lors de l'insertion du produit ${productId}`,
-              data: { error: insertError.message, productId }
-            })
-          }
-        }
+        // 🔧 Phase 3: Remplacement des produits (DELETE + INSERTs dans le même lot)
+        console.log(`🔄 Phase 3: Remplacement des produits (${productIds.length} insertions groupées)...`)
+        batch.add({
+          sql: 'DELETE FROM bundle_products WHERE bundle_id = ?',
+          args: [bundleId]
+        })
+        batch.addAll(productIds.map(({ id: productId, product }, i) => ({
+          sql: `INSERT INTO bundle_products (
+            bundle_id, product_id, quantity, custom_price, is_required, display_order
+          ) VALUES (?, ?, ?, ?, ?, ?)`,
+          args: [
+            bundleId,
+            productId,
+            product.quantity,
+            product.basePrice,
+            product.isRequired !== false ? 1 : 0,
+            i + 1
+          ]
+        })))
         console.log('--- Fin de la mise à jour des produits du bundle ---')
       }
 
-      console.log(`✅ Bundle mis à jour avec succès: ${bundleId}`)
-
-      // Récupérer le bundle mis à jour avec ses produits
-      const updatedBundleResult = await db.execute({
+      // Relecture du bundle et de ses produits dans le même lot
+      const bundleIndex = batch.add({
         sql: `SELECT
           cb.id, cb.name, cb.description, cb.target_audience as targetAudience,
           cb.base_price as basePrice, cb.discount_percentage as discountPercentage,
@@ -348,17 +318,7 @@ export default defineEventHandler(async (event) => {
         args: [bundleId]
       })
 
-      if (updatedBundleResult.rows.length === 0) {
-        throw createError({
-          statusCode: 404,
-          statusMessage: 'Bundle non trouvé après mise à jour'
-        })
-      }
-
-      const bundleData = updatedBundleResult.rows[0]
-
-      // Récupérer les produits associés
-      const productsResult = await db.execute({
+      const productsIndex = batch.add({
         sql: `
           SELECT
             bp.product_id, p.name as product_name,
@@ -374,6 +334,23 @@ export default defineEventHandler(async (event) => {
         args: [bundleId]
       })
 
+      // En cas d'échec le lot est annulé en entier : ni le bundle ni ses produits ne sont modifiés
+      const results = await batch.commit()
+
+      console.log(`✅ Bundle mis à jour avec succès: ${bundleId} (${results.length} instructions, 1 aller-retour)`)
+
+      const updatedBundleResult = results[bundleIndex]
+      const productsResult = results[productsIndex]
+
+      if (updatedBundleResult.rows.length === 0) {
+        throw createError({
+          statusCode: 404,
+          statusMessage: 'Bundle non trouvé après mise à jour'
+        })
+      }
+
+      const bundleData = updatedBundleResult.rows[0]
+
       const products = productsResult.rows.map((row: any) => ({
         id: row.product_id,
         name: row.product_name,
@@ -385,7 +362,7 @@ export default defineEventHandler(async (event) => {
 
       // Calculer les totaux
       const estimatedTotal = Number(bundleData.finalPrice) || 0
-      const originalTotal = products.reduce((sum: number, p: any) => sum + p.subtotal, 0)
+      const originalTotal = computeBundleTotals(products).originalTotal
       const savings = originalTotal - estimatedTotal
 
       const response = {
@@ -5,6 +5,8 @@
 
 // Note: Airtable service removed - now using Turso-first → Static fallback architecture
 import { getDatabase } from "../../utils/database";
+import { cachedCatalogQuery, catalogCacheKey } from "../../utils/catalog-cache";
+import { computeBundleTotals } from "@ns2po/pricing";
 import type { BundleApiResponse } from "@ns2po/types";
 
 // Fallback statique pour campaign bundles
@@ -74,90 +76,95 @@ export default defineEventHandler(async (event): Promise<BundleApiResponse> => {
       try {
         console.log('🎯 Tentative Turso...')
 
-        let sql = `
-          SELECT
-            cb.id, cb.name, cb.description, cb.target_audience as targetAudience,
-            cb.base_price as basePrice, cb.discount_percentage as discountPercentage,
-            cb.final_price as finalPrice, cb.is_active as isActive,
-            cb.display_order as displayOrder, cb.icon, cb.color, cb.features,
-            cb.version, cb.created_at as createdAt, cb.updated_at as updatedAt
-          FROM campaign_bundles cb
-          WHERE cb.is_active = 1
-        `
-
-        const conditions = []
-        const args = []
-
-        if (audience && audience !== "all") {
-          conditions.push("cb.target_audience = ?")
-          args.push(audience)
-        }
-
-        if (conditions.length > 0) {
-          sql += " AND " + conditions.join(" AND ")
-        }
-
-        sql += " ORDER BY cb.display_order ASC, cb.created_at DESC"
-
-        const result = await tursoClient.execute({ sql, args })
-
-        bundles = await Promise.all(result.rows.map(async (row: any) => {
-          // Récupération des produits du bundle depuis la table bundle_products
-          const productsResult = await tursoClient.execute({
-            sql: `
-              SELECT
-                bp.product_id, p.name as product_name,
-                COALESCE(bp.custom_price, p.base_price) as basePrice,
-                bp.quantity,
-                (COALESCE(bp.custom_price, p.base_price) * bp.quantity) as subtotal,
-                bp.is_required
-              FROM bundle_products bp
-              LEFT JOIN products p ON bp.product_id = p.id
-              WHERE bp.bundle_id = ?
-              ORDER BY bp.display_order ASC
-            `,
-            args: [row.id]
-          })
-
-          const products = productsResult.rows.map((productRow: any) => ({
-            id: productRow.product_id,
-            name: productRow.product_name,
-            basePrice: Number(productRow.basePrice) || 0,
-            quantity: Number(productRow.quantity) || 1,
-            subtotal: Number(productRow.subtotal) || 0,
-            isRequired: Boolean(productRow.is_required)
-          }))
+        const cacheKey = catalogCacheKey('bundles:active', { audience: audience || 'all' })
+        const cachedResult = await cachedCatalogQuery(cacheKey, async () => {
+          let sql = `
+            SELECT
+              cb.id, cb.name, cb.description, cb.target_audience as targetAudience,
+              cb.base_price as basePrice, cb.discount_percentage as discountPercentage,
+              cb.final_price as finalPrice, cb.is_active as isActive,
+              cb.display_order as displayOrder, cb.icon, cb.color, cb.features,
+              cb.version, cb.created_at as createdAt, cb.updated_at as updatedAt
+            FROM campaign_bundles cb
+            WHERE cb.is_active = 1
+          `
+
+          const conditions = []
+          const args = []
+
+          if (audience && audience !== "all") {
+            conditions.push("cb.target_audience = ?")
+            args.push(audience)
+          }
 
-          // Calculer les totaux
-          const estimatedTotal = Number(row.finalPrice) || 0
-          const originalTotal = products.reduce((sum, p) => sum + p.subtotal, 0)
-          const savings = originalTotal - estimatedTotal
-
-          return {
-            id: String(row.id),
-            name: row.name,
-            description: row.description || '',
-            targetAudience: row.targetAudience,
-            budgetRange: estimatedTotal < 20000 ? 'starter' : estimatedTotal < 50000 ? 'standard' : 'premium',
-            products,
-            estimatedTotal,
-            originalTotal,
-            savings: Math.max(0, savings),
-            popularity: 90, // Valeur par défaut, pourrait être calculée
-            isActive: Boolean(row.isActive),
-            isFeatured: row.displayOrder <= 3, // Les 3 premiers sont featured
-            tags: row.features ? JSON.parse(row.features) : [],
-            createdAt: row.createdAt,
-            updatedAt: row.updatedAt,
-            icon: row.icon,
-            color: row.color,
-            version: Number(row.version) || 1
+          if (conditions.length > 0) {
+            sql += " AND " + conditions.join(" AND ")
           }
-        }))
+
+          sql += " ORDER BY cb.display_order ASC, cb.created_at DESC"
+
+          const result = await tursoClient.execute({ sql, args })
+
+          return Promise.all(result.rows.map(async (row: any) => {
+            // Récupération des produits du bundle depuis la table bundle_products
+            const productsResult = await tursoClient.execute({
+              sql: `
+                SELECT
+                  bp.product_id, p.name as product_name,
+                  COALESCE(bp.custom_price, p.base_price) as basePrice,
+                  bp.quantity,
+                  (COALESCE(bp.custom_price, p.base_price) * bp.quantity) as subtotal,
+                  bp.is_required
+                FROM bundle_products bp
+                LEFT JOIN products p ON bp.product_id = p.id
+                WHERE bp.bundle_id = ?
+                ORDER BY bp.display_order ASC
+              `,
+              args: [row.id]
+            })
+
+            const products = productsResult.rows.map((productRow: any) => ({
+              id: productRow.product_id,
+              name: productRow.product_name,
+              basePrice: Number(productRow.basePrice) || 0,
+              quantity: Number(productRow.quantity) || 1,
+              subtotal: Number(productRow.subtotal) || 0,
+              isRequired: Boolean(productRow.is_required)
+            }))
+
+            // Calculer les totaux
+            const estimatedTotal = Number(row.finalPrice) || 0
+            const originalTotal = computeBundleTotals(products).originalTotal
+            const savings = originalTotal - estimatedTotal
+
+            return {
+              id: String(row.id),
+              name: row.name,
+              description: row.description || '',
+              targetAudience: row.targetAudience,
+              budgetRange: estimatedTotal < 20000 ? 'starter' : estimatedTotal < 50000 ? 'standard' : 'premium',
+              products,
+              estimatedTotal,
+              originalTotal,
+              savings: Math.max(0, savings),
+              popularity: 90, // Valeur par défaut, pourrait être calculée
+              isActive: Boolean(row.isActive),
+              isFeatured: row.displayOrder <= 3, // Les 3 premiers sont featured
+              tags: row.features ? JSON.parse(row.features) : [],
+              createdAt: row.createdAt,
+              updatedAt: row.updatedAt,
+              icon: row.icon,
+              color: row.color,
+              version: Number(row.version) || 1
+            }
+          }))
+        }, { tags: ['bundles', 'products'] })
+
+        bundles = cachedResult.data
 
         source = 'turso'
         const duration = Date.now() - startTime
-        console.log(`✅ Turso OK: ${bundles.length} bundles en ${duration}ms`)
+        console.log(`✅ Turso OK: ${bundles.length} bundles en ${duration}ms${cachedResult.cached ? ' (cache)' : ''}`)
 
       } catch (tursoError) {
         console.warn('⚠️ Turso failed, using static fallback...', tursoError)
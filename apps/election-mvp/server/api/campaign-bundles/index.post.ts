@@ -4,6 +4,9 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { invalidateCatalogTags } from "../../utils/catalog-cache"
+import { createWriteBatch } from "../../utils/db-batch"
+import { bundleDiscountPercentage, computeBundleTotals } from "@ns2po/pricing"
 import { campaignBundleSchema, validateBundleProducts, validateBundleTotal, validateBundleBusinessRules, validateFeaturedBundleLimit } from "~/schemas/bundle"
 import { z } from "zod"
 
@@ -69,21 +72,25 @@ export default defineEventHandler(async (event) => {
     }
 
     // Calculs automatiques
-    const calculatedTotal = validatedData.products.reduce((total, product) => total + product.subtotal, 0)
+    const calculatedTotal = computeBundleTotals(validatedData.products).estimatedTotal
     const savings = (validatedData.originalTotal || 0) - calculatedTotal
 
     // Transaction pour créer le bundle et ses produits
     try {
       // Calcul du prix de base et remise
       const originalTotal = validatedData.originalTotal || calculatedTotal
-      const discountPercentage = originalTotal > 0 ? ((originalTotal - calculatedTotal) / originalTotal * 100) : 0
+      const discountPercentage = bundleDiscountPercentage(originalTotal, calculatedTotal)
+
+      // Bundle et produits envoyés en un seul lot atomique (un aller-retour, rollback complet en cas d'erreur)
+      const batch = createWriteBatch(db)
 
       // 1. Créer le bundle principal
-      const bundleResult = await db.execute({
+      const bundleIndex = batch.add({
         sql: `INSERT INTO campaign_bundles (
           name, description, target_audience, base_price, discount_percentage,
           is_active, display_order, icon, color, features
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)`,
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        RETURNING id`,
         args: [
           validatedData.name,
           validatedData.description,
@@ -98,27 +105,27 @@ export default defineEventHandler(async (event) => {
         ]
       })
 
-      const newBundleId = bundleResult.lastInsertRowid
-
       // 2. Créer les produits du bundle
-      for (let i = 0; i < validatedData.products.length; i++) {
-        const product = validatedData.products[i]
-        await db.execute({
-          sql: `INSERT INTO bundle_products (
-            bundle_id, product_id, quantity, custom_price, is_required, display_order
-          ) VALUES (?, ?, ?, ?, ?, ?)`,
-          args: [
-            newBundleId,
-            product.id,
-            product.quantity,
-            product.basePrice, // Utiliser comme prix custom si différent du prix produit
-            product.isRequired !== false ? 1 : 0, // true par défaut
-            i + 1 // Ordre basé sur la position dans le tableau
-          ]
-        })
-      }
+      // L'id n'est pas connu côté client : campaign_bundles est en AUTOINCREMENT,
+      // sqlite_sequence contient donc l'id qui vient d'être inséré dans ce même lot
+      batch.addAll(validatedData.products.map((product, i) => ({
+        sql: `INSERT INTO bundle_products (
+          bundle_id, product_id, quantity, custom_price, is_required, display_order
+        ) VALUES ((SELECT seq FROM sqlite_sequence WHERE name = 'campaign_bundles'), ?, ?, ?, ?, ?)`,
+        args: [
+          product.id,
+          product.quantity,
+          product.basePrice, // Utiliser comme prix custom si différent du prix produit
+          product.isRequired !== false ? 1 : 0, // true par défaut
+          i + 1 // Ordre basé sur la position dans le tableau
+        ]
+      })))
+
+      const results = await batch.commit()
+      const newBundleId = results[bundleIndex].rows[0]?.id
 
       console.log(`✅ Bundle créé avec succès: ${newBundleId}`)
+      invalidateCatalogTags(['bundles'])
 
       // Retourner le bundle créé
       const response = {
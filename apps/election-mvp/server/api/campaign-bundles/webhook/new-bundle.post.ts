@@ -3,6 +3,9 @@
  * Webhook appelé quand un nouveau bundle est créé dans Airtable
  */
 
+import { invalidateCatalogTags } from "../../../utils/catalog-cache";
+import { syncReplica } from "../../../utils/database";
+
 interface NewBundlePayload {
   bundle_id: string;
   name: string;
@@ -40,9 +43,22 @@ export default defineEventHandler(async (event) => {
     const actions = [];
 
     try {
+      // 0. Réplica embarqué : rapatrier le bundle avant que le cache ne soit reconstruit
+      try {
+        const replicaResult = await syncReplica("webhook:new-bundle");
+        if (replicaResult) {
+          actions.push(`Réplica synchronisé (${replicaResult.framesSynced} frames, ${replicaResult.durationMs}ms)`);
+        }
+      } catch (syncError) {
+        // Le sync périodique rattrapera : on n'échoue pas le webhook pour autant
+        console.warn("⚠️ Synchronisation réplica impossible:", syncError);
+        actions.push("Synchronisation réplica reportée");
+      }
+
       // 1. Invalidation du cache général
       console.log("🗑️ Invalidation cache général...");
-      actions.push("Cache général invalidé");
+      const invalidated = invalidateCatalogTags(['bundles']);
+      actions.push(`Cache général invalidé (${invalidated} entrées)`);
 
       // 2. Préparation du cache pour le nouveau bundle
       console.log("📥 Préparation cache nouveau bundle...");
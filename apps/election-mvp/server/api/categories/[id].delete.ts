@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { invalidateCatalogTags } from "../../utils/catalog-cache"
 
 export default defineEventHandler(async (event) => {
   const startTime = Date.now()
@@ -111,6 +112,7 @@ export default defineEventHandler(async (event) => {
       })
 
       console.log(`✅ Catégorie supprimée avec succès: ${categoryId} (${categoryName})`)
+      invalidateCatalogTags(['categories', 'products'])
 
       const response = {
         success: true,
@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { invalidateCatalogTags } from "../../utils/catalog-cache"
 import { z } from "zod"
 
 // Schéma de validation pour mise à jour de catégorie
@@ -193,6 +194,7 @@ export default defineEventHandler(async (event) => {
       }
 
       console.log(`✅ Catégorie mise à jour avec succès: ${categoryId}`)
+      invalidateCatalogTags(['categories', 'products'])
 
       // Récupérer la catégorie mise à jour
       const updatedCategoryResult = await db.execute({
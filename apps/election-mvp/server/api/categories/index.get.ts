@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from '../../utils/database'
+import { cachedCatalogQuery, catalogCacheKey } from '../../utils/catalog-cache'
 
 // Fallback statique minimal pour résilience
 const STATIC_CATEGORIES_FALLBACK = [
@@ -67,93 +68,98 @@ export default defineEventHandler(async (event) => {
       try {
         console.log('🎯 Tentative Turso categories...')
 
-        let sql = `
-          SELECT
-            c.id, c.name, c.slug, c.description, c.parent_id as parentId,
-            c.icon, c.color, c.sort_order as sortOrder, c.is_active as isActive,
-            c.created_at as createdAt, c.updated_at as updatedAt,
-            p.name as parentName
-          FROM categories c
-          LEFT JOIN categories p ON c.parent_id = p.id
-        `
-
-        const conditions = []
-        const args = []
-
-        if (activeOnly) {
-          conditions.push("c.is_active = 1")
-        }
-
-        if (conditions.length > 0) {
-          sql += " WHERE " + conditions.join(" AND ")
-        }
-
-        sql += " ORDER BY COALESCE(p.sort_order, c.sort_order), c.sort_order, c.name"
-
-        const result = await tursoClient.execute({ sql, args })
-
-        if (flat) {
-          // Mode plat : toutes les catégories au même niveau
-          categories = result.rows.map((row: any) => ({
-            id: String(row.id),
-            name: row.name,
-            slug: row.slug,
-            description: row.description || '',
-            parentId: row.parentId,
-            parentName: row.parentName,
-            icon: row.icon,
-            color: row.color,
-            sortOrder: Number(row.sortOrder) || 0,
-            isActive: Boolean(row.isActive),
-            createdAt: row.createdAt,
-            updatedAt: row.updatedAt
-          }))
-        } else {
-          // Mode hiérarchique : catégories avec sous-catégories
-          const categoryMap = new Map()
-          const rootCategories = []
-
-          // Premier passage : créer toutes les catégories
-          result.rows.forEach((row: any) => {
-            const category = {
+        const cacheKey = catalogCacheKey('categories', { flat, activeOnly })
+        const cachedResult = await cachedCatalogQuery(cacheKey, async () => {
+          let sql = `
+            SELECT
+              c.id, c.name, c.slug, c.description, c.parent_id as parentId,
+              c.icon, c.color, c.sort_order as sortOrder, c.is_active as isActive,
+              c.created_at as createdAt, c.updated_at as updatedAt,
+              p.name as parentName
+            FROM categories c
+            LEFT JOIN categories p ON c.parent_id = p.id
+          `
+
+          const conditions = []
+          const args = []
+
+          if (activeOnly) {
+            conditions.push("c.is_active = 1")
+          }
+
+          if (conditions.length > 0) {
+            sql += " WHERE " + conditions.join(" AND ")
+          }
+
+          sql += " ORDER BY COALESCE(p.sort_order, c.sort_order), c.sort_order, c.name"
+
+          const result = await tursoClient.execute({ sql, args })
+
+          if (flat) {
+            // Mode plat : toutes les catégories au même niveau
+            return result.rows.map((row: any) => ({
               id: String(row.id),
               name: row.name,
               slug: row.slug,
               description: row.description || '',
               parentId: row.parentId,
+              parentName: row.parentName,
               icon: row.icon,
               color: row.color,
               sortOrder: Number(row.sortOrder) || 0,
               isActive: Boolean(row.isActive),
               createdAt: row.createdAt,
-              updatedAt: row.updatedAt,
-              subcategories: []
-            }
+              updatedAt: row.updatedAt
+            }))
+          } else {
+            // Mode hiérarchique : catégories avec sous-catégories
+            const categoryMap = new Map()
+            const rootCategories = []
+
+            // Premier passage : créer toutes les catégories
+            result.rows.forEach((row: any) => {
+              const category = {
+                id: String(row.id),
+                name: row.name,
+                slug: row.slug,
+                description: row.description || '',
+                parentId: row.parentId,
+                icon: row.icon,
+                color: row.color,
+                sortOrder: Number(row.sortOrder) || 0,
+                isActive: Boolean(row.isActive),
+                createdAt: row.createdAt,
+                updatedAt: row.updatedAt,
+                subcategories: []
+              }
 
-            categoryMap.set(category.id, category)
+              categoryMap.set(category.id, category)
 
-            if (!category.parentId) {
-              rootCategories.push(category)
-            }
-          })
+              if (!category.parentId) {
+                rootCategories.push(category)
+              }
+            })
 
-          // Deuxième passage : associer les sous-catégories
-          result.rows.forEach((row: any) => {
-            if (row.parentId) {
-              const parent = categoryMap.get(row.parentId)
-              const child = categoryMap.get(String(row.id))
-              if (parent && child) {
-                parent.subcategories.push(child)
+            // Deuxième passage : associer les sous-catégories
+            result.rows.forEach((row: any) => {
+              if (row.parentId) {
+                const parent = categoryMap.get(row.parentId)
+                const child = categoryMap.get(String(row.id))
+                if (parent && child) {
+                  parent.subcategories.push(child)
+                }
               }
-            }
-          })
+            })
+
+            return rootCategories
+          }
+        }, { tags: ['categories'] })
 
-          categories = rootCategories
-        }
+        categories = cachedResult.data
 
         source = 'turso'
         const duration = Date.now() - startTime
-        console.log(`✅ Turso OK: ${categories.length} catégories en ${duration}ms`)
+        console.log(`✅ Turso OK: ${categories.length} catégories en ${duration}ms${cachedResult.cached ? ' (cache)' : ''}`)
 
       } catch (tursoError) {
         console.warn('⚠️ Turso failed, using static fallback...', tursoError)
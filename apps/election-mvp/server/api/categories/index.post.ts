@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { invalidateCatalogTags } from "../../utils/catalog-cache"
 import { z } from "zod"
 
 // Schéma de validation pour création de catégorie
@@ -107,6 +108,7 @@ export default defineEventHandler(async (event) => {
       })
 
       console.log(`✅ Catégorie créée avec succès: ${categoryId}`)
+      invalidateCatalogTags(['categories', 'products'])
 
       // Récupérer la catégorie créée avec les détails du parent
       const categoryResult = await db.execute({
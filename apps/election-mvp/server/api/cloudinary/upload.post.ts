@@ -1,84 +1,43 @@
 /**
  * API Route: POST /api/cloudinary/upload
- * Upload d'images vers Cloudinary avec signature sécurisée
+ * Upload d'images vers Cloudinary en streaming (mémoire bornée, file d'upload partagée)
+ * preset et folder doivent précéder le fichier dans le formulaire (ou être passés en query), sinon 400.
  */
 
-import { v2 as cloudinary } from 'cloudinary'
-import type { CloudinaryUploadResult } from '../../../utils/cloudinary'
+import { cloudinaryService } from '../../utils/cloudinaryService'
+import { streamMultipartUpload } from '../../utils/streaming-upload'
+import { assetService } from '../../services/assetService'
 import { buildCloudinaryUrl } from '../../../utils/cloudinary'
 
+// Validation du type de fichier
+const ALLOWED_TYPES = ['image/jpeg', 'image/png', 'image/webp', 'image/svg+xml']
+
 export default defineEventHandler(async (event) => {
   try {
-    const config = useRuntimeConfig()
-    
-    // Configuration Cloudinary
-    cloudinary.config({
-      cloud_name: config.cloudinaryCloudName,
-      api_key: config.cloudinaryApiKey,
-      api_secret: config.cloudinaryApiSecret
-    })
+    const query = getQuery(event)
 
-    // Récupération du fichier depuis le form data
-    const form = await readMultipartFormData(event)
-    
-    if (!form || !form.length) {
-      throw createError({
-        statusCode: 400,
-        statusMessage: 'Aucun fichier fourni'
-      })
-    }
+    console.log('📤 Upload vers Cloudinary (streaming)...')
 
-    const fileData = form.find(field => field.name === 'file')
-    const folder = form.find(field => field.name === 'folder')?.data?.toString() || 'ns2po-election'
-    const preset = form.find(field => field.name === 'preset')?.data?.toString() || 'default'
+    const { upload: result } = await streamMultipartUpload(event.node.req, {
+      sink: options => cloudinaryService.createUploadStream({ tags: [], ...options }),
+      allowedTypes: ALLOWED_TYPES,
+      uploadFields: ['folder', 'preset'],
+      uploadOptions: (fields) => {
+        const folder = fields.folder || (query.folder as string) || 'ns2po-election'
+        const preset = fields.preset || (query.preset as string) || 'default'
 
-    if (!fileData || !fileData.data) {
-      throw createError({
-        statusCode: 400,
-        statusMessage: 'Fichier invalide'
-      })
-    }
+        // Options d'upload selon le preset
+        return getUploadOptionsForPreset(preset, folder)
+      }
+    })
 
-    // Validation du type de fichier
-    const allowedTypes = ['image/jpeg', 'image/png', 'image/webp', 'image/svg+xml']
-    if (fileData.type && !allowedTypes.includes(fileData.type)) {
-      throw createError({
-        statusCode: 400,
-        statusMessage: 'Type de fichier non supporté. Formats autorisés: JPEG, PNG, WebP, SVG'
-      })
-    }
+    console.log('✅ Upload Cloudinary réussi:', result.public_id)
 
-    // Options d'upload selon le preset
-    const uploadOptions = getUploadOptionsForPreset(preset, folder)
-
-    console.log('📤 Upload vers Cloudinary...')
-
-    // Upload vers Cloudinary avec timeout
-    const result = await Promise.race([
-      new Promise<CloudinaryUploadResult>((resolve, reject) => {
-        cloudinary.uploader.upload_stream(
-          uploadOptions,
-          (error, result) => {
-            if (error) {
-              console.error('❌ Erreur upload Cloudinary:', error)
-              reject(error)
-            } else if (result) {
-              console.log('✅ Upload Cloudinary réussi:', result.public_id)
-              resolve(result as CloudinaryUploadResult)
-            } else {
-              console.error('❌ Résultat upload vide')
-              reject(new Error('Résultat upload vide'))
-            }
-          }
-        ).end(fileData.data)
-      }),
-      new Promise<never>((_, reject) => {
-        setTimeout(() => {
-          console.error('⏰ Timeout upload Cloudinary (30s)')
-          reject(new Error('Timeout - Upload vers Cloudinary trop long (30s)'))
-        }, 30000)
-      })
-    ])
+    // Enregistrement dans la médiathèque ; l'image est déjà sur Cloudinary, un échec ici n'annule pas l'upload
+    const asset = await assetService.createAsset(result).catch((error) => {
+      console.warn('⚠️ Asset non enregistré en base:', error?.message || error)
+      return null
+    })
 
     return {
       success: true,
@@ -91,6 +50,7 @@ export default defineEventHandler(async (event) => {
         format: result.format,
         bytes: result.bytes,
         version: result.version,
+        asset_id: asset?.id ?? null,
         // URLs transformées courantes
         thumbnail: buildCloudinaryUrl(result.public_id, { 
           width: 300, 
@@ -3,7 +3,7 @@
  * Health check pour monitoring de l'infrastructure Turso-first
  */
 
-import { getDatabase } from '../utils/database'
+import { getDatabase, getReplicaSync } from '../utils/database'
 
 export default defineEventHandler(async (event) => {
   const startTime = Date.now()
@@ -27,7 +27,8 @@ export default defineEventHandler(async (event) => {
             name: 'turso',
             status: 'up',
             responseTime: Date.now() - startTurso,
-            url: process.env.TURSO_DATABASE_URL?.split('@')[1] || 'masked'
+            url: process.env.TURSO_DATABASE_URL?.split('@')[1] || 'masked',
+            mode: getReplicaSync() ? 'embedded-replica' : 'remote'
           }
         } catch (error) {
           return {
@@ -36,6 +37,23 @@ export default defineEventHandler(async (event) => {
             error: error instanceof Error ? error.message : 'Erreur inconnue'
           }
         }
+      })(),
+
+      // Réplica embarqué : fraîcheur des données locales (absent si la base est distante)
+      (async () => {
+        const replica = getReplicaSync()
+        if (!replica) return null
+
+        const status = replica.getStatus()
+        return {
+          name: 'turso-replica',
+          status: status.health === 'up' ? 'up' : status.health === 'stale' ? 'partial' : 'down',
+          stalenessMs: status.stalenessMs,
+          staleAfterMs: status.staleAfterMs,
+          lastSync: status.lastSync?.at || null,
+          syncing: status.syncing,
+          error: status.health === 'up' ? undefined : status.lastError?.message
+        }
       })()
     ])
 
@@ -44,14 +62,14 @@ export default defineEventHandler(async (event) => {
       if (result.status === 'fulfilled') {
         return result.value
       } else {
-        const serviceNames = ['turso']
+        const serviceNames = ['turso', 'turso-replica']
         return {
           name: serviceNames[index] || `service-${index}`,
           status: 'error',
           error: result.reason
         }
       }
-    })
+    }).filter(service => service !== null)
 
     // Statut global
     const allUp = services.every(service => service.status === 'up')
@@ -129,6 +147,14 @@ function generateRecommendations(services: any[]): string[] {
     recommendations.push('Tous les APIs utilisent le mode fallback statique')
   }
 
+  const replicaService = services.find(s => s.name === 'turso-replica')
+
+  if (replicaService?.status === 'partial') {
+    recommendations.push('Réplica embarqué en retard : vérifier la connectivité vers le primaire Turso')
+  } else if (replicaService?.status === 'down') {
+    recommendations.push('Réplica embarqué jamais synchronisé : vérifier TURSO_DATABASE_URL et TURSO_REPLICA_PATH')
+  }
+
   if (services.some(s => s.responseTime && s.responseTime > 2000)) {
     recommendations.push('Performances dégradées détectées')
   }
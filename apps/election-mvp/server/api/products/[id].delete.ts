@@ -6,6 +6,7 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { invalidateCatalogTags } from "../../utils/catalog-cache"
 import { assetService } from "../../services/assetService"
 
 export default defineEventHandler(async (event) => {
@@ -120,6 +121,7 @@ export default defineEventHandler(async (event) => {
       })
 
       console.log(`✅ Produit supprimé avec succès: ${productId} (${productName})`)
+      invalidateCatalogTags(['products', 'bundles'])
 
       const response = {
         success: true,
@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { createWriteBatch } from "../../utils/db-batch"
 import { z } from "zod"
 import { broadcastSSEEvent } from '~/server/api/sse'
 
@@ -76,20 +77,11 @@ export default defineEventHandler(async (event) => {
       })
     }
 
-    // Vérifier que le produit existe
-    const existingProduct = await db.execute({
-      sql: 'SELECT id, name FROM products WHERE id = ?',
-      args: [productId]
-    })
-
-    if (existingProduct.rows.length === 0) {
-      throw createError({
-        statusCode: 404,
-        statusMessage: 'Produit non trouvé'
-      })
-    }
-
     try {
+      // UPDATE et relecture partent dans le même lot : l'existence du produit
+      // est vérifiée par la relecture, sans SELECT préalable
+      const batch = createWriteBatch(db)
+
       // Construire la requête UPDATE dynamiquement
       const updateFields = []
       const updateArgs = []
@@ -186,16 +178,14 @@ export default defineEventHandler(async (event) => {
         updateArgs.push(productId) // Pour la clause WHERE
         const sql = `UPDATE products SET ${updateFields.join(', ')} WHERE id = ?`
 
-        await db.execute({
+        batch.add({
           sql,
           args: updateArgs
         })
       }
 
-      console.log(`✅ Produit mis à jour avec succès: ${productId}`)
-
       // Récupérer le produit mis à jour
-      const updatedProductResult = await db.execute({
+      const selectIndex = batch.add({
         sql: `SELECT
           id, name, description, category, subcategory,
           base_price as basePrice, min_quantity as minQuantity,
@@ -207,13 +197,18 @@ export default defineEventHandler(async (event) => {
         args: [productId]
       })
 
+      const results = await batch.commit()
+      const updatedProductResult = results[selectIndex]
+
       if (updatedProductResult.rows.length === 0) {
         throw createError({
           statusCode: 404,
-          statusMessage: 'Produit non trouvé après mise à jour'
+          statusMessage: 'Produit non trouvé'
         })
       }
 
+      console.log(`✅ Produit mis à jour avec succès: ${productId}`)
+
       const productData = updatedProductResult.rows[0] as any
 
       const product = {
@@ -263,6 +258,10 @@ export default defineEventHandler(async (event) => {
       return response
 
     } catch (dbError) {
+      if (dbError.statusCode) {
+        throw dbError
+      }
+
       console.error('❌ Erreur base de données:', dbError)
       throw createError({
         statusCode: 500,
@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from '../../../utils/database'
+import { invalidateCatalogTags } from '../../../utils/catalog-cache'
 
 export default defineEventHandler(async (event) => {
   try {
@@ -124,6 +125,8 @@ export default defineEventHandler(async (event) => {
       })
     }
 
+    invalidateCatalogTags(['products'])
+
     // Récupérer le produit mis à jour
     const updatedProductResult = await tursoClient.execute({
       sql: 'SELECT * FROM products WHERE id = ?',
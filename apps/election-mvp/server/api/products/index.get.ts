@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from '../../utils/database'
+import { cachedCatalogQuery } from '../../utils/catalog-cache'
 
 // Fallback statique minimal pour résilience
 const STATIC_FALLBACK = [
@@ -57,57 +58,59 @@ export default defineEventHandler(async (event) => {
     if (tursoClient) {
       try {
         console.log('🎯 Tentative Turso...')
-        const result = await tursoClient.execute(`
-          SELECT
-            p.id, p.name, p.description, p.category, p.subcategory,
-            p.base_price as basePrice, p.min_quantity as minQuantity,
-            p.max_quantity as maxQuantity, p.unit, p.production_time_days,
-            p.customizable, p.materials, p.colors, p.sizes,
-            p.image_url as image, p.gallery_urls, p.specifications,
-            p.is_active as isActive, p.created_at as createdAt, p.updated_at as updatedAt,
-            c.id as categoryId, c.name as categoryName, c.slug as categorySlug,
-            c.description as categoryDescription, c.icon as categoryIcon, c.color as categoryColor
-          FROM products p
-          LEFT JOIN categories c ON p.category = c.id
-          WHERE p.is_active = true
-          ORDER BY c.name, p.name
-        `)
+        const { data: products, cached, stale } = await cachedCatalogQuery('products:active', async () => {
+          const result = await tursoClient.execute(`
+            SELECT
+              p.id, p.name, p.description, p.category, p.subcategory,
+              p.base_price as basePrice, p.min_quantity as minQuantity,
+              p.max_quantity as maxQuantity, p.unit, p.production_time_days,
+              p.customizable, p.materials, p.colors, p.sizes,
+              p.image_url as image, p.gallery_urls, p.specifications,
+              p.is_active as isActive, p.created_at as createdAt, p.updated_at as updatedAt,
+              c.id as categoryId, c.name as categoryName, c.slug as categorySlug,
+              c.description as categoryDescription, c.icon as categoryIcon, c.color as categoryColor
+            FROM products p
+            LEFT JOIN categories c ON p.category = c.id
+            WHERE p.is_active = true
+            ORDER BY c.name, p.name
+          `)
 
-        const products = result.rows.map((row: any) => ({
-          id: String(row.id),
-          name: row.name,
-          description: row.description || '',
-          category: row.category,
-          subcategory: row.subcategory,
-          categoryDetails: row.categoryId ? {
-            id: row.categoryId,
-            name: row.categoryName,
-            slug: row.categorySlug,
-            description: row.categoryDescription,
-            icon: row.categoryIcon,
-            color: row.categoryColor
-          } : null,
-          basePrice: Number(row.basePrice) || 0,
-          price: Number(row.basePrice) || 0, // 🔧 FIX: Ajout du champ price requis par la validation
-          minQuantity: Number(row.minQuantity) || 1,
-          maxQuantity: Number(row.maxQuantity) || 1000,
-          unit: row.unit || 'pièce',
-          productionTimeDays: Number(row.production_time_days) || 7,
-          customizable: Boolean(row.customizable),
-          materials: row.materials,
-          colors: row.colors ? JSON.parse(row.colors) : [],
-          sizes: row.sizes ? JSON.parse(row.sizes) : [],
-          image: row.image,
-          galleryUrls: row.gallery_urls ? JSON.parse(row.gallery_urls) : [],
-          specifications: row.specifications,
-          tags: [row.category?.toLowerCase(), row.subcategory?.toLowerCase()].filter(Boolean),
-          isActive: Boolean(row.isActive),
-          createdAt: row.createdAt,
-          updatedAt: row.updatedAt
-        }))
+          return result.rows.map((row: any) => ({
+            id: String(row.id),
+            name: row.name,
+            description: row.description || '',
+            category: row.category,
+            subcategory: row.subcategory,
+            categoryDetails: row.categoryId ? {
+              id: row.categoryId,
+              name: row.categoryName,
+              slug: row.categorySlug,
+              description: row.categoryDescription,
+              icon: row.categoryIcon,
+              color: row.categoryColor
+            } : null,
+            basePrice: Number(row.basePrice) || 0,
+            price: Number(row.basePrice) || 0, // 🔧 FIX: Ajout du champ price requis par la validation
+            minQuantity: Number(row.minQuantity) || 1,
+            maxQuantity: Number(row.maxQuantity) || 1000,
+            unit: row.unit || 'pièce',
+            productionTimeDays: Number(row.production_time_days) || 7,
+            customizable: Boolean(row.customizable),
+            materials: row.materials,
+            colors: row.colors ? JSON.parse(row.colors) : [],
+            sizes: row.sizes ? JSON.parse(row.sizes) : [],
+            image: row.image,
+            galleryUrls: row.gallery_urls ? JSON.parse(row.gallery_urls) : [],
+            specifications: row.specifications,
+            tags: [row.category?.toLowerCase(), row.subcategory?.toLowerCase()].filter(Boolean),
+            isActive: Boolean(row.isActive),
+            createdAt: row.createdAt,
+            updatedAt: row.updatedAt
+          }))
+        }, { tags: ['products', 'categories'] })
 
         const duration = Date.now() - startTime
-        console.log(`✅ Turso OK: ${products.length} produits en ${duration}ms`)
+        console.log(`✅ Turso OK: ${products.length} produits en ${duration}ms${cached ? ' (cache)' : ''}`)
 
         return {
           success: true,
@@ -115,7 +118,8 @@ export default defineEventHandler(async (event) => {
           source: 'turso',
           count: products.length,
           duration,
-          cached: false
+          cached,
+          stale
         }
       } catch (tursoError) {
         console.warn('⚠️ Turso failed, using static fallback...', tursoError)
@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { invalidateCatalogTags } from "../../utils/catalog-cache"
 import { z } from "zod"
 
 // Schéma de validation pour création de produit
@@ -174,6 +175,7 @@ export default defineEventHandler(async (event) => {
       })
 
       console.log(`✅ Produit créé avec succès: ${productId}`)
+      invalidateCatalogTags(['products', 'bundles'])
 
       // Récupérer le produit créé
       const createdProductResult = await db.execute({
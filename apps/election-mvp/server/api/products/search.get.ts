@@ -4,6 +4,64 @@
  */
 
 import { getDatabase } from '../../utils/database'
+import { buildFtsMatchQuery, bm25Expression, hasFtsIndex, PRODUCTS_FTS_WEIGHTS } from '../../utils/search'
+
+const PRODUCT_COLUMNS = `
+  p.id, p.name, p.description, p.category, p.subcategory,
+  p.base_price as basePrice, p.min_quantity as minQuantity,
+  p.max_quantity as maxQuantity, p.unit, p.production_time_days,
+  p.customizable, p.materials, p.colors, p.sizes,
+  p.image_url as image, p.gallery_urls, p.specifications,
+  p.is_active as isActive, p.created_at as createdAt, p.updated_at as updatedAt
+`
+
+/**
+ * Recherche indexée FTS5 : préfixes, insensible aux accents, classement bm25
+ */
+function buildFtsSearch(matchQuery: string) {
+  return {
+    sql: `
+      SELECT ${PRODUCT_COLUMNS}
+      FROM products_fts
+      JOIN products_search_keys k ON k.search_key = products_fts.rowid
+      JOIN products p ON p.id = k.product_id
+      WHERE products_fts MATCH ?
+        AND p.is_active = true
+      ORDER BY ${bm25Expression('products_fts', PRODUCTS_FTS_WEIGHTS)}, p.name
+    `,
+    args: [matchQuery]
+  }
+}
+
+/**
+ * Recherche LIKE historique, utilisée tant que la migration 006 n'est pas appliquée
+ */
+function buildLikeSearch(term: string) {
+  const pattern = `%${term}%`
+  return {
+    sql: `
+      SELECT ${PRODUCT_COLUMNS}
+      FROM products p
+      WHERE p.is_active = true
+        AND (
+          p.name LIKE ? OR
+          p.description LIKE ? OR
+          p.category LIKE ? OR
+          p.subcategory LIKE ? OR
+          p.materials LIKE ?
+        )
+      ORDER BY
+        CASE
+          WHEN p.name LIKE ? THEN 1
+          WHEN p.category LIKE ? THEN 2
+          WHEN p.description LIKE ? THEN 3
+          ELSE 4
+        END,
+        p.name
+    `,
+    args: [pattern, pattern, pattern, pattern, pattern, pattern, pattern, pattern]
+  }
+}
 
 export default defineEventHandler(async (event) => {
   const startTime = Date.now()
@@ -25,38 +83,11 @@ export default defineEventHandler(async (event) => {
     if (tursoClient) {
       try {
         console.log(`🎯 Recherche Turso pour "${cleanTerm}"...`)
-        const result = await tursoClient.execute({
-          sql: `
-            SELECT
-              id, name, description, category, subcategory,
-              base_price as basePrice, min_quantity as minQuantity,
-              max_quantity as maxQuantity, unit, production_time_days,
-              customizable, materials, colors, sizes,
-              image_url as image, gallery_urls, specifications,
-              is_active as isActive, created_at as createdAt, updated_at as updatedAt
-            FROM products
-            WHERE is_active = true
-              AND (
-                name LIKE ? OR
-                description LIKE ? OR
-                category LIKE ? OR
-                subcategory LIKE ? OR
-                materials LIKE ?
-              )
-            ORDER BY
-              CASE
-                WHEN name LIKE ? THEN 1
-                WHEN category LIKE ? THEN 2
-                WHEN description LIKE ? THEN 3
-                ELSE 4
-              END,
-              name
-          `,
-          args: [
-            `%${cleanTerm}%`, `%${cleanTerm}%`, `%${cleanTerm}%`, `%${cleanTerm}%`, `%${cleanTerm}%`,
-            `%${cleanTerm}%`, `%${cleanTerm}%`, `%${cleanTerm}%`
-          ]
-        })
+        const matchQuery = buildFtsMatchQuery(cleanTerm)
+        const useFts = matchQuery !== null && await hasFtsIndex(tursoClient, 'products')
+        const result = await tursoClient.execute(
+          useFts ? buildFtsSearch(matchQuery as string) : buildLikeSearch(cleanTerm)
+        )
 
         const products = result.rows.map((row: any) => ({
           id: String(row.id),
@@ -91,6 +122,7 @@ export default defineEventHandler(async (event) => {
           count: products.length,
           query: cleanTerm,
           source: 'turso',
+          searchMode: useFts ? 'fts' : 'like',
           duration
         }
       } catch (tursoError) {
@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { invalidateCatalogTags } from "../../utils/catalog-cache"
 
 // Import des services SOLID depuis assetService (temporaire - à déplacer vers services/domain)
 import { RealisationService } from "../../services/assetService"
@@ -108,6 +109,7 @@ export default defineEventHandler(async (event) => {
         ` + ${publicIds.length} assets Cloudinary supprimés` : ''
 
       console.log(`✅ Réalisation ${actionLabel}: ${realisationId} (${realisationTitle})${cloudinaryInfo}`)
+      invalidateCatalogTags(['realisations'])
 
       const response = {
         success: true,
@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { invalidateCatalogTags } from "../../utils/catalog-cache"
 import { z } from "zod"
 
 // Schéma de validation pour mise à jour de réalisation
@@ -180,6 +181,7 @@ export default defineEventHandler(async (event) => {
       }
 
       console.log(`✅ Réalisation mise à jour avec succès: ${realisationId}`)
+      invalidateCatalogTags(['realisations'])
 
       // Récupérer la réalisation mise à jour
       const updatedRealisationResult = await db.execute({
@@ -4,11 +4,16 @@
  */
 
 import type { HybridRealisation } from "@ns2po/types";
-import { getDatabase } from "../../utils/database";
+import { getDatabase, tableExists } from "../../utils/database";
+import { cachedCatalogQuery, invalidateCatalogTags } from "../../utils/catalog-cache";
 import {
   getCloudinaryCreativeImages,
   cloudinaryImageToHybridRealisation,
 } from "../../utils/cloudinary-discovery";
+import {
+  readDiscoveryIndex,
+  refreshDiscoveryIndexIfStale,
+} from "../../utils/cloudinary-discovery-index";
 
 /**
  * Récupère réalisations depuis Turso
@@ -60,43 +65,62 @@ async function fetchTursoRealisations(): Promise<HybridRealisation[]> {
 }
 
 /**
- * Génère réalisations auto-discovery Cloudinary
+ * Réalisations auto-discovery lues depuis l'index cloudinary_discovery (migration 008)
+ * Aucun appel Cloudinary sur le chemin de lecture : l'index est rafraîchi en arrière-plan
+ * quand sa dernière synchronisation est trop ancienne.
+ * Les erreurs remontent à l'appelant : un résultat partiel ne doit pas être mis en cache.
  */
 async function generateAutoDiscoveryRealisations(existingPublicIds: Set<string>): Promise<HybridRealisation[]> {
-  try {
-    console.log("🔍 Auto-discovery Cloudinary...");
+  const db = getDatabase();
+  if (!db) {
+    console.warn("⚠️ Database non disponible pour l'index auto-discovery");
+    return [];
+  }
 
-    const cloudinaryImages = await getCloudinaryCreativeImages();
+  if (!(await tableExists(db, "cloudinary_discovery"))) {
+    console.warn("⚠️ Index cloudinary_discovery absent - scan Cloudinary direct (appliquer la migration 008)");
+    return scanCloudinaryAutoDiscovery(db, existingPublicIds);
+  }
 
-    // Récupérer les public_ids blacklistés
-    const db = getDatabase();
-    if (!db) {
-      console.warn("⚠️ Database non disponible pour auto-discovery blacklist");
-      return cloudinaryImages.map((image: any) => cloudinaryImageToHybridRealisation(image));
-    }
+  const { realisations, state } = await readDiscoveryIndex(db);
 
-    const blacklistResult = await db.execute('SELECT public_id FROM realisation_blacklist');
-    const blacklistedPublicIds = new Set(blacklistResult.rows.map(row => row.public_id));
+  // Premier démarrage compris : on répond avec l'index tel quel (données Turso/statiques seules),
+  // la synchronisation tourne en arrière-plan et invalide le cache quand elle a indexé des images
+  if (!state) {
+    console.log("🔍 Index auto-discovery vide - synchronisation initiale en arrière-plan");
+  }
+  refreshDiscoveryIndexIfStale(db, state, () => invalidateCatalogTags(["realisations"]))
+    ?.catch((error) => console.warn("⚠️ Rafraîchissement index auto-discovery échoué:", error));
 
-    console.log(`🚫 ${blacklistedPublicIds.size} réalisations blacklistées`);
+  const autoDiscoveryRealisations = realisations.filter(r => !existingPublicIds.has(r.id));
 
-    // Transformer le public_id original pour comparaison blacklist
-    const autoDiscoveryImages = cloudinaryImages.filter((image: any) => {
-      const transformedId = `cloudinary_${image.public_id.replace(/[^a-zA-Z0-9]/g, "_")}`;
-      return !existingPublicIds.has(transformedId) && !blacklistedPublicIds.has(transformedId);
-    });
+  console.log(`🎨 Auto-discovery (index): ${autoDiscoveryRealisations.length} réalisations`);
+  return autoDiscoveryRealisations;
+}
 
-    const autoDiscoveryRealisations = autoDiscoveryImages.map((image: any) =>
-      cloudinaryImageToHybridRealisation(image)
-    );
+/**
+ * Ancien chemin : scan Cloudinary à chaque requête, utilisé tant que la migration 008 n'est pas appliquée
+ */
+async function scanCloudinaryAutoDiscovery(db: any, existingPublicIds: Set<string>): Promise<HybridRealisation[]> {
+  const cloudinaryImages = await getCloudinaryCreativeImages();
 
-    console.log(`🎨 Auto-discovery: ${autoDiscoveryRealisations.length} nouvelles réalisations`);
-    return autoDiscoveryRealisations;
+  const blacklistResult = await db.execute('SELECT public_id FROM realisation_blacklist');
+  const blacklistedPublicIds = new Set(blacklistResult.rows.map((row: any) => row.public_id));
 
-  } catch (error) {
-    console.warn("⚠️ Auto-discovery Cloudinary échoué:", error);
-    return [];
-  }
+  console.log(`🚫 ${blacklistedPublicIds.size} réalisations blacklistées`);
+
+  // Transformer le public_id original pour comparaison blacklist
+  const autoDiscoveryImages = cloudinaryImages.filter((image: any) => {
+    const transformedId = `cloudinary_${image.public_id.replace(/[^a-zA-Z0-9]/g, "_")}`;
+    return !existingPublicIds.has(transformedId) && !blacklistedPublicIds.has(transformedId);
+  });
+
+  const autoDiscoveryRealisations = autoDiscoveryImages.map((image: any) =>
+    cloudinaryImageToHybridRealisation(image)
+  );
+
+  console.log(`🎨 Auto-discovery: ${autoDiscoveryRealisations.length} nouvelles réalisations`);
+  return autoDiscoveryRealisations;
 }
 
 /**
@@ -112,48 +136,61 @@ export default defineEventHandler(async (event): Promise<HybridRealisation[]> =>
       CLOUDINARY_CLOUD_NAME: process.env.CLOUDINARY_CLOUD_NAME ? "✅ Set" : "❌ Missing",
     });
 
-    // 1. Récupérer réalisations Turso
-    const tursoRealisations = await fetchTursoRealisations();
-
-    // 2. Extraire les public_ids existants
-    const existingPublicIds = new Set(
-      tursoRealisations.flatMap(r =>
-        r.cloudinaryPublicIds?.map(publicId =>
-          typeof publicId === 'string' ? publicId : publicId.id
-        ) || []
-      )
-    );
-
-    // 3. Générer réalisations auto-discovery
-    const autoDiscoveryRealisations = await generateAutoDiscoveryRealisations(existingPublicIds);
-
-    // 4. Fusionner toutes les sources
-    const allRealisations = [
-      ...tursoRealisations,
-      ...autoDiscoveryRealisations
-    ];
-
-    // 5. Trier par ordre et titre
-    const sortedRealisations = allRealisations.sort((a, b) => {
-      if (a.source === 'turso' && b.source !== 'turso') return -1;
-      if (a.source !== 'turso' && b.source === 'turso') return 1;
-
-      const orderDiff = (a.orderPosition || 999) - (b.orderPosition || 999);
-      if (orderDiff !== 0) return orderDiff;
-
-      return a.title.localeCompare(b.title);
-    });
+    const { data: { realisations: sortedRealisations }, cached } = await cachedCatalogQuery('realisations:all', async () => {
+      // 1. Récupérer réalisations Turso
+      const tursoRealisations = await fetchTursoRealisations();
+
+      // 2. Extraire les public_ids existants
+      const existingPublicIds = new Set(
+        tursoRealisations.flatMap(r =>
+          r.cloudinaryPublicIds?.map(publicId =>
+            typeof publicId === 'string' ? publicId : publicId.id
+          ) || []
+        )
+      );
+
+      // 3. Générer réalisations auto-discovery (en cas d'échec : Turso seul, non mis en cache)
+      let autoDiscoveryRealisations: HybridRealisation[] = [];
+      let degraded = false;
+      try {
+        autoDiscoveryRealisations = await generateAutoDiscoveryRealisations(existingPublicIds);
+      } catch (error) {
+        console.warn("⚠️ Auto-discovery Cloudinary échoué:", error);
+        degraded = true;
+      }
+
+      // 4. Fusionner toutes les sources
+      const allRealisations = [
+        ...tursoRealisations,
+        ...autoDiscoveryRealisations
+      ];
+
+      console.log(`  - ${tursoRealisations.length} Turso`);
+      console.log(`  - ${autoDiscoveryRealisations.length} auto-discovery`);
+
+      // 5. Trier par ordre et titre
+      const realisations = allRealisations.sort((a, b) => {
+        if (a.source === 'turso' && b.source !== 'turso') return -1;
+        if (a.source !== 'turso' && b.source === 'turso') return 1;
+
+        const orderDiff = (a.orderPosition || 999) - (b.orderPosition || 999);
+        if (orderDiff !== 0) return orderDiff;
+
+        return a.title.localeCompare(b.title);
+      });
+
+      return { realisations, degraded };
+    }, { tags: ['realisations'], cacheIf: result => !result.degraded });
 
     const executionTime = Date.now() - startTime;
-    console.log(`🎯 API: ${sortedRealisations.length} réalisations totales`);
-    console.log(`  - ${tursoRealisations.length} Turso`);
-    console.log(`  - ${autoDiscoveryRealisations.length} auto-discovery`);
+    console.log(`🎯 API: ${sortedRealisations.length} réalisations totales${cached ? ' (cache)' : ''}`);
     console.log(`⏱️ Temps d'exécution: ${executionTime}ms`);
 
     // Headers de cache pour optimisation
     setHeader(event, 'Cache-Control', 'public, max-age=60, s-maxage=120, stale-while-revalidate=86400');
     setHeader(event, 'X-Source', 'turso-cloudinary');
     setHeader(event, 'X-Execution-Time', `${executionTime}ms`);
+    setHeader(event, 'X-Cache', cached ? 'HIT' : 'MISS');
 
     return sortedRealisations;
 
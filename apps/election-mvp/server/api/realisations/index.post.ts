@@ -4,6 +4,7 @@
  */
 
 import { getDatabase } from "../../utils/database"
+import { invalidateCatalogTags } from "../../utils/catalog-cache"
 import { z } from "zod"
 
 // Schéma de validation pour création de réalisation
@@ -113,6 +114,7 @@ export default defineEventHandler(async (event) => {
       })
 
       console.log(`✅ Réalisation créée avec succès: ${realisationId}`)
+      invalidateCatalogTags(['realisations'])
 
       // Récupérer la réalisation créée
       const realisationResult = await db.execute({
@@ -1,93 +1,34 @@
-// Server-Sent Events endpoint pour notifications temps réel
-export default defineEventHandler(async (event) => {
-  // Configuration des headers SSE
-  setHeader(event, 'content-type', 'text/event-stream')
-  setHeader(event, 'cache-control', 'no-cache')
-  setHeader(event, 'connection', 'keep-alive')
-  setHeader(event, 'x-accel-buffering', 'no') // Pour Nginx
-
-  const encoder = new TextEncoder()
-
-  // Stockage global des connexions actives
-  if (!(globalThis as any).__sse_connections) {
-    (globalThis as any).__sse_connections = new Set()
-  }
-  const connections = (globalThis as any).__sse_connections
-
-  console.log('🔌 Nouvelle connexion SSE établie')
-
-  const stream = new ReadableStream({
-    start(controller) {
-      // Ajouter cette connexion au pool
-      connections.add(controller)
-      console.log(`📊 Connexions actives: ${connections.size}`)
-
-      // Envoi immédiat d'un message de connexion
-      try {
-        controller.enqueue(encoder.encode(`data: ${JSON.stringify({
-          type: 'connected',
-          timestamp: Date.now()
-        })}\n\n`))
-      } catch (error) {
-        console.error('Erreur envoi message de connexion:', error)
-      }
+import { invalidateCatalogForEvent } from '../utils/catalog-cache'
+import { getSSEHub, parseChannels } from '../utils/sse-hub'
 
-      // Heartbeat pour maintenir la connexion active
-      const pingInterval = setInterval(() => {
-        try {
-          controller.enqueue(encoder.encode(`data: ${JSON.stringify({
-            type: 'ping',
-            timestamp: Date.now()
-          })}\n\n`))
-        } catch (error) {
-          // La connexion est fermée, nettoyer
-          clearInterval(pingInterval)
-          connections.delete(controller)
-          console.log(`📊 Connexion fermée. Actives: ${connections.size}`)
-        }
-      }, 30000) // Ping toutes les 30 secondes
-
-      // Stocker l'interval pour le cleanup
-      ;(controller as any).__pingInterval = pingInterval
-    },
-
-    cancel(controller) {
-      // Nettoyage lors de la fermeture
-      const interval = (controller as any).__pingInterval
-      if (interval) {
-        clearInterval(interval)
-      }
-      connections.delete(controller)
-      console.log(`❌ Connexion SSE fermée. Actives: ${connections.size}`)
-    }
+// Server-Sent Events endpoint pour notifications temps réel
+// GET /api/sse?channels=products,bundles (tous les canaux par défaut)
+// Reprise : en-tête Last-Event-ID (reconnexion native EventSource) ou ?lastEventId=
+export default defineEventHandler((event) => {
+  const query = getQuery(event)
+  const lastEventId = getHeader(event, 'last-event-id') || (query.lastEventId as string | undefined)
+
+  const hub = getSSEHub()
+  hub.connect(event.node.req, event.node.res, {
+    channels: parseChannels(query.channels as string | string[] | undefined),
+    lastEventId
   })
 
-  return stream
+  // La réponse est écrite directement sur le socket par le hub (en-têtes déjà envoyés)
 })
 
-// Fonction helper pour broadcaster un événement à toutes les connexions
+// Fonction helper pour broadcaster un événement aux connexions abonnées à son canal
 export function broadcastSSEEvent(eventData: any) {
-  const connections = (globalThis as any).__sse_connections || new Set()
-  const encoder = new TextEncoder()
-  const message = `data: ${JSON.stringify(eventData)}\n\n`
-
-  let successCount = 0
-  let failureCount = 0
+  // Invalider le cache catalogue avant de notifier : les clients refetchent des données fraîches
+  if (eventData?.type) {
+    invalidateCatalogForEvent(eventData.type)
+  }
 
-  connections.forEach((controller: any) => {
-    try {
-      controller.enqueue(encoder.encode(message))
-      successCount++
-    } catch (error) {
-      // La connexion est probablement fermée
-      connections.delete(controller)
-      failureCount++
-    }
-  })
+  const result = getSSEHub().broadcast(eventData)
 
-  if (successCount > 0 || failureCount > 0) {
-    console.log(`📡 SSE Broadcast: ✅ ${successCount} réussis, ❌ ${failureCount} échecs`)
+  if (result.successCount > 0 || result.failureCount > 0) {
+    console.log(`📡 SSE Broadcast [${result.channel || 'all'}]: ✅ ${result.successCount} réussis, ❌ ${result.failureCount} différés`)
   }
 
-  return { successCount, failureCount }
-}
\ No newline at end of file
+  return result
+}
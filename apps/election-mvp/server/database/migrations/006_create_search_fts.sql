@@ -0,0 +1,155 @@
+-- Migration: Index de recherche plein texte FTS5 pour products et assets
+-- Date: 2025-10-16
+-- Description: Remplace les scans LIKE '%terme%' multi-colonnes par des index FTS5
+--   - Tokenizer unicode61 sans diacritiques (recherche française insensible aux accents)
+--   - Index de préfixes 2/3 caractères pour l'autocomplétion ("ech" → "écharpe")
+--   - Tables external-content synchronisées par triggers (aucune duplication des données)
+--   - products et assets ont une clé TEXT : leur rowid n'est pas un alias de la clé
+--     et VACUUM peut le renuméroter ; l'index est donc lié à une clé entière stable
+--     (*_search_keys, INTEGER PRIMARY KEY) via la vue *_search_content
+--   - Les mots composés sont aussi indexés soudés ("T-shirt" → t, shirt, tshirt) :
+--     unicode61 coupe sur le tiret, "tsh*" ne trouverait pas "T-shirt" sinon
+
+-- =====================================
+-- PRODUCTS
+-- =====================================
+
+CREATE TABLE IF NOT EXISTS products_search_keys (
+  search_key INTEGER PRIMARY KEY,
+  product_id TEXT NOT NULL UNIQUE
+);
+
+INSERT OR IGNORE INTO products_search_keys (product_id) SELECT id FROM products;
+
+CREATE VIEW IF NOT EXISTS products_search_content AS
+SELECT
+  k.search_key,
+  CASE WHEN instr(p.name, '-') > 0 THEN p.name || ' ' || replace(p.name, '-', '') ELSE p.name END AS name,
+  p.description,
+  p.category,
+  p.subcategory,
+  p.materials
+FROM products p
+JOIN products_search_keys k ON k.product_id = p.id;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+  name,
+  description,
+  category,
+  subcategory,
+  materials,
+  content = 'products_search_content',
+  content_rowid = 'search_key',
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS products_fts_insert
+    AFTER INSERT ON products
+BEGIN
+    INSERT OR IGNORE INTO products_search_keys (product_id) VALUES (NEW.id);
+    INSERT INTO products_fts (rowid, name, description, category, subcategory, materials)
+    VALUES (
+      (SELECT search_key FROM products_search_keys WHERE product_id = NEW.id),
+      CASE WHEN instr(NEW.name, '-') > 0 THEN NEW.name || ' ' || replace(NEW.name, '-', '') ELSE NEW.name END,
+      NEW.description, NEW.category, NEW.subcategory, NEW.materials
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_delete
+    AFTER DELETE ON products
+BEGIN
+    INSERT INTO products_fts (products_fts, rowid, name, description, category, subcategory, materials)
+    VALUES (
+      'delete',
+      (SELECT search_key FROM products_search_keys WHERE product_id = OLD.id),
+      CASE WHEN instr(OLD.name, '-') > 0 THEN OLD.name || ' ' || replace(OLD.name, '-', '') ELSE OLD.name END,
+      OLD.description, OLD.category, OLD.subcategory, OLD.materials
+    );
+    DELETE FROM products_search_keys WHERE product_id = OLD.id;
+END;
+
+-- Uniquement sur les colonnes indexées (et la clé) : les mises à jour de prix/stock ne touchent pas l'index
+CREATE TRIGGER IF NOT EXISTS products_fts_update
+    AFTER UPDATE OF id, name, description, category, subcategory, materials ON products
+BEGIN
+    INSERT INTO products_fts (products_fts, rowid, name, description, category, subcategory, materials)
+    VALUES (
+      'delete',
+      (SELECT search_key FROM products_search_keys WHERE product_id = OLD.id),
+      CASE WHEN instr(OLD.name, '-') > 0 THEN OLD.name || ' ' || replace(OLD.name, '-', '') ELSE OLD.name END,
+      OLD.description, OLD.category, OLD.subcategory, OLD.materials
+    );
+    UPDATE products_search_keys SET product_id = NEW.id WHERE product_id = OLD.id;
+    INSERT INTO products_fts (rowid, name, description, category, subcategory, materials)
+    VALUES (
+      (SELECT search_key FROM products_search_keys WHERE product_id = NEW.id),
+      CASE WHEN instr(NEW.name, '-') > 0 THEN NEW.name || ' ' || replace(NEW.name, '-', '') ELSE NEW.name END,
+      NEW.description, NEW.category, NEW.subcategory, NEW.materials
+    );
+END;
+
+-- =====================================
+-- ASSETS
+-- =====================================
+
+CREATE TABLE IF NOT EXISTS assets_search_keys (
+  search_key INTEGER PRIMARY KEY,
+  asset_id TEXT NOT NULL UNIQUE
+);
+
+INSERT OR IGNORE INTO assets_search_keys (asset_id) SELECT id FROM assets;
+
+CREATE VIEW IF NOT EXISTS assets_search_content AS
+SELECT k.search_key, a.alt_text, a.caption, a.public_id
+FROM assets a
+JOIN assets_search_keys k ON k.asset_id = a.id;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS assets_fts USING fts5(
+  alt_text,
+  caption,
+  public_id,
+  content = 'assets_search_content',
+  content_rowid = 'search_key',
+  tokenize = 'unicode61 remove_diacritics 2',
+  prefix = '2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS assets_fts_insert
+    AFTER INSERT ON assets
+BEGIN
+    INSERT OR IGNORE INTO assets_search_keys (asset_id) VALUES (NEW.id);
+    INSERT INTO assets_fts (rowid, alt_text, caption, public_id)
+    VALUES ((SELECT search_key FROM assets_search_keys WHERE asset_id = NEW.id), NEW.alt_text, NEW.caption, NEW.public_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS assets_fts_delete
+    AFTER DELETE ON assets
+BEGIN
+    INSERT INTO assets_fts (assets_fts, rowid, alt_text, caption, public_id)
+    VALUES ('delete', (SELECT search_key FROM assets_search_keys WHERE asset_id = OLD.id), OLD.alt_text, OLD.caption, OLD.public_id);
+    DELETE FROM assets_search_keys WHERE asset_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS assets_fts_update
+    AFTER UPDATE OF id, alt_text, caption, public_id ON assets
+BEGIN
+    INSERT INTO assets_fts (assets_fts, rowid, alt_text, caption, public_id)
+    VALUES ('delete', (SELECT search_key FROM assets_search_keys WHERE asset_id = OLD.id), OLD.alt_text, OLD.caption, OLD.public_id);
+    UPDATE assets_search_keys SET asset_id = NEW.id WHERE asset_id = OLD.id;
+    INSERT INTO assets_fts (rowid, alt_text, caption, public_id)
+    VALUES ((SELECT search_key FROM assets_search_keys WHERE asset_id = NEW.id), NEW.alt_text, NEW.caption, NEW.public_id);
+END;
+
+-- =====================================
+-- INDEXATION INITIALE
+-- =====================================
+
+INSERT INTO products_fts (products_fts) VALUES ('rebuild');
+INSERT INTO assets_fts (assets_fts) VALUES ('rebuild');
+
+-- Vérification
+SELECT
+  'Index FTS5 créés - ' ||
+  (SELECT COUNT(*) FROM products_search_keys) || ' produits, ' ||
+  (SELECT COUNT(*) FROM assets_search_keys) || ' assets indexés' as message;
@@ -0,0 +1,75 @@
+-- Migration: Tags normalisés et compteur d'usages pour la médiathèque assets
+-- Date: 2025-10-16
+-- Description: Rend le listing admin des assets index-only
+--   - asset_tags : table de jointure (tag, asset_id) remplaçant tags LIKE '%"tag"%' sur le JSON
+--     tags stockés en lower(trim(...)) : le filtre reste insensible à la casse comme l'ancien LIKE
+--   - assets.usage_count : compteur maintenu par AssetService.updateAssetUsage (plus de GROUP BY sur asset_usages)
+--   - index composites (is_deleted, tri, id) pour la pagination keyset sur created_at / bytes
+
+-- =====================================
+-- ASSET_TAGS
+-- =====================================
+
+CREATE TABLE IF NOT EXISTS asset_tags (
+  tag TEXT NOT NULL,
+  asset_id TEXT NOT NULL REFERENCES assets(id) ON DELETE CASCADE,
+  PRIMARY KEY (tag, asset_id)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_asset_tags_asset_id ON asset_tags(asset_id);
+
+-- La colonne JSON assets.tags reste la source de vérité (Cloudinary, scripts de sync) :
+-- les triggers répercutent chaque écriture sur la table de jointure
+CREATE TRIGGER IF NOT EXISTS asset_tags_insert
+    AFTER INSERT ON assets
+    WHEN NEW.tags IS NOT NULL AND json_valid(NEW.tags)
+BEGIN
+    INSERT OR IGNORE INTO asset_tags (tag, asset_id)
+    SELECT lower(trim(value)), NEW.id FROM json_each(NEW.tags)
+    WHERE type = 'text' AND trim(value) != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS asset_tags_update
+    AFTER UPDATE OF tags ON assets
+BEGIN
+    DELETE FROM asset_tags WHERE asset_id = OLD.id;
+    INSERT OR IGNORE INTO asset_tags (tag, asset_id)
+    SELECT lower(trim(value)), NEW.id FROM json_each(CASE WHEN json_valid(NEW.tags) THEN NEW.tags ELSE '[]' END)
+    WHERE type = 'text' AND trim(value) != '';
+END;
+
+CREATE TRIGGER IF NOT EXISTS asset_tags_delete
+    AFTER DELETE ON assets
+BEGIN
+    DELETE FROM asset_tags WHERE asset_id = OLD.id;
+END;
+
+INSERT OR IGNORE INTO asset_tags (tag, asset_id)
+SELECT lower(trim(je.value)), a.id
+FROM assets a, json_each(a.tags) je
+WHERE a.tags IS NOT NULL AND json_valid(a.tags) AND je.type = 'text' AND trim(je.value) != '';
+
+-- =====================================
+-- USAGE_COUNT
+-- =====================================
+
+ALTER TABLE assets ADD COLUMN usage_count INTEGER NOT NULL DEFAULT 0;
+
+UPDATE assets SET usage_count = (
+  SELECT COUNT(*) FROM asset_usages WHERE asset_usages.asset_id = assets.id
+);
+
+-- =====================================
+-- INDEX DE LISTING (OFFSET et keyset)
+-- =====================================
+
+CREATE INDEX IF NOT EXISTS idx_assets_listing_created ON assets(is_deleted, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_assets_listing_updated ON assets(is_deleted, updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_assets_listing_bytes ON assets(is_deleted, bytes, id);
+CREATE INDEX IF NOT EXISTS idx_assets_listing_format ON assets(is_deleted, format, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_assets_listing_folder ON assets(is_deleted, folder, created_at, id);
+
+-- Vérification
+SELECT
+  'asset_tags: ' || (SELECT COUNT(*) FROM asset_tags) || ' liaisons, ' ||
+  (SELECT COUNT(*) FROM assets WHERE usage_count > 0) || ' assets utilisés' as message;
@@ -0,0 +1,50 @@
+-- Migration: Index persistant de l'auto-discovery Cloudinary
+-- Date: 2025-10-16
+-- Description: Remplace le cloudinary.search exécuté à chaque GET /api/realisations
+--   - cloudinary_discovery : une ligne par image du dossier creative, métadonnées déjà parsées
+--     (titre, tags, type) par parseCreativeFilename / generateSmartTitle / generateTags
+--   - cloudinary_discovery_state : curseur de synchronisation incrémentale (uploaded_at)
+--   - Rempli par server/utils/cloudinary-discovery-index.ts (pagination next_cursor)
+
+-- =====================================
+-- INDEX DES IMAGES DÉCOUVERTES
+-- =====================================
+
+CREATE TABLE IF NOT EXISTS cloudinary_discovery (
+  public_id TEXT PRIMARY KEY,
+  realisation_id TEXT NOT NULL UNIQUE,      -- cloudinary_<public_id normalisé>, clé de realisation_blacklist
+  filename TEXT NOT NULL,
+  secure_url TEXT,
+  format TEXT,
+  bytes INTEGER,
+  width INTEGER,
+  height INTEGER,
+  cloudinary_created_at TEXT,
+  uploaded_at TEXT,                         -- modifié par un ré-upload / overwrite
+  parsed_type TEXT,
+  title TEXT NOT NULL,
+  description TEXT,
+  tags TEXT NOT NULL DEFAULT '[]',          -- JSON array
+  is_deleted INTEGER NOT NULL DEFAULT 0,    -- absent lors du dernier scan complet
+  last_seen_sync TEXT,                      -- identifiant du scan complet qui a vu l'image
+  indexed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_cloudinary_discovery_listing ON cloudinary_discovery(is_deleted, title);
+
+-- =====================================
+-- ÉTAT DE SYNCHRONISATION
+-- =====================================
+
+CREATE TABLE IF NOT EXISTS cloudinary_discovery_state (
+  scope TEXT PRIMARY KEY,                   -- expression de dossier synchronisée
+  watermark TEXT,                           -- plus grand uploaded_at indexé
+  last_run_at DATETIME,
+  last_full_sync_at DATETIME,
+  last_status TEXT,
+  last_error TEXT,
+  indexed_count INTEGER NOT NULL DEFAULT 0
+);
+
+-- Vérification
+SELECT 'cloudinary_discovery créé - ' || (SELECT COUNT(*) FROM cloudinary_discovery) || ' images indexées' as message;
@@ -0,0 +1,15 @@
+-- Migration: Reprise des synchronisations auto-discovery interrompues
+-- Date: 2025-10-17
+-- Description: Complète cloudinary_discovery_state (migration 008)
+--   - sync_cursor : next_cursor de la prochaine page à lire, NULL hors synchronisation en cours
+--   - sync_id / sync_mode : synchronisation en cours (le scan complet marque les images vues avec sync_id)
+--   - sync_watermark : plus grand uploaded_at vu par la synchronisation en cours ;
+--     promu en watermark seulement quand elle se termine
+
+ALTER TABLE cloudinary_discovery_state ADD COLUMN sync_cursor TEXT;
+ALTER TABLE cloudinary_discovery_state ADD COLUMN sync_id TEXT;
+ALTER TABLE cloudinary_discovery_state ADD COLUMN sync_mode TEXT;
+ALTER TABLE cloudinary_discovery_state ADD COLUMN sync_watermark TEXT;
+
+-- Vérification
+SELECT 'cloudinary_discovery_state: reprise de synchronisation activée' as message;
@@ -4,9 +4,30 @@
 
 /* global defineNitroPlugin */
 
-import { initDatabase } from '../utils/database'
+import { getDatabase, getReplicaSync, initDatabase, syncReplica } from '../utils/database'
+import { invalidateCatalogTags } from '../utils/catalog-cache'
+
+// Attente maximale du premier sync du réplica embarqué avant de servir les lectures locales
+const REPLICA_STARTUP_TIMEOUT_MS = Number(process.env.TURSO_REPLICA_STARTUP_TIMEOUT_MS) || 15_000
+
+export default defineNitroPlugin(async (nitroApp) => {
+  const replica = getDatabase() ? getReplicaSync() : null
+
+  if (replica) {
+    // Réplica embarqué : les changements rapatriés du primaire rendent le cache catalogue obsolète
+    replica.onSynced((result) => {
+      if (result.framesSynced > 0) {
+        invalidateCatalogTags(['products', 'categories', 'bundles', 'realisations'])
+      }
+    })
+
+    // Un réplica neuf est vide : les requêtes attendent le premier sync (borné) avant de lire le fichier local
+    const firstSync = syncReplica('startup', REPLICA_STARTUP_TIMEOUT_MS)
+      .then(result => console.log(`✅ Réplica synchronisé au démarrage (${result?.framesSynced ?? 0} frames, ${result?.durationMs ?? 0}ms)`))
+      .catch(error => console.warn(`⚠️ Premier sync réplica non terminé: ${error?.message || error} - lectures sur le fichier local`))
+    nitroApp.hooks.hook('request', () => firstSync)
+  }
 
-export default defineNitroPlugin(async () => {
   console.log('🚀 Initializing database...')
   await initDatabase()
-})
\ No newline at end of file
+})
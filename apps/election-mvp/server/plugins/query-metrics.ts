@@ -0,0 +1,27 @@
+/**
+ * Server plugin: contexte de métriques base par requête HTTP
+ * Chaque requête est exécutée dans runWithQueryContext : ses allers-retours Turso sont comptés,
+ * les motifs N+1 détectés en fin de requête et les requêtes lentes journalisées dans system_logs.
+ */
+
+/* global defineNitroPlugin */
+
+import { getQueryMetrics, runWithQueryContext } from '@ns2po/database'
+import { logger } from '../utils/logger'
+
+export default defineNitroPlugin((nitroApp) => {
+  const handler = nitroApp.h3App.handler
+
+  nitroApp.h3App.handler = (event) => {
+    const path = (event.path || '/').split('?')[0]
+    return runWithQueryContext(`${event.method} ${path}`, () => handler(event))
+  }
+
+  getQueryMetrics().onReport((report) => {
+    if (report.kind === 'slow-query') {
+      logger.warn(`Requête lente (${report.durationMs}ms): ${report.statement}`, 'db.slow-query', report)
+    } else {
+      logger.warn(`N+1 probable: ${report.count}× la même requête sur ${report.route}`, 'db.n-plus-one', report)
+    }
+  })
+})
@@ -3,11 +3,35 @@
  * Architecture SOLID avec séparation des responsabilités
  */
 
-import { getDatabase } from '../utils/database'
+import { getDatabase, tableExists } from '../utils/database'
 import { cloudinaryService } from '../utils/cloudinaryService'
+import { buildFtsMatchQuery, hasFtsIndex } from '../utils/search'
+import { createWriteBatch } from '../utils/db-batch'
 import { createError } from 'h3'
 import type { CloudinaryUploadResult } from '../../utils/cloudinary'
 
+/**
+ * Ajuste assets.usage_count des usages d'une entité (migration 007)
+ * Args : entity_type, entity_id, entity_type, entity_id
+ */
+const usageCountDeltaSql = (op: '+' | '-') => `
+  UPDATE assets SET usage_count = MAX(0, usage_count ${op} (
+    SELECT COUNT(*) FROM asset_usages u
+    WHERE u.asset_id = assets.id AND u.entity_type = ? AND u.entity_id = ?
+  ))
+  WHERE id IN (SELECT asset_id FROM asset_usages WHERE entity_type = ? AND entity_id = ?)
+`
+
+/**
+ * Recalcule assets.usage_count depuis asset_usages pour les assets donnés (migration 007)
+ */
+const usageCountRefreshStatement = (assetIds: string[]) => ({
+  sql: `UPDATE assets SET usage_count = (
+          SELECT COUNT(*) FROM asset_usages WHERE asset_usages.asset_id = assets.id
+        ) WHERE id IN (${assetIds.map(() => '?').join(', ')})`,
+  args: assetIds
+})
+
 // Types pour notre service Asset
 export interface Asset {
   id: string
@@ -81,6 +105,18 @@ export interface PaginationOptions {
   limit?: number
   sortBy?: 'created_at' | 'updated_at' | 'bytes'
   sortOrder?: 'asc' | 'desc'
+  mode?: 'offset' | 'cursor'
+  cursor?: string
+}
+
+export interface AssetListResult {
+  assets: Asset[]
+  total: number | null // null pour les pages keyset suivantes (pas de COUNT)
+  page: number
+  totalPages: number | null
+  hasNext: boolean
+  hasPrev: boolean
+  nextCursor: string | null
 }
 
 /**
@@ -338,18 +374,12 @@ class AssetService {
 
   /**
    * Liste des assets avec filtres et pagination
+   * Mode 'offset' (page/limit) par défaut, mode 'cursor' (keyset sur tri + id) pour la pagination profonde
    */
   async getAssets(
     filters: AssetFilters = {},
     pagination: PaginationOptions = {}
-  ): Promise<{
-    assets: Asset[]
-    total: number
-    page: number
-    totalPages: number
-    hasNext: boolean
-    hasPrev: boolean
-  }> {
+  ): Promise<AssetListResult> {
     const db = getDatabase()
     if (!db) {
       throw createError({
@@ -363,8 +393,12 @@ class AssetService {
     const offset = (page - 1) * limit
     const sortBy = pagination.sortBy || 'created_at'
     const sortOrder = pagination.sortOrder || 'desc'
+    const cursorMode = pagination.mode === 'cursor'
 
     try {
+      // Migration 007 : asset_tags + usage_count, sinon requêtes historiques
+      const normalized = await tableExists(db, 'asset_tags')
+
       // Construction des conditions WHERE
       const conditions: string[] = ['is_deleted = 0']
       const params: any[] = []
@@ -380,40 +414,107 @@ class AssetService {
       }
 
       if (filters.search) {
-        conditions.push('(alt_text LIKE ? OR caption LIKE ? OR public_id LIKE ?)')
-        const searchPattern = `%${filters.search}%`
-        params.push(searchPattern, searchPattern, searchPattern)
+        const matchQuery = buildFtsMatchQuery(filters.search)
+        if (matchQuery && await hasFtsIndex(db, 'assets')) {
+          // Index FTS5 (migration 006) : préfixes et insensible aux accents
+          conditions.push(`id IN (
+            SELECT k.asset_id FROM assets_fts
+            JOIN assets_search_keys k ON k.search_key = assets_fts.rowid
+            WHERE assets_fts MATCH ?
+          )`)
+          params.push(matchQuery)
+        } else {
+          conditions.push('(alt_text LIKE ? OR caption LIKE ? OR public_id LIKE ?)')
+          const searchPattern = `%${filters.search}%`
+          params.push(searchPattern, searchPattern, searchPattern)
+        }
       }
 
       if (filters.tags && filters.tags.length > 0) {
-        const tagConditions = filters.tags.map(() => 'tags LIKE ?').join(' OR ')
-        conditions.push(`(${tagConditions})`)
-        filters.tags.forEach(tag => {
-          params.push(`%"${tag}"%`)
-        })
+        if (normalized) {
+          // Même normalisation que les triggers de la migration 007 (lower() SQLite, insensible à la casse ASCII comme l'ancien LIKE)
+          conditions.push(`id IN (SELECT asset_id FROM asset_tags WHERE tag IN (${filters.tags.map(() => 'lower(trim(?))').join(', ')}))`)
+          params.push(...filters.tags)
+        } else {
+          const tagConditions = filters.tags.map(() => 'tags LIKE ?').join(' OR ')
+          conditions.push(`(${tagConditions})`)
+          filters.tags.forEach(tag => {
+            params.push(`%"${tag}"%`)
+          })
+        }
       }
 
-      const whereClause = conditions.length > 0 ? `WHERE ${conditions.join(' AND ')}` : ''
+      const filterClause = `WHERE ${conditions.join(' AND ')}`
+      const direction = sortOrder.toUpperCase()
+      // id départage les valeurs de tri identiques (ordre total requis par le keyset)
+      const orderClause = `ORDER BY ${sortBy} ${direction}, id ${direction}`
+      const usageColumn = normalized
+        ? ''
+        : ', COALESCE((SELECT COUNT(*) FROM asset_usages au WHERE au.asset_id = a.id), 0) as usage_count'
+
+      if (cursorMode) {
+        const pageConditions = [...conditions]
+        const pageParams = [...params]
+        const cursor = pagination.cursor ? this.decodeCursor(pagination.cursor) : null
+
+        if (cursor) {
+          const keyset = this.keysetCondition(sortBy, sortOrder, cursor)
+          pageConditions.push(keyset.sql)
+          pageParams.push(...keyset.args)
+        }
+
+        // limit + 1 pour savoir s'il existe une page suivante sans COUNT(*)
+        const assetsResult = await db.execute({
+          sql: `SELECT a.*${usageColumn}
+                FROM assets a
+                WHERE ${pageConditions.join(' AND ')}
+                ${orderClause}
+                LIMIT ?`,
+          args: [...pageParams, limit + 1]
+        })
+
+        const rows = assetsResult.rows.slice(0, limit)
+        const assets = rows.map(row => ({
+          ...this.mapRowToAsset(row as any),
+          usage_count: Number(row.usage_count || 0)
+        }))
+        const hasNext = assetsResult.rows.length > limit
+        const lastRow = rows[rows.length - 1] as any
+
+        // Le total n'est calculé que pour la première page
+        let total: number | null = null
+        if (!cursor) {
+          const countResult = await db.execute({
+            sql: `SELECT COUNT(*) as count FROM assets ${filterClause}`,
+            args: params
+          })
+          total = Number(countResult.rows[0].count)
+        }
+
+        return {
+          assets,
+          total,
+          page,
+          totalPages: total !== null ? Math.ceil(total / limit) : null,
+          hasNext,
+          hasPrev: cursor !== null,
+          nextCursor: hasNext && lastRow ? this.encodeCursor(lastRow[sortBy], lastRow.id) : null
+        }
+      }
 
       // Récupération du total
       const countResult = await db.execute({
-        sql: `SELECT COUNT(*) as count FROM assets ${whereClause}`,
+        sql: `SELECT COUNT(*) as count FROM assets ${filterClause}`,
         args: params
       })
       const total = Number(countResult.rows[0].count)
 
       // Récupération des assets avec pagination et comptage des usages
       const assetsResult = await db.execute({
-        sql: `SELECT a.*,
-              COALESCE(usage_count.count, 0) as usage_count
+        sql: `SELECT a.*${usageColumn}
               FROM assets a
-              LEFT JOIN (
-                SELECT asset_id, COUNT(*) as count
-                FROM asset_usages
-                GROUP BY asset_id
-              ) usage_count ON a.id = usage_count.asset_id
-              ${whereClause}
-              ORDER BY ${sortBy} ${sortOrder.toUpperCase()}
+              ${filterClause}
+              ${orderClause}
               LIMIT ? OFFSET ?`,
         args: [...params, limit, offset]
       })
@@ -430,9 +531,14 @@ class AssetService {
         page,
         totalPages,
         hasNext: page < totalPages,
-        hasPrev: page > 1
+        hasPrev: page > 1,
+        nextCursor: null
       }
-    } catch (error) {
+    } catch (error: any) {
+      if (error.statusCode) {
+        throw error
+      }
+
       console.error('❌ Erreur récupération assets:', error)
       throw createError({
         statusCode: 500,
@@ -441,6 +547,49 @@ class AssetService {
     }
   }
 
+  /**
+   * Curseur opaque de pagination keyset : valeur de tri + id du dernier élément
+   */
+  private encodeCursor(value: unknown, id: string): string {
+    return Buffer.from(JSON.stringify([value, id])).toString('base64url')
+  }
+
+  private decodeCursor(cursor: string): { value: string | number | null; id: string } {
+    try {
+      const [value, id] = JSON.parse(Buffer.from(cursor, 'base64url').toString('utf8'))
+      if (typeof id !== 'string' || (value !== null && typeof value !== 'string' && typeof value !== 'number')) {
+        throw new Error('Format de curseur inattendu')
+      }
+      return { value, id }
+    } catch {
+      throw createError({
+        statusCode: 400,
+        statusMessage: 'Curseur de pagination invalide'
+      })
+    }
+  }
+
+  /**
+   * Condition "après le curseur" cohérente avec ORDER BY tri, id
+   * SQLite classe les NULL en tête en ASC et en fin en DESC ; une comparaison (col, id) < (?, ?)
+   * écarterait ces lignes (bytes inconnu par exemple), on les traite donc explicitement.
+   */
+  private keysetCondition(
+    sortBy: string,
+    sortOrder: 'asc' | 'desc',
+    cursor: { value: string | number | null; id: string }
+  ): { sql: string; args: (string | number)[] } {
+    if (sortOrder === 'desc') {
+      return cursor.value === null
+        ? { sql: `(${sortBy} IS NULL AND id < ?)`, args: [cursor.id] }
+        : { sql: `((${sortBy}, id) < (?, ?) OR ${sortBy} IS NULL)`, args: [cursor.value, cursor.id] }
+    }
+
+    return cursor.value === null
+      ? { sql: `((${sortBy} IS NULL AND id > ?) OR ${sortBy} IS NOT NULL)`, args: [cursor.id] }
+      : { sql: `(${sortBy}, id) > (?, ?)`, args: [cursor.value, cursor.id] }
+  }
+
   /**
    * Mise à jour d'un asset
    */
@@ -810,6 +959,7 @@ class AssetService {
           sql: 'UPDATE assets SET is_deleted = 1, updated_at = ? WHERE id = ?',
           args: [new Date().toISOString(), assetId]
         })
+        await this.refreshUsageCounts(db, [assetId])
 
         // Commit de la transaction
         await db.execute({
@@ -908,77 +1058,61 @@ class AssetService {
       // Récupérer tous les usages de l'ancien asset
       const usageDetails = await this.getAssetUsage(oldAssetId)
 
-      // Transaction pour remplacement atomique
-      await db.execute({
-        sql: 'BEGIN TRANSACTION',
-        args: []
-      })
-
-      try {
-        // Mettre à jour toutes les références dans les entités
-        for (const usage of usageDetails.usages) {
-          if (usage.entity_type === 'product') {
-            if (usage.field_name === 'main_image') {
-              await db.execute({
-                sql: 'UPDATE products SET main_image_asset_id = ? WHERE id = ?',
-                args: [replacementAssetId, usage.entity_id]
-              })
-            } else if (usage.field_name === 'gallery_image') {
-              // Récupérer et modifier le tableau des images de galerie
-              const productResult = await db.execute({
-                sql: 'SELECT gallery_asset_ids FROM products WHERE id = ?',
-                args: [usage.entity_id]
-              })
-
-              if (productResult.rows.length > 0) {
-                const product = productResult.rows[0] as any
-                let galleryIds = product.gallery_asset_ids ? JSON.parse(product.gallery_asset_ids) : []
-                galleryIds = galleryIds.map((id: string) => id === oldAssetId ? replacementAssetId : id)
-
-                await db.execute({
-                  sql: 'UPDATE products SET gallery_asset_ids = ? WHERE id = ?',
-                  args: [JSON.stringify(galleryIds), usage.entity_id]
-                })
-              }
-            }
+      // Remplacement atomique : toutes les références sont réécrites en un seul lot
+      const batch = createWriteBatch(db)
+      const now = new Date().toISOString()
+
+      // Mettre à jour toutes les références dans les entités
+      for (const usage of usageDetails.usages) {
+        if (usage.entity_type === 'product') {
+          if (usage.field_name === 'main_image') {
+            batch.add({
+              sql: 'UPDATE products SET main_image_asset_id = ? WHERE id = ?',
+              args: [replacementAssetId, usage.entity_id]
+            })
+          } else if (usage.field_name === 'gallery_image') {
+            // Substitution dans le tableau JSON côté SQLite (plus de lecture/réécriture par produit)
+            batch.add({
+              sql: `UPDATE products SET gallery_asset_ids = (
+                      SELECT json_group_array(CASE WHEN value = ? THEN ? ELSE value END)
+                      FROM json_each(products.gallery_asset_ids)
+                    )
+                    WHERE id = ? AND json_valid(gallery_asset_ids)`,
+              args: [oldAssetId, replacementAssetId, usage.entity_id]
+            })
           }
         }
+      }
 
-        // Mettre à jour la table asset_usages
-        await db.execute({
-          sql: 'UPDATE asset_usages SET asset_id = ? WHERE asset_id = ?',
-          args: [replacementAssetId, oldAssetId]
-        })
+      // Mettre à jour la table asset_usages
+      batch.add({
+        sql: 'UPDATE asset_usages SET asset_id = ? WHERE asset_id = ?',
+        args: [replacementAssetId, oldAssetId]
+      })
 
-        // Si demandé, supprimer l'ancien asset
-        if (deleteOldAsset) {
-          // Vérifier qu'il n'est plus utilisé ailleurs
-          const remainingUsages = await this.getAssetUsage(oldAssetId)
-          if (remainingUsages.totalUsages === 0) {
-            await cloudinaryService.deleteAsset(oldAsset.public_id)
-            await db.execute({
-              sql: 'UPDATE assets SET is_deleted = 1, updated_at = ? WHERE id = ?',
-              args: [new Date().toISOString(), oldAssetId]
-            })
-          }
-        }
+      if (await tableExists(db, 'asset_tags')) {
+        batch.add(usageCountRefreshStatement([oldAssetId, replacementAssetId]))
+      }
 
-        // Commit de la transaction
-        await db.execute({
-          sql: 'COMMIT',
-          args: []
+      // Si demandé, supprimer l'ancien asset s'il n'est plus utilisé ailleurs
+      let deleteIndex = -1
+      if (deleteOldAsset) {
+        deleteIndex = batch.add({
+          sql: `UPDATE assets SET is_deleted = 1, updated_at = ?
+                WHERE id = ? AND NOT EXISTS (SELECT 1 FROM asset_usages WHERE asset_id = ?)`,
+          args: [now, oldAssetId, oldAssetId]
         })
+      }
 
-        console.log(`✅ Asset remplacé: ${oldAssetId} → ${replacementAssetId} (${usageDetails.totalUsages} références mises à jour)`)
-        return { success: true, oldAsset, newAsset }
-      } catch (error) {
-        // Rollback en cas d'erreur
-        await db.execute({
-          sql: 'ROLLBACK',
-          args: []
-        })
-        throw error
+      const results = await batch.commit()
+
+      // Suppression Cloudinary uniquement une fois le lot validé
+      if (deleteIndex >= 0 && results[deleteIndex].rowsAffected > 0) {
+        await cloudinaryService.deleteAsset(oldAsset.public_id)
       }
+
+      console.log(`✅ Asset remplacé: ${oldAssetId} → ${replacementAssetId} (${usageDetails.totalUsages} références mises à jour)`)
+      return { success: true, oldAsset, newAsset }
     } catch (error: any) {
       if (error.statusCode) {
         throw error
@@ -1019,55 +1153,58 @@ class AssetService {
     }
 
     try {
-      // Transaction pour cohérence
-      await db.execute({
-        sql: 'BEGIN TRANSACTION',
-        args: []
-      })
+      const normalized = await tableExists(db, 'asset_tags')
 
-      try {
-        // Supprimer tous les usages existants pour cette entité
-        await db.execute({
-          sql: 'DELETE FROM asset_usages WHERE entity_type = ? AND entity_id = ?',
-          args: [entityType, entityId]
+      // Lot atomique : suppression, recréation et compteurs en un seul aller-retour
+      const batch = createWriteBatch(db)
+      const now = new Date().toISOString()
+
+      // Retirer du compteur les usages qui vont être supprimés
+      if (normalized) {
+        batch.add({
+          sql: usageCountDeltaSql('-'),
+          args: [entityType, entityId, entityType, entityId]
         })
+      }
 
-        // Créer les nouveaux usages
-        for (const mapping of assetMappings) {
-          for (const assetId of mapping.asset_ids) {
-            if (assetId) { // Vérifier que l'assetId n'est pas null/undefined
-              await db.execute({
-                sql: `INSERT INTO asset_usages (id, asset_id, entity_type, entity_id, field_name, created_at, updated_at)
-                      VALUES (?, ?, ?, ?, ?, ?, ?)`,
-                args: [
-                  this.generateUsageId(),
-                  assetId,
-                  entityType,
-                  entityId,
-                  mapping.field_name,
-                  new Date().toISOString(),
-                  new Date().toISOString()
-                ]
-              })
-            }
+      // Supprimer tous les usages existants pour cette entité
+      batch.add({
+        sql: 'DELETE FROM asset_usages WHERE entity_type = ? AND entity_id = ?',
+        args: [entityType, entityId]
+      })
+
+      // Créer les nouveaux usages
+      for (const mapping of assetMappings) {
+        for (const assetId of mapping.asset_ids) {
+          if (assetId) { // Vérifier que l'assetId n'est pas null/undefined
+            batch.add({
+              sql: `INSERT INTO asset_usages (id, asset_id, entity_type, entity_id, field_name, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)`,
+              args: [
+                this.generateUsageId(),
+                assetId,
+                entityType,
+                entityId,
+                mapping.field_name,
+                now,
+                now
+              ]
+            })
           }
         }
+      }
 
-        // Commit de la transaction
-        await db.execute({
-          sql: 'COMMIT',
-          args: []
-        })
-
-        console.log(`✅ Usages d'assets mis à jour pour ${entityType} ${entityId}`)
-      } catch (error) {
-        // Rollback en cas d'erreur
-        await db.execute({
-          sql: 'ROLLBACK',
-          args: []
+      // Ajouter au compteur les nouveaux usages
+      if (normalized) {
+        batch.add({
+          sql: usageCountDeltaSql('+'),
+          args: [entityType, entityId, entityType, entityId]
         })
-        throw error
       }
+
+      await batch.commit()
+
+      console.log(`✅ Usages d'assets mis à jour pour ${entityType} ${entityId}`)
     } catch (error) {
       console.error(`❌ Erreur mise à jour usage assets pour ${entityType} ${entityId}:`, error)
       throw createError({
@@ -1077,6 +1214,15 @@ class AssetService {
     }
   }
 
+  /**
+   * Recalcule assets.usage_count depuis asset_usages (migration 007)
+   */
+  private async refreshUsageCounts(db: any, assetIds: string[]): Promise<void> {
+    if (assetIds.length === 0 || !(await tableExists(db, 'asset_tags'))) return
+
+    await db.execute(usageCountRefreshStatement(assetIds))
+  }
+
   /**
    * Mapping d'une row de base de données vers un objet Asset
    */
@@ -0,0 +1,331 @@
+/**
+ * Cache serveur read-through pour les lectures catalogue (Turso)
+ * LRU borné en mémoire, invalidation par tags, stale-while-revalidate
+ *
+ * Reprend les concepts de composables/useCache.ts (TTL, tags) et de
+ * scripts/lib/cache-invalidation.js (invalidation groupée), côté Nitro.
+ */
+
+// =====================================
+// TYPES
+// =====================================
+
+export type CatalogTag = 'products' | 'categories' | 'bundles' | 'realisations'
+
+interface CatalogCacheEntry<T = any> {
+  key: string
+  data: T
+  timestamp: number
+  ttl: number // Durée de fraîcheur en millisecondes
+  staleTtl: number // Fenêtre supplémentaire où la donnée périmée reste servie
+  tags: string[]
+}
+
+export interface CatalogCacheOptions<T = any> {
+  ttl?: number
+  staleTtl?: number
+  tags?: CatalogTag[]
+  /** Résultat partiel (source en erreur) : servi à la requête mais pas mis en cache */
+  cacheIf?: (data: T) => boolean
+}
+
+export interface CatalogCacheResult<T> {
+  data: T
+  cached: boolean
+  stale: boolean
+}
+
+export interface CatalogCacheStats {
+  hits: number
+  staleHits: number
+  misses: number
+  evictions: number
+  invalidations: number
+  revalidations: number
+  revalidationErrors: number
+  size: number
+  maxEntries: number
+  hitRate: number
+}
+
+// =====================================
+// CONFIGURATION
+// =====================================
+
+const DEFAULT_TTL = 60 * 1000 // 1 minute de fraîcheur
+const DEFAULT_STALE_TTL = 10 * 60 * 1000 // 10 minutes de données périmées servies
+const DEFAULT_MAX_ENTRIES = Number(process.env.CATALOG_CACHE_MAX_ENTRIES) || 200
+
+/**
+ * Tags impactés par type d'événement SSE (products:*, bundle:*, ...)
+ * Un produit modifié change aussi les prix/noms affichés dans les bundles
+ */
+const EVENT_TAGS: Record<string, CatalogTag[]> = {
+  product: ['products', 'bundles'],
+  bundle: ['bundles'],
+  category: ['categories', 'products'],
+  realisation: ['realisations']
+}
+
+// =====================================
+// CACHE
+// =====================================
+
+class CatalogCache {
+  private entries = new Map<string, CatalogCacheEntry>()
+  private tagIndex = new Map<string, Set<string>>()
+  private tagVersions = new Map<string, number>()
+  private inflight = new Map<string, { promise: Promise<any>; tags: string[] }>()
+  private stats = {
+    hits: 0,
+    staleHits: 0,
+    misses: 0,
+    evictions: 0,
+    invalidations: 0,
+    revalidations: 0,
+    revalidationErrors: 0
+  }
+
+  constructor(private maxEntries: number = DEFAULT_MAX_ENTRIES) {}
+
+  /**
+   * Lecture read-through : frais → hit, périmé → servi + revalidation en arrière-plan, sinon fetch
+   */
+  async getOrFetch<T>(
+    key: string,
+    fetchFn: () => Promise<T>,
+    options: CatalogCacheOptions<T> = {}
+  ): Promise<CatalogCacheResult<T>> {
+    const entry = this.entries.get(key)
+    const now = Date.now()
+
+    if (entry) {
+      const age = now - entry.timestamp
+
+      if (age < entry.ttl) {
+        this.touch(key, entry)
+        this.stats.hits++
+        return { data: entry.data as T, cached: true, stale: false }
+      }
+
+      if (age < entry.ttl + entry.staleTtl) {
+        this.touch(key, entry)
+        this.stats.staleHits++
+        this.revalidate(key, fetchFn, options)
+        return { data: entry.data as T, cached: true, stale: true }
+      }
+
+      this.delete(key)
+    }
+
+    this.stats.misses++
+    const data = await this.load(key, fetchFn, options)
+    return { data, cached: false, stale: false }
+  }
+
+  /**
+   * Invalide toutes les entrées portant au moins un des tags
+   */
+  invalidateTags(tags: string[]): number {
+    let removed = 0
+
+    for (const tag of tags) {
+      // Les fetchs en cours démarrés avant l'invalidation ne doivent pas réécrire le cache
+      this.tagVersions.set(tag, (this.tagVersions.get(tag) || 0) + 1)
+
+      const keys = this.tagIndex.get(tag)
+      if (keys) {
+        for (const key of [...keys]) {
+          if (this.delete(key)) removed++
+        }
+      }
+    }
+
+    // Une lecture après l'écriture ne doit pas rejoindre un fetch démarré avant elle
+    for (const [key, pending] of this.inflight) {
+      if (pending.tags.some(tag => tags.includes(tag))) {
+        this.inflight.delete(key)
+      }
+    }
+
+    this.stats.invalidations += removed
+    if (removed > 0) {
+      console.log(`🏷️ Catalog cache invalidé [${tags.join(', ')}]: ${removed} entrées`)
+    }
+    return removed
+  }
+
+  clear(): void {
+    this.entries.clear()
+    this.tagIndex.clear()
+    this.inflight.clear()
+  }
+
+  getStats(): CatalogCacheStats {
+    const lookups = this.stats.hits + this.stats.staleHits + this.stats.misses
+    return {
+      ...this.stats,
+      size: this.entries.size,
+      maxEntries: this.maxEntries,
+      hitRate: lookups > 0 ? (this.stats.hits + this.stats.staleHits) / lookups : 0
+    }
+  }
+
+  getEntries() {
+    const now = Date.now()
+    return Array.from(this.entries.values()).map(entry => ({
+      key: entry.key,
+      age: now - entry.timestamp,
+      ttl: entry.ttl,
+      staleTtl: entry.staleTtl,
+      tags: entry.tags
+    }))
+  }
+
+  // =====================================
+  // INTERNES
+  // =====================================
+
+  /**
+   * Fetch dédupliqué : les requêtes concurrentes sur une même clé partagent un seul aller-retour Turso
+   */
+  private load<T>(key: string, fetchFn: () => Promise<T>, options: CatalogCacheOptions<T>): Promise<T> {
+    const pending = this.inflight.get(key)
+    if (pending) return pending.promise
+
+    const tags = options.tags || []
+    const versions = tags.map(tag => this.tagVersions.get(tag) || 0)
+
+    const promise = fetchFn()
+      .then((data) => {
+        const invalidatedMeanwhile = tags.some((tag, i) => (this.tagVersions.get(tag) || 0) !== versions[i])
+        if (!invalidatedMeanwhile && (options.cacheIf?.(data) ?? true)) {
+          this.set(key, data, options)
+        }
+        return data
+      })
+      .finally(() => {
+        // Une invalidation a pu remplacer ce fetch par un plus récent
+        if (this.inflight.get(key)?.promise === promise) {
+          this.inflight.delete(key)
+        }
+      })
+
+    this.inflight.set(key, { promise, tags })
+    return promise
+  }
+
+  private revalidate<T>(key: string, fetchFn: () => Promise<T>, options: CatalogCacheOptions<T>): void {
+    if (this.inflight.has(key)) return
+
+    this.stats.revalidations++
+    this.load(key, fetchFn, options).catch((error) => {
+      // On garde la donnée périmée, la prochaine lecture retentera
+      this.stats.revalidationErrors++
+      console.warn(`⚠️ Catalog cache: revalidation échouée pour ${key}`, error)
+    })
+  }
+
+  private set<T>(key: string, data: T, options: CatalogCacheOptions): void {
+    this.delete(key)
+
+    const entry: CatalogCacheEntry<T> = {
+      key,
+      data,
+      timestamp: Date.now(),
+      ttl: options.ttl ?? DEFAULT_TTL,
+      staleTtl: options.staleTtl ?? DEFAULT_STALE_TTL,
+      tags: options.tags || []
+    }
+
+    this.entries.set(key, entry)
+    for (const tag of entry.tags) {
+      let keys = this.tagIndex.get(tag)
+      if (!keys) {
+        keys = new Set()
+        this.tagIndex.set(tag, keys)
+      }
+      keys.add(key)
+    }
+
+    // Éviction LRU : la Map conserve l'ordre d'insertion, la première clé est la moins récente
+    while (this.entries.size > this.maxEntries) {
+      const oldestKey = this.entries.keys().next().value as string
+      this.delete(oldestKey)
+      this.stats.evictions++
+    }
+  }
+
+  private touch(key: string, entry: CatalogCacheEntry): void {
+    this.entries.delete(key)
+    this.entries.set(key, entry)
+  }
+
+  private delete(key: string): boolean {
+    const entry = this.entries.get(key)
+    if (!entry) return false
+
+    this.entries.delete(key)
+    for (const tag of entry.tags) {
+      const keys = this.tagIndex.get(tag)
+      keys?.delete(key)
+      if (keys && keys.size === 0) {
+        this.tagIndex.delete(tag)
+      }
+    }
+    return true
+  }
+}
+
+// =====================================
+// API
+// =====================================
+
+/**
+ * Instance unique par process (survit au HMR comme les connexions SSE)
+ */
+export function getCatalogCache(): CatalogCache {
+  if (!(globalThis as any).__catalog_cache) {
+    (globalThis as any).__catalog_cache = new CatalogCache()
+  }
+  return (globalThis as any).__catalog_cache
+}
+
+/**
+ * Génère une clé de cache normalisée (même format que useCache.generateCacheKey)
+ */
+export function catalogCacheKey(key: string, params?: Record<string, any>): string {
+  if (!params) return key
+
+  const paramString = Object.keys(params)
+    .sort()
+    .map(k => `${k}=${JSON.stringify(params[k])}`)
+    .join('&')
+
+  return `${key}:${paramString}`
+}
+
+export function cachedCatalogQuery<T>(
+  key: string,
+  fetchFn: () => Promise<T>,
+  options: CatalogCacheOptions<T> = {}
+): Promise<CatalogCacheResult<T>> {
+  return getCatalogCache().getOrFetch(key, fetchFn, options)
+}
+
+export function invalidateCatalogTags(tags: CatalogTag[]): number {
+  return getCatalogCache().invalidateTags(tags)
+}
+
+/**
+ * Invalide les tags correspondant à un type d'événement SSE ('product:updated' → products, bundles)
+ */
+export function invalidateCatalogForEvent(eventType: string): number {
+  const entity = eventType.split(':')[0]
+  const tags = EVENT_TAGS[entity]
+  return tags ? invalidateCatalogTags(tags) : 0
+}
+
+export function getCatalogCacheStats(): CatalogCacheStats {
+  return getCatalogCache().getStats()
+}
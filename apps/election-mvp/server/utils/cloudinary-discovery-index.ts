@@ -0,0 +1,399 @@
+/**
+ * Index persistant de l'auto-discovery Cloudinary (migration 008)
+ * Synchronisé par pages next_cursor, en incrémental sur uploaded_at ;
+ * GET /api/realisations ne lit plus que cette table.
+ */
+
+import type { Client } from "@libsql/client";
+import type { HybridRealisation } from "@ns2po/types";
+import { createWriteBatch } from "./db-batch";
+import { tableExists } from "./database";
+import {
+  CREATIVE_FOLDER_EXPRESSION,
+  searchCloudinaryCreativePage,
+  cloudinaryImageToHybridRealisation,
+  creativeImageUrl,
+  parseCreativeFilename,
+  type CreativeSearchPage,
+  type CreativeSearchParams,
+} from "./cloudinary-discovery";
+
+// Taille de page maximale autorisée par l'API Search
+const PAGE_SIZE = 500;
+const SYNC_INTERVAL_MS = Number(process.env.DISCOVERY_SYNC_INTERVAL_MS) || 5 * 60 * 1000;
+const FULL_SYNC_INTERVAL_MS = Number(process.env.DISCOVERY_FULL_SYNC_INTERVAL_MS) || 24 * 60 * 60 * 1000;
+
+export type CreativeSearchFn = (params: CreativeSearchParams) => Promise<CreativeSearchPage>;
+
+export interface DiscoverySyncOptions {
+  /** Scan complet : ré-indexe tout et marque les images disparues de Cloudinary */
+  full?: boolean;
+  /** API Search injectable (stand-in local pour les tests) */
+  search?: CreativeSearchFn;
+  pageSize?: number;
+  scope?: string;
+}
+
+export interface DiscoverySyncResult {
+  mode: "full" | "incremental";
+  pages: number;
+  indexed: number;
+  changed: number;
+  removed: number;
+  watermark: string | null;
+  duration: number;
+}
+
+export interface DiscoveryState {
+  watermark: string | null;
+  lastRunAt: string | null;
+  lastFullSyncAt: string | null;
+  lastStatus: string | null;
+  lastError: string | null;
+  indexedCount: number;
+  /** Synchronisation interrompue à reprendre (migration 009) : prochaine page et identifiant */
+  syncCursor: string | null;
+  syncId: string | null;
+  syncMode: "full" | "incremental" | null;
+  syncWatermark: string | null;
+}
+
+let resumeColumnsAvailable = false;
+
+/**
+ * Colonnes de reprise (migration 009) : sans elles, une synchro interrompue repart de zéro
+ */
+async function hasResumeColumns(db: Client): Promise<boolean> {
+  if (resumeColumnsAvailable) return true;
+  const result = await db.execute(
+    "SELECT 1 FROM pragma_table_info('cloudinary_discovery_state') WHERE name = 'sync_cursor'"
+  );
+  resumeColumnsAvailable = result.rows.length > 0;
+  return resumeColumnsAvailable;
+}
+
+/**
+ * Upsert d'une image : le parsing du nom de fichier (titre, tags, type) est fait une seule fois ici
+ * En incrémental, une image déjà indexée avec le même uploaded_at n'est pas réécrite.
+ */
+function upsertStatement(resource: any, syncId: string, onlyIfChanged: boolean) {
+  const filename = resource.public_id.split("/").pop();
+  const realisation = cloudinaryImageToHybridRealisation({ ...resource, filename });
+
+  return {
+    sql: `INSERT INTO cloudinary_discovery (
+            public_id, realisation_id, filename, secure_url, format, bytes, width, height,
+            cloudinary_created_at, uploaded_at, parsed_type, title, description, tags,
+            is_deleted, last_seen_sync, indexed_at
+          ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, ?, CURRENT_TIMESTAMP)
+          ON CONFLICT(public_id) DO UPDATE SET
+            filename = excluded.filename,
+            secure_url = excluded.secure_url,
+            format = excluded.format,
+            bytes = excluded.bytes,
+            width = excluded.width,
+            height = excluded.height,
+            cloudinary_created_at = excluded.cloudinary_created_at,
+            uploaded_at = excluded.uploaded_at,
+            parsed_type = excluded.parsed_type,
+            title = excluded.title,
+            description = excluded.description,
+            tags = excluded.tags,
+            is_deleted = 0,
+            last_seen_sync = excluded.last_seen_sync,
+            indexed_at = CURRENT_TIMESTAMP
+          ${onlyIfChanged ? "WHERE cloudinary_discovery.is_deleted = 1 OR cloudinary_discovery.uploaded_at IS NOT excluded.uploaded_at" : ""}`,
+    args: [
+      resource.public_id,
+      realisation.id,
+      filename,
+      resource.secure_url ?? null,
+      resource.format ?? null,
+      resource.bytes ?? null,
+      resource.width ?? null,
+      resource.height ?? null,
+      resource.created_at ?? null,
+      resource.uploaded_at ?? resource.created_at ?? null,
+      parseCreativeFilename(filename).type,
+      realisation.title,
+      realisation.description ?? null,
+      JSON.stringify(realisation.tags),
+      syncId,
+    ],
+  };
+}
+
+/**
+ * Lit l'état de synchronisation d'un scope (null si jamais synchronisé)
+ */
+export async function getDiscoveryState(
+  db: Client,
+  scope: string = CREATIVE_FOLDER_EXPRESSION
+): Promise<DiscoveryState | null> {
+  const result = await db.execute({
+    sql: "SELECT * FROM cloudinary_discovery_state WHERE scope = ?",
+    args: [scope],
+  });
+  return result.rows.length > 0 ? mapStateRow(result.rows[0]) : null;
+}
+
+function mapStateRow(row: any): DiscoveryState {
+  return {
+    watermark: row.watermark ?? null,
+    lastRunAt: row.last_run_at ?? null,
+    lastFullSyncAt: row.last_full_sync_at ?? null,
+    lastStatus: row.last_status ?? null,
+    lastError: row.last_error ?? null,
+    indexedCount: Number(row.indexed_count || 0),
+    syncCursor: row.sync_cursor ?? null,
+    syncId: row.sync_id ?? null,
+    syncMode: row.sync_mode ?? null,
+    syncWatermark: row.sync_watermark ?? null,
+  };
+}
+
+/**
+ * Synchronise l'index avec Cloudinary
+ * - incrémental : uniquement les images uploadées depuis le watermark
+ * - complet : toutes les images, puis marque is_deleted celles qui n'ont pas été vues
+ * Le next_cursor et le watermark partiel sont enregistrés avec chaque page (migration 009) :
+ * une synchro interrompue reprend à la page suivante, le watermark n'avance qu'en fin de synchro.
+ */
+export async function syncDiscoveryIndex(
+  db: Client,
+  options: DiscoverySyncOptions = {}
+): Promise<DiscoverySyncResult> {
+  const startTime = Date.now();
+  const scope = options.scope || CREATIVE_FOLDER_EXPRESSION;
+  const search = options.search || searchCloudinaryCreativePage;
+  const pageSize = Math.min(options.pageSize || PAGE_SIZE, PAGE_SIZE);
+
+  const state = await getDiscoveryState(db, scope);
+  const resumable = await hasResumeColumns(db);
+  // Un scan complet demandé explicitement repart de zéro
+  const resuming = resumable && !options.full && !!state?.syncCursor && !!state.syncId;
+
+  const full = resuming
+    ? state!.syncMode === "full"
+    : options.full || !state?.watermark || isOlderThan(state.lastFullSyncAt, FULL_SYNC_INTERVAL_MS);
+  const mode = full ? "full" : "incremental";
+  const syncId = resuming ? state!.syncId! : `${mode}_${startTime}`;
+
+  // Bornes incluses : les images de même uploaded_at que le watermark sont simplement ré-upsertées
+  const expression = full ? scope : `${scope} AND uploaded_at>="${state!.watermark}"`;
+
+  console.log(
+    `🔄 Synchronisation index découverte (${mode})${full ? "" : ` depuis ${state!.watermark}`}${resuming ? " - reprise" : ""}`
+  );
+
+  let nextCursor: string | undefined = resuming ? state!.syncCursor! : undefined;
+  let pages = 0;
+  let indexed = 0;
+  let changed = 0;
+  let removed = 0;
+  let syncWatermark = resuming ? state!.syncWatermark : null;
+
+  try {
+    do {
+      const page = await search({ expression, maxResults: pageSize, nextCursor });
+      pages++;
+
+      const batch = createWriteBatch(db);
+      for (const resource of page.resources) {
+        batch.add(upsertStatement(resource, syncId, !full));
+        const uploadedAt = resource.uploaded_at ?? resource.created_at;
+        if (uploadedAt && (!syncWatermark || uploadedAt > syncWatermark)) {
+          syncWatermark = uploadedAt;
+        }
+      }
+      batch.add(resumable
+        ? {
+            sql: `INSERT INTO cloudinary_discovery_state (
+                    scope, last_run_at, last_status, sync_cursor, sync_id, sync_mode, sync_watermark
+                  ) VALUES (?, CURRENT_TIMESTAMP, 'running', ?, ?, ?, ?)
+                  ON CONFLICT(scope) DO UPDATE SET
+                    last_run_at = excluded.last_run_at,
+                    last_status = excluded.last_status,
+                    sync_cursor = excluded.sync_cursor,
+                    sync_id = excluded.sync_id,
+                    sync_mode = excluded.sync_mode,
+                    sync_watermark = excluded.sync_watermark`,
+            args: [scope, page.next_cursor ?? null, syncId, mode, syncWatermark],
+          }
+        : {
+            sql: `INSERT INTO cloudinary_discovery_state (scope, last_run_at, last_status)
+                  VALUES (?, CURRENT_TIMESTAMP, 'running')
+                  ON CONFLICT(scope) DO UPDATE SET
+                    last_run_at = excluded.last_run_at,
+                    last_status = excluded.last_status`,
+            args: [scope],
+          });
+      const results = await batch.commit();
+
+      indexed += page.resources.length;
+      changed += results
+        .slice(0, page.resources.length)
+        .reduce((total, result) => total + result.rowsAffected, 0);
+      nextCursor = page.next_cursor;
+    } while (nextCursor);
+
+    const batch = createWriteBatch(db);
+    let removedIndex = -1;
+    if (full) {
+      removedIndex = batch.add({
+        sql: `UPDATE cloudinary_discovery SET is_deleted = 1
+              WHERE is_deleted = 0 AND (last_seen_sync IS NULL OR last_seen_sync != ?)`,
+        args: [syncId],
+      });
+    }
+    batch.add({
+      sql: `UPDATE cloudinary_discovery_state SET
+              watermark = CASE WHEN watermark IS NULL OR ? > watermark THEN ? ELSE watermark END,
+              last_status = 'success',
+              last_error = NULL,
+              last_run_at = CURRENT_TIMESTAMP,
+              last_full_sync_at = CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE last_full_sync_at END,
+              indexed_count = (SELECT COUNT(*) FROM cloudinary_discovery WHERE is_deleted = 0)
+              ${resumable ? ", sync_cursor = NULL, sync_id = NULL, sync_mode = NULL, sync_watermark = NULL" : ""}
+            WHERE scope = ?`,
+      args: [syncWatermark, syncWatermark, full ? 1 : 0, scope],
+    });
+    const results = await batch.commit();
+    if (removedIndex >= 0) {
+      removed = results[removedIndex].rowsAffected;
+    }
+  } catch (error: any) {
+    console.error("❌ Erreur synchronisation index découverte:", error);
+    // Échec dès la page reprise (curseur Cloudinary expiré) : la prochaine synchro repart de zéro
+    const dropCursor = resuming && pages === 0;
+    await db.execute({
+      sql: `INSERT INTO cloudinary_discovery_state (scope, last_run_at, last_status, last_error)
+            VALUES (?, CURRENT_TIMESTAMP, 'error', ?)
+            ON CONFLICT(scope) DO UPDATE SET
+              last_run_at = excluded.last_run_at,
+              last_status = excluded.last_status,
+              last_error = excluded.last_error
+              ${dropCursor ? ", sync_cursor = NULL, sync_id = NULL, sync_mode = NULL, sync_watermark = NULL" : ""}`,
+      args: [scope, error?.message || String(error)],
+    }).catch(() => {});
+    throw error;
+  }
+
+  const watermark = [state?.watermark ?? null, syncWatermark].reduce<string | null>(
+    (max, value) => (value && (!max || value > max) ? value : max),
+    null
+  );
+  const result = { mode, pages, indexed, changed, removed, watermark, duration: Date.now() - startTime } as DiscoverySyncResult;
+  console.log(`✅ Index découverte: ${indexed} images parcourues, ${changed} écrites, ${removed} retirées (${pages} pages, ${result.duration}ms)`);
+  return result;
+}
+
+function isOlderThan(timestamp: string | null, maxAgeMs: number): boolean {
+  if (!timestamp) return true;
+  // CURRENT_TIMESTAMP SQLite est en UTC sans suffixe
+  const time = Date.parse(timestamp.includes("T") ? timestamp : `${timestamp.replace(" ", "T")}Z`);
+  return Number.isNaN(time) || Date.now() - time > maxAgeMs;
+}
+
+/**
+ * Exécute une synchronisation dans la file du process : jamais deux synchros concurrentes
+ * (état et upserts partagés). Une demande arrivant pendant une synchro attend sa fin puis s'exécute.
+ */
+export function runDiscoverySync(
+  db: Client,
+  options: DiscoverySyncOptions = {},
+  onSynced?: (result: DiscoverySyncResult) => void
+): Promise<DiscoverySyncResult> {
+  const globalRef = globalThis as any;
+  const previous: Promise<unknown> = globalRef.__discovery_sync || Promise.resolve();
+
+  const run: Promise<DiscoverySyncResult> = previous
+    .catch(() => undefined)
+    .then(() => syncDiscoveryIndex(db, options))
+    .then((result) => {
+      if (result.changed > 0 || result.removed > 0) onSynced?.(result);
+      return result;
+    })
+    .finally(() => {
+      if (globalRef.__discovery_sync === run) globalRef.__discovery_sync = null;
+    });
+
+  globalRef.__discovery_sync = run;
+  return run;
+}
+
+/**
+ * Lance une synchronisation incrémentale si la dernière date de plus de DISCOVERY_SYNC_INTERVAL_MS
+ * Une synchro déjà en cours est rejointe ; onSynced est appelé si l'index a changé.
+ */
+export function refreshDiscoveryIndexIfStale(
+  db: Client,
+  state: DiscoveryState | null,
+  onSynced?: (result: DiscoverySyncResult) => void
+): Promise<DiscoverySyncResult> | null {
+  const running: Promise<DiscoverySyncResult> | null = (globalThis as any).__discovery_sync;
+  if (running) {
+    return running.then((result) => {
+      if (result.changed > 0 || result.removed > 0) onSynced?.(result);
+      return result;
+    });
+  }
+  if (state && !isOlderThan(state.lastRunAt, SYNC_INTERVAL_MS)) return null;
+
+  return runDiscoverySync(db, {}, onSynced);
+}
+
+/**
+ * Réalisations auto-discovery depuis l'index (blacklist filtrée en SQL), avec l'état de synchro
+ * Un seul aller-retour Turso pour les deux lectures.
+ */
+export async function readDiscoveryIndex(
+  db: Client,
+  scope: string = CREATIVE_FOLDER_EXPRESSION
+): Promise<{ realisations: HybridRealisation[]; state: DiscoveryState | null }> {
+  const blacklistFilter = (await tableExists(db, "realisation_blacklist"))
+    ? "AND NOT EXISTS (SELECT 1 FROM realisation_blacklist b WHERE b.public_id = d.realisation_id)"
+    : "";
+
+  const [rows, stateRows] = await db.batch(
+    [
+      `SELECT d.* FROM cloudinary_discovery d
+       WHERE d.is_deleted = 0 ${blacklistFilter}
+       ORDER BY d.title`,
+      { sql: "SELECT * FROM cloudinary_discovery_state WHERE scope = ?", args: [scope] },
+    ],
+    "read"
+  );
+
+  return {
+    realisations: rows.rows.map(discoveryRowToHybridRealisation),
+    state: stateRows.rows.length > 0 ? mapStateRow(stateRows.rows[0]) : null,
+  };
+}
+
+function discoveryRowToHybridRealisation(row: any): HybridRealisation {
+  return {
+    id: row.realisation_id,
+    title: row.title,
+    description: row.description || undefined,
+    cloudinaryPublicIds: [row.public_id],
+    cloudinaryUrls: [creativeImageUrl(row.public_id, row.secure_url)],
+    productIds: [],
+    categoryIds: [],
+    customizationOptionIds: [],
+    tags: JSON.parse(row.tags || "[]"),
+    isFeatured: false,
+    isActive: true,
+    order: undefined,
+    source: "cloudinary-auto-discovery" as const,
+    cloudinaryMetadata: {
+      publicId: row.public_id,
+      width: Number(row.width),
+      height: Number(row.height),
+      format: row.format,
+      bytes: Number(row.bytes),
+      createdAt: row.cloudinary_created_at,
+      url: row.secure_url,
+    },
+  };
+}
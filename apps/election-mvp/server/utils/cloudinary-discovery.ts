@@ -143,13 +143,46 @@ export function generateTags(filename: string): string[] {
   return [...new Set(tags)]; // Supprimer les doublons
 }
 
+export const CREATIVE_FOLDER_EXPRESSION = "folder:ns2po/gallery/creative/*";
+
+export interface CreativeSearchPage {
+  resources: any[];
+  next_cursor?: string;
+}
+
+export interface CreativeSearchParams {
+  expression: string;
+  maxResults: number;
+  nextCursor?: string;
+}
+
+/**
+ * Une page de l'API Search Cloudinary, triée par uploaded_at croissant
+ * (ordre requis par la synchronisation incrémentale de l'index de découverte)
+ */
+export async function searchCloudinaryCreativePage(
+  params: CreativeSearchParams
+): Promise<CreativeSearchPage> {
+  let query = cloudinary.search
+    .expression(params.expression)
+    .sort_by("uploaded_at", "asc")
+    .max_results(params.maxResults);
+
+  if (params.nextCursor) {
+    query = query.next_cursor(params.nextCursor);
+  }
+
+  const result = await query.execute();
+  return { resources: result.resources || [], next_cursor: result.next_cursor };
+}
+
 /**
  * Récupère toutes les images du dossier creative Cloudinary
  */
 export async function getCloudinaryCreativeImages(): Promise<any[]> {
   try {
     const result = await cloudinary.search
-      .expression("folder:ns2po/gallery/creative/*")
+      .expression(CREATIVE_FOLDER_EXPRESSION)
       .sort_by("created_at", "desc")
       .max_results(500)
       .execute();
@@ -170,6 +203,25 @@ export async function getCloudinaryCreativeImages(): Promise<any[]> {
   }
 }
 
+const LEGACY_CLOUD_NAME = "dsrvzogof";
+const CREATIVE_TRANSFORMATION = "w_800,h_600,c_fit,f_auto,q_auto";
+
+/**
+ * Compte Cloudinary d'une image : celui configuré, sinon celui de son URL d'origine
+ */
+function resolveCloudName(secureUrl?: string | null): string {
+  if (process.env.CLOUDINARY_CLOUD_NAME) return process.env.CLOUDINARY_CLOUD_NAME;
+  const fromUrl = secureUrl?.match(/res\.cloudinary\.com\/([^/]+)\//)?.[1];
+  return fromUrl || LEGACY_CLOUD_NAME;
+}
+
+/**
+ * URL optimisée (800x600, c_fit) d'une image du dossier créatif
+ */
+export function creativeImageUrl(publicId: string, secureUrl?: string | null): string {
+  return `https://res.cloudinary.com/${resolveCloudName(secureUrl)}/image/upload/${CREATIVE_TRANSFORMATION}/${publicId}`;
+}
+
 /**
  * Transforme une image Cloudinary en HybridRealisation
  */
@@ -183,9 +235,7 @@ export function cloudinaryImageToHybridRealisation(
     title: generateSmartTitle(filename),
     description: `Image découverte automatiquement depuis Cloudinary. Type: ${parseCreativeFilename(filename).type || "non spécifié"}.`,
     cloudinaryPublicIds: [image.public_id],
-    cloudinaryUrls: [
-      `https://res.cloudinary.com/dsrvzogof/image/upload/w_800,h_600,c_fit,f_auto,q_auto/${image.public_id}`,
-    ],
+    cloudinaryUrls: [creativeImageUrl(image.public_id, image.secure_url)],
     productIds: [],
     categoryIds: [],
     customizationOptionIds: [],
@@ -220,6 +270,6 @@ export function generateCloudinaryUrls(
         : publicId;
 
     // Transformations simplifiées et fiables - use c_fit to preserve proportions
-    return `https://res.cloudinary.com/dsrvzogof/image/upload/w_800,h_600,c_fit,f_auto,q_auto/${fullPath}`;
+    return creativeImageUrl(fullPath);
   });
 }
@@ -4,6 +4,7 @@
  */
 
 import { v2 as cloudinary, type UploadApiResponse } from 'cloudinary'
+import type { Writable } from 'node:stream'
 import type { CloudinaryUploadResult } from '../../utils/cloudinary'
 
 // Types pour notre service
@@ -22,6 +23,14 @@ export interface UploadOptions {
   overwrite?: boolean
 }
 
+/**
+ * Flux d'upload : les octets écrits dans stream partent vers Cloudinary au fil de l'eau
+ */
+export interface UploadSink {
+  stream: Writable
+  result: Promise<CloudinaryUploadResult>
+}
+
 export interface ListResourcesOptions {
   type?: 'image' | 'video' | 'raw'
   prefix?: string
@@ -101,6 +110,16 @@ class CloudinaryService {
     fileData: Buffer | string,
     options: UploadOptions = {}
   ): Promise<CloudinaryUploadResult> {
+    const { stream, result } = this.createUploadStream(options)
+    stream.end(fileData)
+    return result
+  }
+
+  /**
+   * Ouvre un flux d'upload Cloudinary (upload_stream) sans charger le fichier en mémoire
+   * Utilisé par le pipeline multipart en streaming (server/utils/streaming-upload.ts).
+   */
+  createUploadStream(options: UploadOptions = {}): UploadSink {
     this.initializeConfig()
 
     const uploadOptions = {
@@ -112,20 +131,19 @@ class CloudinaryService {
       ...options
     }
 
-    try {
-      const result = await new Promise<UploadApiResponse>((resolve, reject) => {
-        cloudinary.uploader.upload_stream(
-          uploadOptions,
-          (error, result) => {
-            if (error) reject(error)
-            else if (result) resolve(result)
-            else reject(new Error('No result from Cloudinary'))
-          }
-        ).end(fileData)
-      })
-
+    let stream!: Writable
+    const result = new Promise<UploadApiResponse>((resolve, reject) => {
+      stream = cloudinary.uploader.upload_stream(
+        uploadOptions,
+        (error, result) => {
+          if (error) reject(error)
+          else if (result) resolve(result)
+          else reject(new Error('No result from Cloudinary'))
+        }
+      )
+    })
       // Transformation en format standardisé
-      return {
+      .then((result): CloudinaryUploadResult => ({
         public_id: result.public_id,
         secure_url: result.secure_url,
         url: result.url,
@@ -137,15 +155,17 @@ class CloudinaryService {
         resource_type: result.resource_type,
         thumbnail: this.generateThumbnailUrl(result.public_id),
         preview: this.generatePreviewUrl(result.public_id)
-      }
-    } catch (error) {
-      console.error('❌ Erreur upload Cloudinary:', error)
-      throw createError({
-        statusCode: 500,
-        statusMessage: 'Erreur lors de l\'upload vers Cloudinary',
-        data: { error: error instanceof Error ? error.message : 'Unknown error' }
+      }))
+      .catch((error) => {
+        console.error('❌ Erreur upload Cloudinary:', error)
+        throw createError({
+          statusCode: 500,
+          statusMessage: 'Erreur lors de l\'upload vers Cloudinary',
+          data: { error: error instanceof Error ? error.message : 'Unknown error' }
+        })
       })
-    }
+
+    return { stream, result }
   }
 
   /**
@@ -409,6 +429,7 @@ export const cloudinaryService = CloudinaryService.getInstance()
 export type {
   CloudinaryUploadResult,
   UploadOptions,
+  UploadSink,
   ListResourcesOptions,
   DeleteOptions
 }
\ No newline at end of file
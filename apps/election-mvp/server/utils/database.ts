@@ -4,12 +4,31 @@
 
 /* global useRuntimeConfig */
 
+import { mkdirSync } from 'node:fs'
+import { dirname, resolve } from 'node:path'
 import { createClient } from '@libsql/client'
+import { instrumentClient } from '@ns2po/database'
+import { ReplicaSync, type ReplicaSyncResult } from './replica-sync'
+
+const REPLICA_SYNC_TIMEOUT_MS = 5000
 
 let dbClient: ReturnType<typeof createClient> | null = null
+let rawClient: ReturnType<typeof createClient> | null = null
+let replicaSync: ReplicaSync | null = null
+
+/**
+ * Serveur libsql local (turso dev, sqld) : pas de jeton requis
+ */
+function isLocalDatabaseUrl(url: string): boolean {
+  return /^(file:|https?:\/\/(localhost|127\.0\.0\.1)(:\d+)?)/.test(url)
+}
 
 /**
  * Get or create database client
+ * Le client renvoyé est instrumenté (latences, allers-retours par requête : voir /api/admin/metrics)
+ *
+ * Mode réplica embarqué (TURSO_REPLICA_PATH) : lectures sur un fichier SQLite local,
+ * écritures transmises au primaire (TURSO_DATABASE_URL), synchronisation périodique et sur événement.
  */
 export function getDatabase() {
   if (!dbClient) {
@@ -21,8 +40,9 @@ export function getDatabase() {
     // Fallback direct sur process.env si runtimeConfig échoue (fix Railway)
     const databaseUrl = tursoConfig?.databaseUrl || process.env.TURSO_DATABASE_URL
     const authToken = tursoConfig?.authToken || process.env.TURSO_AUTH_TOKEN
+    const replicaPath = tursoConfig?.replicaPath || process.env.TURSO_REPLICA_PATH
 
-    if (!databaseUrl || !authToken) {
+    if (!databaseUrl || (!authToken && !isLocalDatabaseUrl(databaseUrl))) {
       console.warn('⚠️ Turso database not configured - using in-memory fallback')
       console.warn('  Debug info:', {
         runtimeConfig: !!tursoConfig,
@@ -36,11 +56,25 @@ export function getDatabase() {
     }
 
     try {
-      dbClient = createClient({
-        url: databaseUrl as string,
-        authToken: authToken as string,
-      })
-      console.log('✅ Connected to Turso database via', tursoConfig?.databaseUrl ? 'runtimeConfig' : 'process.env fallback')
+      if (replicaPath) {
+        const replicaFile = resolve(replicaPath)
+        mkdirSync(dirname(replicaFile), { recursive: true })
+
+        rawClient = createClient({
+          url: `file:${replicaFile}`,
+          syncUrl: databaseUrl as string,
+          authToken: authToken as string | undefined,
+        })
+        replicaSync = createReplicaSync(rawClient, replicaFile, databaseUrl as string, tursoConfig?.replicaSyncInterval)
+        console.log(`✅ Turso embedded replica ${replicaFile} ← ${databaseUrl.split('?')[0]}`)
+      } else {
+        rawClient = createClient({
+          url: databaseUrl as string,
+          authToken: authToken as string | undefined,
+        })
+        console.log('✅ Connected to Turso database via', tursoConfig?.databaseUrl ? 'runtimeConfig' : 'process.env fallback')
+      }
+      dbClient = instrumentClient(rawClient)
     } catch (error) {
       console.error('❌ Failed to connect to Turso database:', error)
       return null
@@ -50,6 +84,104 @@ export function getDatabase() {
   return dbClient
 }
 
+/**
+ * Client non instrumenté, même connexion que getDatabase()
+ * Réservé aux écritures internes (journal system_logs) pour qu'elles n'apparaissent pas dans les métriques
+ */
+export function getRawDatabase() {
+  getDatabase()
+  return rawClient
+}
+
+function createReplicaSync(
+  client: ReturnType<typeof createClient>,
+  path: string,
+  syncUrl: string,
+  intervalSeconds?: string | number
+): ReplicaSync {
+  // Valeur absente ou invalide : période par défaut de ReplicaSync (setInterval(fn, NaN) tournerait en boucle)
+  const seconds = intervalSeconds === undefined || intervalSeconds === '' ? NaN : Number(intervalSeconds)
+  const replica = new ReplicaSync(client, {
+    path,
+    syncUrl,
+    intervalMs: Number.isFinite(seconds) ? seconds * 1000 : undefined
+  })
+
+  replica.onSynced((result) => {
+    // Tables créées par une migration côté primaire : la détection mise en cache n'est plus valable
+    if (result.framesSynced > 0) {
+      knownTables.clear()
+      missingTables.clear()
+    }
+  })
+
+  // Première synchronisation lancée et attendue par le plugin database (les requêtes patientent jusque-là)
+  replica.start()
+  return replica
+}
+
+/**
+ * Synchroniseur du réplica embarqué, créé par getDatabase() (null si la base est distante)
+ */
+export function getReplicaSync(): ReplicaSync | null {
+  return replicaSync
+}
+
+/**
+ * Rapatrie les écritures du primaire avant de relire (webhook, synchronisation admin)
+ * Attente bornée : au-delà, la synchronisation continue en arrière-plan. null hors mode réplica.
+ */
+export async function syncReplica(reason: string, timeoutMs = REPLICA_SYNC_TIMEOUT_MS): Promise<ReplicaSyncResult | null> {
+  const replica = getReplicaSync()
+  if (!replica) return null
+
+  let timer: ReturnType<typeof setTimeout> | undefined
+  const timeout = new Promise<never>((_, reject) => {
+    timer = setTimeout(() => reject(new Error(`Synchronisation réplica > ${timeoutMs}ms`)), timeoutMs)
+  })
+
+  try {
+    return await Promise.race([replica.sync(reason), timeout])
+  } finally {
+    clearTimeout(timer)
+  }
+}
+
+const knownTables = new Map<string, boolean>()
+const missingTables = new Map<string, number>()
+
+// Une table absente est revérifiée périodiquement : une migration appliquée à chaud est prise en compte
+const MISSING_TABLE_RECHECK_MS = 60 * 1000
+
+/**
+ * Vérifie qu'une table issue d'une migration optionnelle existe
+ * Présence mise en cache pour la durée du process, absence pour MISSING_TABLE_RECHECK_MS.
+ */
+export async function tableExists(db: ReturnType<typeof createClient>, table: string): Promise<boolean> {
+  if (knownTables.has(table)) return true
+
+  const checkedAt = missingTables.get(table)
+  if (checkedAt !== undefined && Date.now() - checkedAt < MISSING_TABLE_RECHECK_MS) return false
+
+  try {
+    const result = await db.execute({
+      sql: "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+      args: [table]
+    })
+    const exists = result.rows.length > 0
+    if (exists) {
+      knownTables.set(table, true)
+      missingTables.delete(table)
+    } else {
+      missingTables.set(table, Date.now())
+    }
+    return exists
+  } catch (error) {
+    console.warn(`⚠️ Impossible de vérifier la table ${table}:`, error)
+    return false
+  }
+}
+
 /**
  * Initialize database tables
  */
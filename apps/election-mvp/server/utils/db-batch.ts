@@ -0,0 +1,47 @@
+/**
+ * Écritures groupées Turso : un seul aller-retour réseau par opération métier
+ * S'appuie sur libsql batch() qui exécute le lot dans une transaction implicite
+ */
+
+import type { Client, InStatement, ResultSet } from '@libsql/client'
+
+/**
+ * Lot d'instructions exécuté de façon atomique (tout ou rien)
+ * Les SELECT peuvent être ajoutés en fin de lot pour relire l'état écrit sans aller-retour supplémentaire.
+ */
+export class WriteBatch {
+  private statements: InStatement[] = []
+
+  constructor(private db: Client) {}
+
+  /**
+   * Ajoute une instruction et retourne son index dans les résultats du commit
+   */
+  add(statement: InStatement): number {
+    this.statements.push(statement)
+    return this.statements.length - 1
+  }
+
+  addAll(statements: InStatement[]): void {
+    this.statements.push(...statements)
+  }
+
+  get size(): number {
+    return this.statements.length
+  }
+
+  /**
+   * Envoie le lot ; si une instruction échoue, libsql annule l'ensemble (ROLLBACK)
+   */
+  async commit(): Promise<ResultSet[]> {
+    if (this.statements.length === 0) return []
+
+    const statements = this.statements
+    this.statements = []
+    return this.db.batch(statements, 'write')
+  }
+}
+
+export function createWriteBatch(db: Client): WriteBatch {
+  return new WriteBatch(db)
+}
@@ -2,7 +2,7 @@
  * Utilitaire de logging système
  */
 
-import { getDatabase } from "./database"
+import { getRawDatabase } from "./database"
 
 interface LogEntry {
   level: 'info' | 'warn' | 'error' | 'debug'
@@ -16,9 +16,11 @@ interface LogEntry {
 class SystemLogger {
   private static instance: SystemLogger
   private db: any = null
+  private tableReady = false
 
   private constructor() {
-    this.db = getDatabase()
+    // Client brut : les logs de requêtes lentes / N+1 ne doivent pas alimenter les métriques
+    this.db = getRawDatabase()
   }
 
   public static getInstance(): SystemLogger {
@@ -29,7 +31,7 @@ class SystemLogger {
   }
 
   private async ensureLogTable() {
-    if (!this.db) return
+    if (!this.db || this.tableReady) return
 
     try {
       await this.db.execute({
@@ -61,6 +63,8 @@ class SystemLogger {
         sql: `CREATE INDEX IF NOT EXISTS idx_system_logs_source ON system_logs(source)`,
         args: []
       })
+
+      this.tableReady = true
     } catch (error) {
       console.error('❌ Erreur création table system_logs:', error)
     }
@@ -0,0 +1,251 @@
+/**
+ * Synchronisation d'un réplica embarqué libsql (fichier SQLite local + syncUrl)
+ * Les lectures sont servies par le fichier local, les écritures partent vers le primaire ;
+ * ce module décide quand rapatrier les changements du primaire et mesure la fraîcheur du réplica.
+ *
+ * - sync() : une seule synchronisation à la fois, les appels concurrents partagent la suivante
+ * - requestSync() : synchronisation différée (regroupe les rafales d'événements)
+ * - start() : synchronisation périodique
+ */
+
+const DEFAULT_INTERVAL_MS = (Number(process.env.TURSO_REPLICA_SYNC_INTERVAL) || 60) * 1000
+const DEFAULT_DEBOUNCE_MS = Number(process.env.TURSO_REPLICA_SYNC_DEBOUNCE_MS) || 500
+// Au-delà, setInterval/setTimeout ramènent le délai à 1ms
+const MAX_TIMER_MS = 2_147_483_647
+
+/**
+ * Délai utilisable par un timer : NaN, Infini ou négatif → valeur par défaut
+ */
+function timerMs(value: number | undefined, fallback: number): number {
+  if (value === undefined || !Number.isFinite(value) || value < 0) return fallback
+  return Math.min(value, MAX_TIMER_MS)
+}
+
+/** Sous-ensemble du client libsql utilisé ici (Client.sync() en mode réplica embarqué) */
+export interface SyncableClient {
+  sync(): Promise<{ frame_no: number; frames_synced: number } | undefined>
+}
+
+export interface ReplicaSyncOptions {
+  /** Chemin du fichier local (affiché dans le statut) */
+  path?: string
+  /** URL du primaire (affichée masquée dans le statut) */
+  syncUrl?: string
+  /** Période de synchronisation automatique (0 = désactivée) */
+  intervalMs?: number
+  /** Délai de regroupement des requestSync() */
+  debounceMs?: number
+  /** Âge au-delà duquel le réplica est considéré comme périmé (par défaut 3 périodes) */
+  staleAfterMs?: number
+}
+
+export interface ReplicaSyncResult {
+  reason: string
+  at: string
+  durationMs: number
+  frameNo: number | null
+  framesSynced: number
+}
+
+export type ReplicaHealth = 'up' | 'stale' | 'down'
+
+export interface ReplicaStatus {
+  mode: 'embedded-replica'
+  health: ReplicaHealth
+  path?: string
+  syncUrl?: string
+  intervalMs: number
+  staleAfterMs: number
+  syncing: boolean
+  lastSync: ReplicaSyncResult | null
+  stalenessMs: number | null
+  lastError: { message: string; at: string; reason: string } | null
+  consecutiveFailures: number
+  stats: {
+    syncs: number
+    failures: number
+    coalesced: number
+    framesSynced: number
+  }
+}
+
+/**
+ * Masque le jeton éventuel d'une URL libsql ; on n'affiche que le protocole et l'hôte
+ */
+function maskUrl(url?: string): string | undefined {
+  if (!url) return undefined
+  try {
+    const parsed = new URL(url)
+    return `${parsed.protocol}//${parsed.host}`
+  } catch {
+    return 'masked'
+  }
+}
+
+export class ReplicaSync {
+  private readonly intervalMs: number
+  private readonly debounceMs: number
+  private readonly staleAfterMs: number
+
+  private inFlight: Promise<ReplicaSyncResult> | null = null
+  private queued: Promise<ReplicaSyncResult> | null = null
+  private timer: ReturnType<typeof setInterval> | null = null
+  private debounceTimer: ReturnType<typeof setTimeout> | null = null
+  private listeners = new Set<(result: ReplicaSyncResult) => void>()
+
+  private lastSync: ReplicaSyncResult | null = null
+  private lastSuccessAt: number | null = null
+  private lastError: ReplicaStatus['lastError'] = null
+  private consecutiveFailures = 0
+
+  private stats = {
+    syncs: 0,
+    failures: 0,
+    coalesced: 0,
+    framesSynced: 0
+  }
+
+  constructor(private readonly client: SyncableClient, private readonly options: ReplicaSyncOptions = {}) {
+    this.intervalMs = timerMs(options.intervalMs, timerMs(DEFAULT_INTERVAL_MS, 60_000))
+    this.debounceMs = timerMs(options.debounceMs, timerMs(DEFAULT_DEBOUNCE_MS, 500))
+    this.staleAfterMs = options.staleAfterMs ?? Math.max(30_000, this.intervalMs * 3)
+  }
+
+  /**
+   * Rapatrie les changements du primaire
+   * Si une synchronisation est déjà en cours, elle a pu démarrer avant l'écriture qui motive cet appel :
+   * on attend donc la suivante, partagée par tous les appels arrivés entre-temps.
+   */
+  sync(reason = 'manual'): Promise<ReplicaSyncResult> {
+    if (!this.inFlight) {
+      this.inFlight = this.run(reason).finally(() => {
+        this.inFlight = null
+      })
+      return this.inFlight
+    }
+
+    if (!this.queued) {
+      this.queued = this.inFlight
+        .catch(() => undefined)
+        .then(() => {
+          this.queued = null
+          return this.sync(reason)
+        })
+    } else {
+      this.stats.coalesced++
+    }
+    return this.queued
+  }
+
+  /**
+   * Synchronisation différée : plusieurs événements rapprochés ne déclenchent qu'une synchronisation
+   */
+  requestSync(reason = 'event'): void {
+    if (this.debounceTimer) {
+      this.stats.coalesced++
+      return
+    }
+
+    this.debounceTimer = setTimeout(() => {
+      this.debounceTimer = null
+      this.sync(reason).catch(() => undefined)
+    }, this.debounceMs)
+    this.debounceTimer.unref?.()
+  }
+
+  start(): void {
+    if (this.timer || this.intervalMs === 0) return
+
+    this.timer = setInterval(() => {
+      this.sync('interval').catch(() => undefined)
+    }, this.intervalMs)
+    this.timer.unref?.()
+  }
+
+  stop(): void {
+    if (this.timer) clearInterval(this.timer)
+    if (this.debounceTimer) clearTimeout(this.debounceTimer)
+    this.timer = null
+    this.debounceTimer = null
+  }
+
+  /**
+   * Abonne un écouteur aux synchronisations réussies (invalidation de caches, etc.)
+   */
+  onSynced(listener: (result: ReplicaSyncResult) => void): () => void {
+    this.listeners.add(listener)
+    return () => this.listeners.delete(listener)
+  }
+
+  getStatus(now = Date.now()): ReplicaStatus {
+    const stalenessMs = this.lastSuccessAt !== null ? now - this.lastSuccessAt : null
+
+    let health: ReplicaHealth = 'up'
+    if (stalenessMs === null) {
+      // Jamais synchronisé : réplica vide (ou fichier d'un démarrage précédent) tant que le primaire ne répond pas
+      health = this.lastError ? 'down' : 'stale'
+    } else if (stalenessMs > this.staleAfterMs) {
+      health = 'stale'
+    }
+
+    return {
+      mode: 'embedded-replica',
+      health,
+      path: this.options.path,
+      syncUrl: maskUrl(this.options.syncUrl),
+      intervalMs: this.intervalMs,
+      staleAfterMs: this.staleAfterMs,
+      syncing: this.inFlight !== null,
+      lastSync: this.lastSync,
+      stalenessMs,
+      lastError: this.lastError,
+      consecutiveFailures: this.consecutiveFailures,
+      stats: { ...this.stats }
+    }
+  }
+
+  private async run(reason: string): Promise<ReplicaSyncResult> {
+    const start = Date.now()
+
+    try {
+      const replicated = await this.client.sync()
+      const result: ReplicaSyncResult = {
+        reason,
+        at: new Date().toISOString(),
+        durationMs: Date.now() - start,
+        frameNo: replicated?.frame_no ?? null,
+        framesSynced: replicated?.frames_synced ?? 0
+      }
+
+      this.stats.syncs++
+      this.stats.framesSynced += result.framesSynced
+      this.lastSync = result
+      this.lastSuccessAt = start
+      this.consecutiveFailures = 0
+
+      for (const listener of this.listeners) {
+        try {
+          listener(result)
+        } catch (error) {
+          console.error('❌ Erreur écouteur synchronisation réplica:', error)
+        }
+      }
+
+      return result
+    } catch (error) {
+      this.stats.failures++
+      this.consecutiveFailures++
+      this.lastError = {
+        message: error instanceof Error ? error.message : String(error),
+        at: new Date().toISOString(),
+        reason
+      }
+
+      // Primaire injoignable : on le signale au premier échec puis toutes les 10 tentatives
+      if (this.consecutiveFailures === 1 || this.consecutiveFailures % 10 === 0) {
+        console.warn(`⚠️ Synchronisation réplica échouée (${reason}, ${this.consecutiveFailures} échec(s) consécutif(s)):`, this.lastError.message)
+      }
+      throw error
+    }
+  }
+}
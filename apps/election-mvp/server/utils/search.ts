@@ -0,0 +1,78 @@
+/**
+ * Utilitaires de recherche plein texte (SQLite FTS5)
+ * Voir server/database/migrations/006_create_search_fts.sql
+ */
+
+import { tableExists } from './database'
+
+// Mots vides français ignorés s'ils ne sont pas seuls dans la requête
+const FRENCH_STOP_WORDS = new Set([
+  'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du', 'et', 'ou',
+  'en', 'au', 'aux', 'pour', 'par', 'avec', 'sur', 'sans'
+])
+
+/**
+ * Pondérations bm25 par colonne de products_fts (name, description, category, subcategory, materials)
+ * Reprend l'ordre de pertinence de l'ancienne recherche LIKE : nom > catégorie > description
+ */
+export const PRODUCTS_FTS_WEIGHTS = [10.0, 2.0, 5.0, 3.0, 1.0]
+
+/**
+ * Pondérations bm25 de assets_fts (alt_text, caption, public_id)
+ */
+export const ASSETS_FTS_WEIGHTS = [5.0, 3.0, 1.0]
+
+const warnedMissingFts = new Set<string>()
+
+/**
+ * Normalise un terme : minuscules, sans accents ("écharpe" → "echarpe")
+ */
+export function normalizeSearchTerm(term: string): string {
+  return term
+    .normalize('NFD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .toLowerCase()
+    .trim()
+}
+
+/**
+ * Construit une expression MATCH FTS5 à partir d'une saisie utilisateur
+ * Chaque mot devient un préfixe entre guillemets ("tee shi" → "tee"* "shi"*), combinés en AND.
+ * Les élisions (l', d', qu') et mots vides sont retirés. Retourne null si rien d'indexable.
+ */
+export function buildFtsMatchQuery(term: string): string | null {
+  const tokens = normalizeSearchTerm(term)
+    .replace(/\b(?:l|d|j|m|n|s|t|c|qu)['’]/g, ' ')
+    .split(/[^a-z0-9]+/)
+    .filter(token => token.length > 0)
+
+  const meaningful = tokens.filter(token => token.length > 1 && !FRENCH_STOP_WORDS.has(token))
+  const selected = meaningful.length > 0 ? meaningful : tokens
+
+  if (selected.length === 0) return null
+
+  return selected.map(token => `"${token}"*`).join(' ')
+}
+
+/**
+ * Expression bm25() pondérée pour une table FTS
+ */
+export function bm25Expression(table: string, weights: number[]): string {
+  return `bm25(${table}, ${weights.map(w => w.toFixed(1)).join(', ')})`
+}
+
+/**
+ * Vérifie que l'index FTS (migration 006) existe, sinon retombe sur LIKE
+ * La table de clés *_search_keys est testée : les requêtes FTS la joignent pour retrouver l'id TEXT.
+ */
+export async function hasFtsIndex(db: any, entity: 'products' | 'assets'): Promise<boolean> {
+  const available = await tableExists(db, `${entity}_search_keys`)
+  if (!available && !warnedMissingFts.has(entity)) {
+    // Une fois par process : la recherche LIKE reste utilisée jusqu'à ce que la migration soit appliquée
+    warnedMissingFts.add(entity)
+    console.warn(`⚠️ Index FTS ${entity}_fts absent - recherche LIKE utilisée (appliquer la migration 006)`)
+  } else if (available) {
+    warnedMissingFts.delete(entity)
+  }
+  return available
+}
@@ -0,0 +1,317 @@
+/**
+ * Hub SSE : diffusion temps réel par canaux vers un grand nombre de connexions
+ * - un seul timer de heartbeat partagé par toutes les connexions
+ * - chaque message est encodé une seule fois puis écrit tel quel sur chaque socket
+ * - file d'écriture bornée par client : un lecteur lent perd les messages puis est déconnecté,
+ *   il se reconnecte avec Last-Event-ID et rattrape son retard depuis le buffer de rejeu
+ */
+
+import type { IncomingMessage, ServerResponse } from 'node:http'
+
+export const SSE_CHANNELS = ['products', 'bundles', 'assets', 'orders'] as const
+export type SSEChannel = typeof SSE_CHANNELS[number]
+
+// Préfixe du type d'événement ("product:updated") → canal
+const EVENT_CHANNELS: Record<string, SSEChannel> = {
+  product: 'products',
+  category: 'products',
+  bundle: 'bundles',
+  asset: 'assets',
+  realisation: 'assets',
+  order: 'orders',
+  quote: 'orders'
+}
+
+const HEARTBEAT_MS = Number(process.env.SSE_HEARTBEAT_MS) || 30_000
+const REPLAY_BUFFER_SIZE = Number(process.env.SSE_REPLAY_BUFFER_SIZE) || 1000
+const MAX_BUFFERED_BYTES = Number(process.env.SSE_MAX_BUFFERED_BYTES) || 256 * 1024
+const MAX_DROPPED_MESSAGES = Number(process.env.SSE_MAX_DROPPED_MESSAGES) || 20
+const RECONNECT_DELAY_MS = 3000
+
+export interface SSEHubOptions {
+  heartbeatMs?: number
+  replayBufferSize?: number
+  maxBufferedBytes?: number
+  maxDroppedMessages?: number
+}
+
+export interface SSEConnectOptions {
+  /** Canaux souscrits ; tous si vide */
+  channels?: SSEChannel[]
+  /** Dernier id reçu par le client (en-tête Last-Event-ID) */
+  lastEventId?: string | null
+}
+
+interface SSEClient {
+  id: number
+  res: ServerResponse
+  channels: Set<SSEChannel>
+  dropped: number
+  connectedAt: number
+}
+
+interface ReplayEntry {
+  seq: number
+  channel: SSEChannel | null
+  chunk: Buffer
+}
+
+/**
+ * Canal d'un événement d'après son type, null pour les événements globaux (envoyés à tous)
+ */
+export function channelForEvent(type?: string): SSEChannel | null {
+  const prefix = type?.split(':')[0]
+  return (prefix && EVENT_CHANNELS[prefix]) || null
+}
+
+/**
+ * Parse une liste de canaux ("products,bundles"), en ignorant les valeurs inconnues
+ */
+export function parseChannels(value?: string | string[] | null): SSEChannel[] {
+  if (!value) return []
+  const raw = Array.isArray(value) ? value.join(',') : value
+  return raw
+    .split(',')
+    .map(channel => channel.trim())
+    .filter((channel): channel is SSEChannel => (SSE_CHANNELS as readonly string[]).includes(channel))
+}
+
+export class SSEHub {
+  private clients = new Set<SSEClient>()
+  private channelClients = new Map<SSEChannel, Set<SSEClient>>(
+    SSE_CHANNELS.map(channel => [channel, new Set<SSEClient>()])
+  )
+
+  private replay: (ReplayEntry | undefined)[]
+  private replayHead = 0
+  private seq = 0
+  private nextClientId = 1
+  // Les ids sont préfixés par l'époque du process : un Last-Event-ID d'un process précédent force un resync
+  private readonly epoch = Date.now().toString(36)
+  private heartbeat: ReturnType<typeof setInterval> | null = null
+
+  private readonly heartbeatMs: number
+  private readonly maxBufferedBytes: number
+  private readonly maxDroppedMessages: number
+
+  private stats = {
+    broadcasts: 0,
+    messagesWritten: 0,
+    messagesDropped: 0,
+    slowDisconnects: 0,
+    replayed: 0,
+    resyncs: 0
+  }
+
+  constructor(options: SSEHubOptions = {}) {
+    this.heartbeatMs = options.heartbeatMs ?? HEARTBEAT_MS
+    this.maxBufferedBytes = options.maxBufferedBytes ?? MAX_BUFFERED_BYTES
+    this.maxDroppedMessages = options.maxDroppedMessages ?? MAX_DROPPED_MESSAGES
+    this.replay = new Array(options.replayBufferSize ?? REPLAY_BUFFER_SIZE)
+  }
+
+  /**
+   * Prend en charge une requête SSE : en-têtes, message de connexion, rejeu, puis abonnement
+   */
+  connect(req: IncomingMessage, res: ServerResponse, options: SSEConnectOptions = {}): number {
+    const channels = options.channels?.length ? options.channels : [...SSE_CHANNELS]
+    const client: SSEClient = {
+      id: this.nextClientId++,
+      res,
+      channels: new Set(channels),
+      dropped: 0,
+      connectedAt: Date.now()
+    }
+
+    res.writeHead(200, {
+      'content-type': 'text/event-stream',
+      'cache-control': 'no-cache',
+      'connection': 'keep-alive',
+      'x-accel-buffering': 'no' // Pour Nginx
+    })
+    req.socket.setNoDelay(true)
+    req.socket.setTimeout(0)
+
+    res.write(`retry: ${RECONNECT_DELAY_MS}\ndata: ${JSON.stringify({
+      type: 'connected',
+      channels,
+      timestamp: Date.now()
+    })}\n\n`)
+
+    this.clients.add(client)
+    for (const channel of client.channels) {
+      this.channelClients.get(channel)!.add(client)
+    }
+    res.on('close', () => this.remove(client))
+
+    // Après l'abonnement : un rejeu trop volumineux déclenche la même déconnexion qu'un lecteur lent
+    if (options.lastEventId) {
+      this.replaySince(client, options.lastEventId)
+    }
+
+    this.startHeartbeat()
+    return client.id
+  }
+
+  /**
+   * Diffuse un événement aux clients abonnés à son canal
+   * Le message est sérialisé et encodé une seule fois pour toutes les connexions.
+   */
+  broadcast(eventData: any): { successCount: number; failureCount: number; channel: SSEChannel | null; id: string } {
+    const channel = channelForEvent(eventData?.type)
+    const seq = ++this.seq
+    const id = `${this.epoch}-${seq}`
+    const chunk = Buffer.from(`id: ${id}\ndata: ${JSON.stringify(eventData)}\n\n`)
+
+    this.replay[this.replayHead] = { seq, channel, chunk }
+    this.replayHead = (this.replayHead + 1) % this.replay.length
+
+    const targets = channel ? this.channelClients.get(channel)! : this.clients
+    let successCount = 0
+    let failureCount = 0
+
+    for (const client of targets) {
+      if (this.write(client, chunk)) {
+        successCount++
+      } else {
+        failureCount++
+      }
+    }
+
+    this.stats.broadcasts++
+    return { successCount, failureCount, channel, id }
+  }
+
+  /**
+   * Ferme toutes les connexions (arrêt du serveur)
+   */
+  close(): void {
+    for (const client of this.clients) {
+      client.res.end()
+    }
+    this.stopHeartbeat()
+  }
+
+  getStats() {
+    const channels = Object.fromEntries(
+      SSE_CHANNELS.map(channel => [channel, this.channelClients.get(channel)!.size])
+    )
+
+    return {
+      ...this.stats,
+      clients: this.clients.size,
+      channels,
+      replayBuffered: Math.min(this.seq, this.replay.length),
+      replayCapacity: this.replay.length,
+      lastEventId: this.seq > 0 ? `${this.epoch}-${this.seq}` : null,
+      maxBufferedBytes: this.maxBufferedBytes,
+      heartbeatMs: this.heartbeatMs
+    }
+  }
+
+  /**
+   * Écriture bornée : au-delà de maxBufferedBytes en attente sur le socket, le message est abandonné
+   * Le client est déconnecté dès que son buffer se vide (il rejoue ensuite les messages perdus),
+   * ou immédiatement s'il a perdu trop de messages.
+   * Après une première perte, plus rien n'est écrit : un id plus récent reçu avant la déconnexion
+   * ferait sauter les messages perdus au rejeu.
+   */
+  private write(client: SSEClient, chunk: Buffer): boolean {
+    const { res } = client
+    if (res.writableEnded || res.destroyed) return false
+
+    if (client.dropped > 0 || res.writableLength > this.maxBufferedBytes) {
+      client.dropped++
+      this.stats.messagesDropped++
+
+      if (client.dropped === 1) {
+        res.once('drain', () => this.disconnect(client))
+      }
+      if (client.dropped >= this.maxDroppedMessages) {
+        this.stats.slowDisconnects++
+        res.destroy()
+      }
+      return false
+    }
+
+    res.write(chunk)
+    this.stats.messagesWritten++
+    return true
+  }
+
+  /**
+   * Rejoue les messages postérieurs à lastEventId via l'écriture bornée
+   * Au premier message abandonné on s'arrête : le client est déconnecté au drain
+   * et reprendra le rejeu depuis le dernier id effectivement reçu.
+   */
+  private replaySince(client: SSEClient, lastEventId: string): void {
+    const [epoch, rawSeq] = lastEventId.split('-')
+    const lastSeq = Number(rawSeq)
+    const oldest = this.replay[this.replayHead] ?? this.replay[0]
+
+    // Process redémarré, id invalide ou messages déjà sortis du buffer : le client doit recharger
+    const gap = epoch !== this.epoch || !Number.isFinite(lastSeq) || (oldest && lastSeq < oldest.seq - 1)
+    if (gap) {
+      this.stats.resyncs++
+      this.write(client, Buffer.from(`data: ${JSON.stringify({ type: 'resync', timestamp: Date.now() })}\n\n`))
+      return
+    }
+
+    for (let i = 0; i < this.replay.length; i++) {
+      const entry = this.replay[(this.replayHead + i) % this.replay.length]
+      if (!entry || entry.seq <= lastSeq) continue
+      if (entry.channel && !client.channels.has(entry.channel)) continue
+
+      if (!this.write(client, entry.chunk)) break
+      this.stats.replayed++
+    }
+  }
+
+  private disconnect(client: SSEClient): void {
+    if (!client.res.writableEnded) {
+      client.res.end()
+    }
+    this.remove(client)
+  }
+
+  private remove(client: SSEClient): void {
+    if (!this.clients.delete(client)) return
+
+    for (const channel of client.channels) {
+      this.channelClients.get(channel)!.delete(client)
+    }
+    if (this.clients.size === 0) {
+      this.stopHeartbeat()
+    }
+  }
+
+  private startHeartbeat(): void {
+    if (this.heartbeat) return
+
+    this.heartbeat = setInterval(() => {
+      const chunk = Buffer.from(`data: ${JSON.stringify({ type: 'ping', timestamp: Date.now() })}\n\n`)
+      for (const client of this.clients) {
+        this.write(client, chunk)
+      }
+    }, this.heartbeatMs)
+    this.heartbeat.unref?.()
+  }
+
+  private stopHeartbeat(): void {
+    if (this.heartbeat) {
+      clearInterval(this.heartbeat)
+      this.heartbeat = null
+    }
+  }
+}
+
+/**
+ * Hub partagé par toutes les routes (survit au rechargement des modules en dev)
+ */
+export function getSSEHub(): SSEHub {
+  const globalRef = globalThis as any
+  if (!globalRef.__sse_hub) {
+    globalRef.__sse_hub = new SSEHub()
+  }
+  return globalRef.__sse_hub
+}
@@ -0,0 +1,245 @@
+/**
+ * Upload multipart en streaming vers Cloudinary
+ * Les octets du fichier passent de la requête au flux d'upload sans jamais être regroupés en Buffer :
+ * la mémoire utilisée est bornée par les buffers de flux (quelques dizaines de Ko par upload),
+ * quelle que soit la taille du fichier (bannières prêtes à imprimer de plusieurs dizaines de Mo).
+ *
+ * Une copie disque (spool) est écrite en parallèle pour pouvoir retenter l'upload sans la requête.
+ */
+
+import formidable from 'formidable'
+import { createError } from 'h3'
+import { PassThrough } from 'node:stream'
+import { finished } from 'node:stream/promises'
+import { createReadStream, createWriteStream, type WriteStream } from 'node:fs'
+import { rm } from 'node:fs/promises'
+import { tmpdir } from 'node:os'
+import { join } from 'node:path'
+import { randomUUID } from 'node:crypto'
+import type { IncomingMessage } from 'node:http'
+import type { CloudinaryUploadResult } from '../../utils/cloudinary'
+import type { UploadOptions, UploadSink } from './cloudinaryService'
+import { getUploadQueue, type UploadQueue } from './upload-queue'
+
+const DEFAULT_MAX_FILE_SIZE = Number(process.env.UPLOAD_MAX_FILE_SIZE) || 100 * 1024 * 1024
+
+export interface StreamingUploadOptions {
+  /** Fabrique du flux d'upload (cloudinaryService.createUploadStream, ou un faux puits en test) */
+  sink: (options: UploadOptions) => UploadSink
+  /**
+   * Options d'upload construites au début de la partie fichier
+   * Seuls les champs placés avant le fichier dans le formulaire sont disponibles à ce moment.
+   */
+  uploadOptions: (fields: Record<string, string>) => UploadOptions
+  /** Champs lus par uploadOptions : reçus après le fichier, la requête est rejetée (400) */
+  uploadFields?: string[]
+  queue?: UploadQueue
+  maxFileSize?: number
+  allowedTypes?: string[]
+  /** Copie disque pour les retries (true par défaut) */
+  spool?: boolean
+}
+
+export interface StreamingUploadResult {
+  upload: CloudinaryUploadResult
+  /** Tous les champs texte du formulaire, y compris ceux placés après le fichier */
+  fields: Record<string, string>
+  file: {
+    originalFilename: string | null
+    mimetype: string | null
+    size: number
+  }
+}
+
+/**
+ * Parse la requête multipart et envoie l'unique champ "file" vers Cloudinary en streaming
+ */
+export async function streamMultipartUpload(
+  req: IncomingMessage,
+  options: StreamingUploadOptions
+): Promise<StreamingUploadResult> {
+  const queue = options.queue || getUploadQueue()
+  const maxFileSize = options.maxFileSize || DEFAULT_MAX_FILE_SIZE
+  const spool = options.spool !== false
+
+  const fields: Record<string, string> = {}
+  // Renseignés par les callbacks formidable pendant le parsing
+  const state: {
+    upload: ReturnType<typeof startUpload> | null
+    rejectedType: string | null
+    lateFields: string[]
+  } = {
+    upload: null,
+    rejectedType: null,
+    lateFields: []
+  }
+
+  const form = formidable({
+    maxFiles: 1,
+    maxFileSize,
+    maxTotalFileSize: maxFileSize,
+    allowEmptyFiles: false,
+    filter: ({ name, mimetype }) => {
+      if (name !== 'file') return false
+      if (options.allowedTypes && mimetype && !options.allowedTypes.includes(mimetype)) {
+        state.rejectedType = mimetype
+        return false
+      }
+      return true
+    },
+    fileWriteStreamHandler: (file: any) => {
+      const entry = new PassThrough()
+      state.upload = startUpload(entry, {
+        ...options,
+        queue,
+        spool,
+        uploadOptions: options.uploadOptions({ ...fields }),
+        label: file?.originalFilename || 'file'
+      })
+      return entry
+    }
+  })
+
+  form.on('field', (name: string, value: string) => {
+    fields[name] = value
+    // Le flux Cloudinary est déjà ouvert avec d'autres options : on n'envoie pas un upload mal rangé
+    if (state.upload && options.uploadFields?.includes(name)) {
+      state.lateFields.push(name)
+      state.upload.abort(new Error(`Champ ${name} reçu après le fichier`))
+    }
+  })
+
+  const rejectLateFields = () => createError({
+    statusCode: 400,
+    statusMessage: `Champs à placer avant le fichier dans le formulaire: ${state.lateFields.join(', ')}`
+  })
+
+  let files: formidable.Files
+  try {
+    [, files] = await form.parse(req)
+  } catch (error: any) {
+    state.upload?.abort(error)
+    await state.upload?.result.catch(() => {})
+    if (state.lateFields.length > 0) throw rejectLateFields()
+    throw createError({
+      statusCode: error?.httpCode || 400,
+      statusMessage: error?.httpCode === 413 ? 'Fichier trop volumineux' : 'Requête multipart invalide',
+      data: { error: error?.message }
+    })
+  }
+
+  if (!state.upload) {
+    throw createError({
+      statusCode: 400,
+      statusMessage: state.rejectedType
+        ? `Type de fichier non supporté: ${state.rejectedType}`
+        : 'Aucun fichier fourni'
+    })
+  }
+
+  if (state.lateFields.length > 0) {
+    await state.upload.result.catch(() => {})
+    throw rejectLateFields()
+  }
+
+  const file = files.file?.[0]
+  const result = await state.upload.result
+
+  return {
+    upload: result,
+    fields,
+    file: {
+      originalFilename: file?.originalFilename ?? null,
+      mimetype: file?.mimetype ?? null,
+      size: file?.size ?? 0
+    }
+  }
+}
+
+/**
+ * Place l'upload dans la file : la première tentative lit la requête en direct,
+ * les suivantes relisent la copie disque une fois la requête entièrement reçue.
+ */
+function startUpload(
+  entry: PassThrough,
+  options: {
+    sink: StreamingUploadOptions['sink']
+    uploadOptions: UploadOptions
+    queue: UploadQueue
+    spool: boolean
+    label: string
+  }
+) {
+  const spoolPath = options.spool ? join(tmpdir(), `ns2po-upload-${randomUUID()}`) : null
+  let spoolStream: WriteStream | null = null
+  let spoolDone: Promise<void> | null = null
+  let aborted: Error | null = null
+  let current: UploadSink | null = null
+  let rejectAbort: (error: Error) => void = () => {}
+  const abortSignal = new Promise<never>((_, reject) => {
+    rejectAbort = reject
+  })
+  abortSignal.catch(() => {})
+  // Retire aussi l'upload de la file s'il attend encore sa place
+  const controller = new AbortController()
+
+  const result = options.queue.add({
+    label: options.label,
+    signal: controller.signal,
+    run: async (attempt) => {
+      if (aborted) throw aborted
+
+      const sink = options.sink(options.uploadOptions)
+      current = sink
+      // L'erreur est remontée par sink.result ; sans écouteur, pipe() la relancerait en exception
+      sink.stream.on('error', () => {})
+
+      if (attempt === 1) {
+        // Le spool et Cloudinary sont branchés ensemble : le flux avance au rythme du plus lent
+        if (spoolPath) {
+          spoolStream = createWriteStream(spoolPath)
+          spoolDone = finished(spoolStream)
+          // Attendu seulement en cas de retry ; le nettoyage détruit le flux et rejette cette promesse
+          spoolDone.catch(() => {})
+          entry.pipe(spoolStream)
+        }
+        entry.pipe(sink.stream)
+      } else {
+        await Promise.race([spoolDone, abortSignal])
+        createReadStream(spoolPath!).pipe(sink.stream)
+      }
+
+      try {
+        return await Promise.race([sink.result, abortSignal])
+      } catch (error) {
+        entry.unpipe(sink.stream)
+        // Sans spool, plus personne ne lit la requête : la vider pour que le parsing se termine
+        if (!spoolPath) entry.resume()
+        throw error
+      }
+    },
+    retryable: () => spoolPath !== null && aborted === null
+  })
+
+  const cleanup = async () => {
+    if (!spoolPath) return
+    spoolStream?.destroy()
+    await rm(spoolPath, { force: true })
+  }
+
+  const settled = result.finally(cleanup)
+  // L'upload peut échouer (abandon, erreur Cloudinary) pendant le parsing, avant que l'appelant ne l'attende
+  settled.catch(() => {})
+
+  return {
+    result: settled,
+    abort(error: Error) {
+      aborted = error
+      rejectAbort(error)
+      controller.abort(error)
+      entry.destroy(error)
+      spoolStream?.destroy()
+      current?.stream.destroy(error)
+    }
+  }
+}
@@ -0,0 +1,136 @@
+/**
+ * File d'attente des uploads Cloudinary : concurrence bornée et retry avec backoff
+ * Les uploads en attente de place ne consomment pas leur requête (backpressure TCP),
+ * la mémoire reste donc bornée quel que soit le nombre d'uploads simultanés.
+ */
+
+const DEFAULT_CONCURRENCY = Number(process.env.UPLOAD_CONCURRENCY) || 3
+const DEFAULT_RETRIES = Number(process.env.UPLOAD_RETRIES ?? 2)
+const DEFAULT_RETRY_DELAY_MS = Number(process.env.UPLOAD_RETRY_DELAY_MS) || 1000
+
+export interface UploadQueueOptions {
+  concurrency?: number
+  retries?: number
+  retryDelayMs?: number
+}
+
+export interface UploadJob<T> {
+  label?: string
+  /** Exécute une tentative (1 = première) */
+  run: (attempt: number) => Promise<T>
+  /** Autorise une nouvelle tentative après cet échec (par défaut : toujours) */
+  retryable?: (error: unknown, attempt: number) => boolean
+  /** Annule l'upload tant qu'il attend sa place : la promesse est rejetée sans attendre la file */
+  signal?: AbortSignal
+}
+
+export class UploadQueue {
+  private active = 0
+  private waiting: (() => void)[] = []
+
+  private readonly concurrency: number
+  private readonly retries: number
+  private readonly retryDelayMs: number
+
+  private stats = {
+    completed: 0,
+    failed: 0,
+    retries: 0,
+    cancelled: 0,
+    maxActive: 0
+  }
+
+  constructor(options: UploadQueueOptions = {}) {
+    this.concurrency = Math.max(1, options.concurrency ?? DEFAULT_CONCURRENCY)
+    this.retries = Math.max(0, options.retries ?? DEFAULT_RETRIES)
+    this.retryDelayMs = options.retryDelayMs ?? DEFAULT_RETRY_DELAY_MS
+  }
+
+  /**
+   * Ajoute un upload ; la promesse se résout avec le résultat de la première tentative réussie
+   */
+  async add<T>(job: UploadJob<T>): Promise<T> {
+    await this.acquire(job.signal)
+
+    try {
+      for (let attempt = 1; ; attempt++) {
+        try {
+          const result = await job.run(attempt)
+          this.stats.completed++
+          return result
+        } catch (error) {
+          const canRetry = attempt <= this.retries && (job.retryable?.(error, attempt) ?? true)
+          if (!canRetry) {
+            this.stats.failed++
+            throw error
+          }
+
+          this.stats.retries++
+          const delay = this.retryDelayMs * 2 ** (attempt - 1)
+          console.warn(`⚠️ Upload ${job.label || ''} échoué (tentative ${attempt}), nouvel essai dans ${delay}ms`)
+          await new Promise(resolve => setTimeout(resolve, delay))
+        }
+      }
+    } finally {
+      this.release()
+    }
+  }
+
+  getStats() {
+    return {
+      ...this.stats,
+      active: this.active,
+      waiting: this.waiting.length,
+      concurrency: this.concurrency
+    }
+  }
+
+  private acquire(signal?: AbortSignal): Promise<void> {
+    if (signal?.aborted) {
+      this.stats.cancelled++
+      return Promise.reject(signal.reason)
+    }
+
+    if (this.active < this.concurrency) {
+      this.active++
+      this.stats.maxActive = Math.max(this.stats.maxActive, this.active)
+      return Promise.resolve()
+    }
+
+    // La place est transmise directement par release() : active ne change pas
+    return new Promise((resolve, reject) => {
+      const onAbort = () => {
+        const index = this.waiting.indexOf(grant)
+        if (index !== -1) this.waiting.splice(index, 1)
+        this.stats.cancelled++
+        reject(signal!.reason)
+      }
+      const grant = () => {
+        signal?.removeEventListener('abort', onAbort)
+        resolve()
+      }
+      signal?.addEventListener('abort', onAbort, { once: true })
+      this.waiting.push(grant)
+    })
+  }
+
+  private release(): void {
+    const next = this.waiting.shift()
+    if (next) {
+      next()
+    } else {
+      this.active--
+    }
+  }
+}
+
+/**
+ * File partagée par les routes d'upload
+ */
+export function getUploadQueue(): UploadQueue {
+  const globalRef = globalThis as any
+  if (!globalRef.__upload_queue) {
+    globalRef.__upload_queue = new UploadQueue()
+  }
+  return globalRef.__upload_queue
+}
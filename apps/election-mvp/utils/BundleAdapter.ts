@@ -5,6 +5,7 @@
  */
 
 import type { CampaignBundle, BundleProduct as ExternalBundleProduct } from '@ns2po/types'
+import { computeBundleTotals } from '@ns2po/pricing'
 import type {
   Bundle,
   BundleProduct,
@@ -141,23 +142,14 @@ export function adaptCampaignBundleToAggregate(
  * Calculates bundle totals from products
  */
 export function calculateBundleFromProducts(products: BundleProduct[]): BundleCalculation {
-  const originalTotal = products.reduce((sum, product) =>
-    sum + (product.basePrice * product.quantity), 0
-  )
-
-  const estimatedTotal = products.reduce((sum, product) =>
-    sum + product.subtotal, 0
-  )
-
-  const savings = originalTotal - estimatedTotal
-  const discountPercentage = originalTotal > 0 ? (savings / originalTotal) * 100 : 0
+  const { originalTotal, estimatedTotal, savings, discountPercentage, totalProducts } = computeBundleTotals(products)
 
   return {
     originalTotal,
     estimatedTotal,
     savings,
     discountPercentage,
-    totalProducts: products.length
+    totalProducts
   }
 }
 
@@ -0,0 +1,114 @@
+#!/usr/bin/env tsx
+
+/**
+ * Benchmark du surcoût de l'instrumentation des requêtes
+ * - Client factice à latence nulle : coût pur du proxy et de l'enregistrement des métriques
+ * - Client libsql :memory: : surcoût relatif sur de vraies requêtes SQLite
+ * Chaque mesure est faite dans un contexte de requête HTTP (runWithQueryContext), comme en production.
+ *
+ * Usage: pnpm --filter @ns2po/database bench:instrumentation [itérations]
+ */
+
+import assert from 'node:assert/strict'
+import { createClient, type Client, type InStatement, type ResultSet } from '@libsql/client'
+import { QueryMetrics, instrumentClient, runWithQueryContext } from '../src/instrumentation'
+
+const ITERATIONS = Number(process.argv[2]) || 50_000
+const BATCH_SIZE = 10
+
+const EMPTY_RESULT = { rows: [{ id: 1 }], columns: ['id'], columnTypes: [], rowsAffected: 0, lastInsertRowid: undefined } as unknown as ResultSet
+
+function fakeClient(): Client {
+  return {
+    execute: async () => EMPTY_RESULT,
+    batch: async (statements: InStatement[]) => statements.map(() => EMPTY_RESULT),
+    executeMultiple: async () => {},
+    close: () => {},
+    closed: false
+  } as unknown as Client
+}
+
+async function time(label: string, iterations: number, run: (i: number) => Promise<unknown>): Promise<number> {
+  for (let i = 0; i < Math.min(1000, iterations); i++) await run(i) // échauffement
+  const start = performance.now()
+  for (let i = 0; i < iterations; i++) await run(i)
+  const perCall = ((performance.now() - start) * 1000) / iterations
+  console.log(`   ${label.padEnd(30)} ${perCall.toFixed(2)} µs/appel`)
+  return perCall
+}
+
+async function compare(title: string, raw: Client, iterations: number) {
+  console.log(`\n${title} (${iterations} itérations)`)
+  const metrics = new QueryMetrics({ reportThrottleMs: Infinity })
+  const instrumented = instrumentClient(raw, metrics)
+
+  const select = (i: number): InStatement => ({ sql: 'SELECT id FROM bench WHERE id = ?', args: [i % 100] })
+  const batch = (i: number): InStatement[] => Array.from({ length: BATCH_SIZE }, (_, j) => select(i + j))
+
+  const rawExecute = await time('execute brut', iterations, i => raw.execute(select(i)))
+  const instExecute = await time('execute instrumenté', iterations, i =>
+    runWithQueryContext('GET /bench', () => instrumented.execute(select(i)), metrics))
+
+  const batchIterations = Math.ceil(iterations / BATCH_SIZE)
+  const rawBatch = await time(`batch(${BATCH_SIZE}) brut`, batchIterations, i => raw.batch(batch(i), 'read'))
+  const instBatch = await time(`batch(${BATCH_SIZE}) instrumenté`, batchIterations, i =>
+    runWithQueryContext('GET /bench', () => instrumented.batch(batch(i), 'read'), metrics))
+
+  console.log(`   Surcoût execute: +${(instExecute - rawExecute).toFixed(2)} µs (×${(instExecute / rawExecute).toFixed(2)}), batch: +${(instBatch - rawBatch).toFixed(2)} µs (×${(instBatch / rawBatch).toFixed(2)})`)
+
+  // Les métriques enregistrées correspondent aux appels effectués
+  const snapshot = metrics.getSnapshot()
+  assert.equal(snapshot.roundTrips.execute, iterations + Math.min(1000, iterations))
+  assert.equal(snapshot.roundTrips.batch, batchIterations + Math.min(1000, batchIterations))
+  assert.equal(snapshot.requests.avgRoundTrips, 1)
+  assert.ok(metrics.renderPrometheus().includes('ns2po_db_statement_duration_seconds_bucket'))
+}
+
+async function checkNPlusOne() {
+  const metrics = new QueryMetrics({ nPlusOneThreshold: 5, reportThrottleMs: Infinity })
+  const client = instrumentClient(fakeClient(), metrics)
+  const reports: string[] = []
+  metrics.onReport(report => reports.push(report.kind))
+
+  await runWithQueryContext('GET /api/campaign-bundles', async () => {
+    for (let i = 0; i < 10; i++) {
+      await client.execute({ sql: `SELECT * FROM bundle_products WHERE bundle_id = '${i}'`, args: [] })
+    }
+  }, metrics)
+
+  assert.deepEqual(reports, ['n-plus-one'])
+  console.log('\n🔁 Détection N+1: 10 requêtes identiques (littéraux normalisés) signalées une fois')
+}
+
+async function checkReportKeysBounded() {
+  const metrics = new QueryMetrics({ nPlusOneThreshold: 2, reportThrottleMs: Infinity, maxReportKeys: 50 })
+  const client = instrumentClient(fakeClient(), metrics)
+  let reports = 0
+  metrics.onReport(() => reports++)
+
+  // Routes brutes : un id différent par requête HTTP
+  for (let i = 0; i < 500; i++) {
+    await runWithQueryContext(`GET /api/products/${i}`, async () => {
+      await client.execute({ sql: 'SELECT * FROM bundle_products WHERE product_id = ?', args: [i] })
+      await client.execute({ sql: 'SELECT * FROM bundle_products WHERE product_id = ?', args: [i] })
+    }, metrics)
+  }
+
+  assert.equal(reports, 500)
+  assert.ok((metrics as any).lastReported.size <= 50)
+  console.log('🧹 Throttling des signalements: 500 routes distinctes, mémoire bornée à 50 clés')
+}
+
+await compare('🧪 Client factice (latence nulle)', fakeClient(), ITERATIONS)
+
+const memory = createClient({ url: ':memory:' })
+await memory.executeMultiple(`
+  CREATE TABLE bench (id INTEGER PRIMARY KEY, label TEXT);
+  ${Array.from({ length: 100 }, (_, i) => `INSERT INTO bench VALUES (${i}, 'ligne ${i}');`).join('\n')}
+`)
+await compare('💾 libsql :memory:', memory, Math.ceil(ITERATIONS / 5))
+memory.close()
+
+await checkNPlusOne()
+await checkReportKeysBounded()
+console.log('\n✅ Benchmark terminé')
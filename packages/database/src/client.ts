@@ -4,6 +4,7 @@
 
 import { createClient } from '@libsql/client'
 import type { Client, ResultSet, Transaction } from '@libsql/client'
+import { instrumentClient } from './instrumentation'
 
 export interface TursoConfig {
   url: string
@@ -15,10 +16,10 @@ export class TursoClient {
   private static instance: TursoClient | null = null
 
   constructor(config: TursoConfig) {
-    this.client = createClient({
+    this.client = instrumentClient(createClient({
       url: config.url,
       authToken: config.authToken
-    })
+    }))
   }
 
   /**
@@ -4,6 +4,7 @@
  */
 
 export * from './client'
+export * from './instrumentation'
 export * from './services/customers'
 export * from './services/orders'
 export * from './services/payment-instructions'
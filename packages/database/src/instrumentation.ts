@@ -0,0 +1,488 @@
+/**
+ * Instrumentation des requêtes Turso
+ * Enveloppe un client libsql (ou une transaction) pour mesurer chaque aller-retour :
+ * latence par requête normalisée (histogramme), lignes retournées, erreurs,
+ * allers-retours par requête HTTP, requêtes lentes et motifs N+1.
+ *
+ * Sans dépendance framework : le contexte de requête passe par AsyncLocalStorage
+ * (runWithQueryContext), les signalements par des écouteurs (onReport).
+ */
+
+import { AsyncLocalStorage } from 'node:async_hooks'
+import type { Client, InStatement, ResultSet, Transaction } from '@libsql/client'
+
+/** Bornes des histogrammes de latence, en secondes (format Prometheus) */
+const LATENCY_BUCKETS = [0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5]
+/** Bornes de l'histogramme des allers-retours par requête HTTP */
+const ROUND_TRIP_BUCKETS = [1, 2, 3, 5, 10, 20, 50, 100]
+
+const NORMALIZE_CACHE_SIZE = 2000
+const OTHER_STATEMENT = 'other'
+
+const INSTRUMENTED = Symbol.for('ns2po.db.instrumented')
+
+export type RoundTripKind = 'execute' | 'batch' | 'executeMultiple' | 'transaction'
+
+export interface QueryMetricsOptions {
+  /** Seuil de requête lente, en ms */
+  slowQueryMs?: number
+  /** Nombre d'exécutions d'une même requête dans une requête HTTP à partir duquel on signale un N+1 */
+  nPlusOneThreshold?: number
+  /** Nombre maximal de requêtes normalisées suivies (les suivantes sont regroupées dans "other") */
+  maxStatements?: number
+  /** Délai minimal entre deux signalements d'une même requête */
+  reportThrottleMs?: number
+  /** Nombre maximal de signalements mémorisés pour le throttling (les routes brutes contiennent des ids) */
+  maxReportKeys?: number
+}
+
+export interface QueryReport {
+  kind: 'slow-query' | 'n-plus-one'
+  statement: string
+  route?: string
+  durationMs?: number
+  count?: number
+  rows?: number
+}
+
+export interface RequestQueryStats {
+  route: string
+  roundTrips: number
+  statements: number
+  rows: number
+  durationMs: number
+  /** Exécutions individuelles (hors batch) par requête normalisée */
+  executions: Map<string, number>
+  closed: boolean
+}
+
+interface StatementEntry {
+  statement: string
+  count: number
+  errors: number
+  rows: number
+  sumMs: number
+  maxMs: number
+  buckets: Uint32Array
+}
+
+const requestStorage = new AsyncLocalStorage<RequestQueryStats>()
+const normalizeCache = new Map<string, string>()
+
+/**
+ * Forme normalisée d'une requête : littéraux remplacés par ?, listes IN repliées, espaces compactés
+ */
+export function normalizeStatement(sql: string): string {
+  const cached = normalizeCache.get(sql)
+  if (cached !== undefined) return cached
+
+  const normalized = sql
+    .replace(/'(?:[^']|'')*'/g, '?')
+    .replace(/\b\d+(?:\.\d+)?\b/g, '?')
+    .replace(/\s+/g, ' ')
+    .replace(/\(\s*\?(?:\s*,\s*\?)+\s*\)/g, '(?, …)')
+    .trim()
+    .slice(0, 300)
+
+  if (normalizeCache.size >= NORMALIZE_CACHE_SIZE) normalizeCache.clear()
+  normalizeCache.set(sql, normalized)
+  return normalized
+}
+
+function statementSql(statement: InStatement): string {
+  return typeof statement === 'string' ? statement : statement.sql
+}
+
+function bucketIndex(bounds: readonly number[], value: number): number {
+  for (let i = 0; i < bounds.length; i++) {
+    if (value <= bounds[i]) return i
+  }
+  return bounds.length
+}
+
+function escapeLabel(value: string): string {
+  return value.replace(/\\/g, '\\\\').replace(/"/g, '\\"').replace(/\n/g, '\\n')
+}
+
+export class QueryMetrics {
+  private readonly slowQueryMs: number
+  private readonly nPlusOneThreshold: number
+  private readonly maxStatements: number
+  private readonly reportThrottleMs: number
+  private readonly maxReportKeys: number
+
+  private statements = new Map<string, StatementEntry>()
+  private roundTrips: Record<RoundTripKind, number> = { execute: 0, batch: 0, executeMultiple: 0, transaction: 0 }
+  private requests = { count: 0, roundTrips: 0, buckets: new Uint32Array(ROUND_TRIP_BUCKETS.length + 1) }
+  private reports = { slowQueries: 0, nPlusOne: 0, throttled: 0 }
+  private lastReported = new Map<string, number>()
+  private listeners = new Set<(report: QueryReport) => void>()
+  private startedAt = Date.now()
+
+  constructor(options: QueryMetricsOptions = {}) {
+    this.slowQueryMs = options.slowQueryMs ?? (Number(process.env.DB_SLOW_QUERY_MS) || 200)
+    this.nPlusOneThreshold = options.nPlusOneThreshold ?? (Number(process.env.DB_N_PLUS_ONE_THRESHOLD) || 5)
+    this.maxStatements = options.maxStatements ?? 500
+    this.reportThrottleMs = options.reportThrottleMs ?? (Number(process.env.DB_QUERY_REPORT_THROTTLE_MS) || 60_000)
+    this.maxReportKeys = Math.max(1, options.maxReportKeys ?? 1000)
+  }
+
+  /**
+   * Enregistre un aller-retour (un execute, un batch, un executeMultiple, un commit/rollback)
+   * `rows` est le nombre de lignes par requête, dans l'ordre de `statements`.
+   */
+  recordRoundTrip(kind: RoundTripKind, statements: readonly string[], durationMs: number, rows: readonly number[], failed = false): void {
+    this.roundTrips[kind]++
+
+    // Un batch est une seule mesure de latence : elle est attribuée au lot, pas à chaque requête
+    const label = statements.length === 1
+      ? normalizeStatement(statements[0])
+      : `${kind.toUpperCase()}[${statements.length}] ${normalizeStatement(statements[0] || '')}`
+
+    const entry = this.entryFor(label)
+    entry.count++
+    entry.sumMs += durationMs
+    if (durationMs > entry.maxMs) entry.maxMs = durationMs
+    entry.buckets[bucketIndex(LATENCY_BUCKETS, durationMs / 1000)]++
+    if (failed) entry.errors++
+
+    let totalRows = 0
+    for (const count of rows) totalRows += count
+    entry.rows += totalRows
+
+    const request = requestStorage.getStore()
+    if (request && !request.closed) {
+      request.roundTrips++
+      request.statements += statements.length
+      request.rows += totalRows
+      request.durationMs += durationMs
+      if (kind === 'execute') {
+        request.executions.set(label, (request.executions.get(label) || 0) + 1)
+      }
+    }
+
+    if (durationMs >= this.slowQueryMs) {
+      this.reports.slowQueries++
+      this.report({ kind: 'slow-query', statement: label, route: request?.route, durationMs: Math.round(durationMs), rows: totalRows })
+    }
+  }
+
+  beginRequest(route: string): RequestQueryStats {
+    return { route, roundTrips: 0, statements: 0, rows: 0, durationMs: 0, executions: new Map(), closed: false }
+  }
+
+  /**
+   * Clôture une requête HTTP : histogramme des allers-retours et détection N+1
+   */
+  endRequest(stats: RequestQueryStats): void {
+    stats.closed = true
+    // Les requêtes sans accès base (pages, assets) fausseraient l'histogramme
+    if (stats.roundTrips === 0) return
+
+    this.requests.count++
+    this.requests.roundTrips += stats.roundTrips
+    this.requests.buckets[bucketIndex(ROUND_TRIP_BUCKETS, stats.roundTrips)]++
+
+    for (const [statement, count] of stats.executions) {
+      if (count >= this.nPlusOneThreshold) {
+        this.reports.nPlusOne++
+        this.report({ kind: 'n-plus-one', statement, route: stats.route, count })
+      }
+    }
+  }
+
+  /**
+   * Abonne un écouteur aux signalements (requêtes lentes, N+1), limités par requête normalisée
+   */
+  onReport(listener: (report: QueryReport) => void): () => void {
+    this.listeners.add(listener)
+    return () => this.listeners.delete(listener)
+  }
+
+  getSnapshot(limit = 50) {
+    const statements = [...this.statements.values()]
+      .sort((a, b) => b.sumMs - a.sumMs)
+      .slice(0, limit)
+      .map(entry => ({
+        statement: entry.statement,
+        count: entry.count,
+        errors: entry.errors,
+        rows: entry.rows,
+        totalMs: Math.round(entry.sumMs * 100) / 100,
+        avgMs: Math.round((entry.sumMs / entry.count) * 100) / 100,
+        maxMs: Math.round(entry.maxMs * 100) / 100
+      }))
+
+    return {
+      since: new Date(this.startedAt).toISOString(),
+      roundTrips: { ...this.roundTrips },
+      requests: {
+        count: this.requests.count,
+        avgRoundTrips: this.requests.count > 0
+          ? Math.round((this.requests.roundTrips / this.requests.count) * 100) / 100
+          : 0
+      },
+      reports: { ...this.reports },
+      thresholds: { slowQueryMs: this.slowQueryMs, nPlusOne: this.nPlusOneThreshold },
+      trackedStatements: this.statements.size,
+      statements
+    }
+  }
+
+  /**
+   * Exposition au format texte Prometheus (version 0.0.4)
+   */
+  renderPrometheus(): string {
+    const lines: string[] = []
+
+    lines.push('# HELP ns2po_db_statement_duration_seconds Latence des allers-retours par requête SQL normalisée')
+    lines.push('# TYPE ns2po_db_statement_duration_seconds histogram')
+    for (const entry of this.statements.values()) {
+      const label = `statement="${escapeLabel(entry.statement)}"`
+      let cumulative = 0
+      LATENCY_BUCKETS.forEach((bound, i) => {
+        cumulative += entry.buckets[i]
+        lines.push(`ns2po_db_statement_duration_seconds_bucket{${label},le="${bound}"} ${cumulative}`)
+      })
+      lines.push(`ns2po_db_statement_duration_seconds_bucket{${label},le="+Inf"} ${entry.count}`)
+      lines.push(`ns2po_db_statement_duration_seconds_sum{${label}} ${entry.sumMs / 1000}`)
+      lines.push(`ns2po_db_statement_duration_seconds_count{${label}} ${entry.count}`)
+    }
+
+    lines.push('# HELP ns2po_db_statement_rows_total Lignes retournées par requête SQL normalisée')
+    lines.push('# TYPE ns2po_db_statement_rows_total counter')
+    for (const entry of this.statements.values()) {
+      lines.push(`ns2po_db_statement_rows_total{statement="${escapeLabel(entry.statement)}"} ${entry.rows}`)
+    }
+
+    lines.push('# HELP ns2po_db_statement_errors_total Erreurs par requête SQL normalisée')
+    lines.push('# TYPE ns2po_db_statement_errors_total counter')
+    for (const entry of this.statements.values()) {
+      if (entry.errors > 0) {
+        lines.push(`ns2po_db_statement_errors_total{statement="${escapeLabel(entry.statement)}"} ${entry.errors}`)
+      }
+    }
+
+    lines.push('# HELP ns2po_db_round_trips_total Allers-retours vers la base par type d\'appel')
+    lines.push('# TYPE ns2po_db_round_trips_total counter')
+    for (const [kind, count] of Object.entries(this.roundTrips)) {
+      lines.push(`ns2po_db_round_trips_total{kind="${kind}"} ${count}`)
+    }
+
+    lines.push('# HELP ns2po_db_request_round_trips Allers-retours vers la base par requête HTTP')
+    lines.push('# TYPE ns2po_db_request_round_trips histogram')
+    let cumulative = 0
+    ROUND_TRIP_BUCKETS.forEach((bound, i) => {
+      cumulative += this.requests.buckets[i]
+      lines.push(`ns2po_db_request_round_trips_bucket{le="${bound}"} ${cumulative}`)
+    })
+    lines.push(`ns2po_db_request_round_trips_bucket{le="+Inf"} ${this.requests.count}`)
+    lines.push(`ns2po_db_request_round_trips_sum ${this.requests.roundTrips}`)
+    lines.push(`ns2po_db_request_round_trips_count ${this.requests.count}`)
+
+    lines.push('# HELP ns2po_db_slow_queries_total Requêtes au-delà du seuil de lenteur')
+    lines.push('# TYPE ns2po_db_slow_queries_total counter')
+    lines.push(`ns2po_db_slow_queries_total ${this.reports.slowQueries}`)
+
+    lines.push('# HELP ns2po_db_n_plus_one_total Motifs N+1 détectés')
+    lines.push('# TYPE ns2po_db_n_plus_one_total counter')
+    lines.push(`ns2po_db_n_plus_one_total ${this.reports.nPlusOne}`)
+
+    return lines.join('\n') + '\n'
+  }
+
+  reset(): void {
+    this.statements.clear()
+    this.roundTrips = { execute: 0, batch: 0, executeMultiple: 0, transaction: 0 }
+    this.requests = { count: 0, roundTrips: 0, buckets: new Uint32Array(ROUND_TRIP_BUCKETS.length + 1) }
+    this.reports = { slowQueries: 0, nPlusOne: 0, throttled: 0 }
+    this.lastReported.clear()
+    this.startedAt = Date.now()
+  }
+
+  private entryFor(statement: string): StatementEntry {
+    let entry = this.statements.get(statement)
+    if (entry) return entry
+
+    if (this.statements.size >= this.maxStatements) {
+      entry = this.statements.get(OTHER_STATEMENT)
+      if (entry) return entry
+      statement = OTHER_STATEMENT
+    }
+
+    entry = { statement, count: 0, errors: 0, rows: 0, sumMs: 0, maxMs: 0, buckets: new Uint32Array(LATENCY_BUCKETS.length + 1) }
+    this.statements.set(statement, entry)
+    return entry
+  }
+
+  private report(report: QueryReport): void {
+    if (this.listeners.size === 0) return
+
+    const key = `${report.kind}:${report.route || ''}:${report.statement}`
+    const now = Date.now()
+    const last = this.lastReported.get(key)
+    if (last !== undefined && now - last < this.reportThrottleMs) {
+      this.reports.throttled++
+      return
+    }
+    if (last === undefined && this.lastReported.size >= this.maxReportKeys) {
+      this.sweepReported(now)
+    }
+    // Réinsérée en fin de Map : l'ordre d'insertion reste celui des derniers signalements
+    this.lastReported.delete(key)
+    this.lastReported.set(key, now)
+
+    for (const listener of this.listeners) {
+      try {
+        listener(report)
+      } catch (error) {
+        console.error('❌ Erreur écouteur instrumentation base:', error)
+      }
+    }
+  }
+
+  /**
+   * Retire les signalements dont le délai de throttling est écoulé,
+   * puis les plus anciens si la limite est toujours atteinte
+   */
+  private sweepReported(now: number): void {
+    for (const [key, at] of this.lastReported) {
+      if (now - at >= this.reportThrottleMs) this.lastReported.delete(key)
+    }
+    for (const key of this.lastReported.keys()) {
+      if (this.lastReported.size < this.maxReportKeys) break
+      this.lastReported.delete(key)
+    }
+  }
+}
+
+/**
+ * Registre partagé par tous les clients instrumentés du process
+ */
+export function getQueryMetrics(): QueryMetrics {
+  const globalRef = globalThis as any
+  if (!globalRef.__ns2po_query_metrics) {
+    globalRef.__ns2po_query_metrics = new QueryMetrics()
+  }
+  return globalRef.__ns2po_query_metrics
+}
+
+/**
+ * Exécute `fn` dans le contexte d'une requête HTTP : ses allers-retours y sont comptés
+ */
+export async function runWithQueryContext<T>(
+  route: string,
+  fn: () => T | Promise<T>,
+  metrics: QueryMetrics = getQueryMetrics()
+): Promise<T> {
+  const stats = metrics.beginRequest(route)
+  try {
+    return await requestStorage.run(stats, fn)
+  } finally {
+    metrics.endRequest(stats)
+  }
+}
+
+/**
+ * Statistiques de la requête HTTP en cours (undefined hors contexte)
+ */
+export function getRequestQueryStats(): RequestQueryStats | undefined {
+  return requestStorage.getStore()
+}
+
+type Executor = Pick<Client, 'execute' | 'batch' | 'executeMultiple'>
+
+/**
+ * Surcharges mesurées communes au client et aux transactions
+ */
+function instrumentedMethods(target: Executor, metrics: QueryMetrics) {
+  return {
+    async execute(statement: InStatement | string, ...rest: any[]): Promise<ResultSet> {
+      const sql = statementSql(statement as InStatement)
+      const start = performance.now()
+      try {
+        const result = await (target.execute as any)(statement, ...rest)
+        metrics.recordRoundTrip('execute', [sql], performance.now() - start, [result.rows.length])
+        return result
+      } catch (error) {
+        metrics.recordRoundTrip('execute', [sql], performance.now() - start, [], true)
+        throw error
+      }
+    },
+
+    async batch(statements: InStatement[], ...rest: any[]): Promise<ResultSet[]> {
+      const sqls = statements.map(statementSql)
+      const start = performance.now()
+      try {
+        const results = await (target.batch as any)(statements, ...rest)
+        metrics.recordRoundTrip('batch', sqls, performance.now() - start, results.map((r: ResultSet) => r.rows.length))
+        return results
+      } catch (error) {
+        metrics.recordRoundTrip('batch', sqls, performance.now() - start, [], true)
+        throw error
+      }
+    },
+
+    async executeMultiple(sql: string): Promise<void> {
+      const start = performance.now()
+      try {
+        await target.executeMultiple(sql)
+        metrics.recordRoundTrip('executeMultiple', [sql], performance.now() - start, [])
+      } catch (error) {
+        metrics.recordRoundTrip('executeMultiple', [sql], performance.now() - start, [], true)
+        throw error
+      }
+    }
+  }
+}
+
+/**
+ * Proxy qui remplace certaines méthodes et délègue le reste à l'objet d'origine
+ * (les méthodes déléguées restent liées à la cible : champs privés du client libsql)
+ */
+function withOverrides<T extends object>(target: T, overrides: Record<string | symbol, unknown>): T {
+  return new Proxy(target, {
+    get(object, property) {
+      if (property === INSTRUMENTED) return true
+      if (Object.prototype.hasOwnProperty.call(overrides, property)) return overrides[property]
+      const value = Reflect.get(object, property, object)
+      return typeof value === 'function' ? value.bind(object) : value
+    }
+  })
+}
+
+function instrumentTransaction(transaction: Transaction, metrics: QueryMetrics): Transaction {
+  const timed = (name: 'commit' | 'rollback') => async () => {
+    const start = performance.now()
+    try {
+      await transaction[name]()
+      metrics.recordRoundTrip('transaction', [name.toUpperCase()], performance.now() - start, [])
+    } catch (error) {
+      metrics.recordRoundTrip('transaction', [name.toUpperCase()], performance.now() - start, [], true)
+      throw error
+    }
+  }
+
+  return withOverrides(transaction, {
+    ...instrumentedMethods(transaction, metrics),
+    commit: timed('commit'),
+    rollback: timed('rollback')
+  })
+}
+
+/**
+ * Enveloppe un client libsql : même interface, chaque aller-retour est mesuré
+ * Désactivable avec DB_INSTRUMENTATION=false.
+ */
+export function instrumentClient<C extends Client>(client: C, metrics: QueryMetrics = getQueryMetrics()): C {
+  if (process.env.DB_INSTRUMENTATION === 'false') return client
+  if ((client as any)[INSTRUMENTED]) return client
+
+  return withOverrides(client, {
+    ...instrumentedMethods(client, metrics),
+    async transaction(...args: any[]): Promise<Transaction> {
+      const transaction = await (client.transaction as any)(...args)
+      return instrumentTransaction(transaction, metrics)
+    }
+  })
+}
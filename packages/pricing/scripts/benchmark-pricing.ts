@@ -0,0 +1,183 @@
+#!/usr/bin/env tsx
+
+/**
+ * Benchmark du moteur de tarification
+ * - Devis de 10k lignes : ancien calcul objet par objet (chaîne de if) vs evaluateBatch() vs priceLine() mémoïsé
+ * - Bundle : recalcul complet à chaque changement de quantité vs mise à jour incrémentale
+ * Les résultats de l'ancien calcul servent aussi de référence : les totaux doivent être identiques.
+ *
+ * Usage: pnpm --filter @ns2po/pricing bench [lignes]
+ */
+
+import assert from 'node:assert/strict'
+import {
+  QuoteBatch,
+  applyBundleLineChange,
+  computeBundleTotals,
+  createPricingEngine,
+  type BundleLineInput
+} from '../src/index'
+
+const LINE_COUNT = Number(process.argv[2]) || 10_000
+const ITERATIONS = 50
+const BUNDLE_SIZE = 200
+const BUNDLE_EDITS = 10_000
+
+const PRICES = [500, 1200, 2500, 3500, 5000, 7500, 12000]
+const QUANTITIES = [1, 5, 9, 10, 50, 99, 100, 250, 499, 500, 750, 999, 1000, 2500]
+
+interface Line {
+  productId: string
+  basePrice: number
+  quantity: number
+  customizations: { optionId: string; choiceId: string; priceModifier: number }[]
+}
+
+const pick = <T>(list: T[], i: number) => list[i % list.length]
+
+function generateLines(count: number): Line[] {
+  return Array.from({ length: count }, (_, i) => ({
+    productId: `prod-${i % 300}`,
+    basePrice: pick(PRICES, i * 7),
+    quantity: pick(QUANTITIES, i * 13),
+    customizations: i % 3 === 0
+      ? [{ optionId: 'logo', choiceId: `logo-${i % 4}`, priceModifier: 250 * (i % 4) }]
+      : []
+  }))
+}
+
+/**
+ * Ancienne logique de useQuoteCalculator (calculateItem + applyQuantityRules)
+ */
+function legacyQuote(lines: Line[]) {
+  const round = (amount: number) => Math.round(amount)
+  let subtotal = 0
+
+  const items = lines.map((line) => {
+    const rules: { ruleId: string; modifier: number; reason: string }[] = []
+    if (line.quantity >= 1000) {
+      rules.push({ ruleId: 'bulk-1000', modifier: -line.basePrice * 0.25, reason: `Remise 25% pour commande de ${line.quantity} unités` })
+    } else if (line.quantity >= 500) {
+      rules.push({ ruleId: 'bulk-500', modifier: -line.basePrice * 0.2, reason: `Remise 20% pour commande de ${line.quantity} unités` })
+    } else if (line.quantity >= 100) {
+      rules.push({ ruleId: 'bulk-100', modifier: -line.basePrice * 0.15, reason: `Remise 15% pour commande de ${line.quantity} unités` })
+    }
+    if (line.quantity < 10) {
+      rules.push({ ruleId: 'small-quantity', modifier: line.basePrice * 0.2, reason: 'Surcoût 20% pour commande inférieure à 10 unités' })
+    }
+
+    const customizationsCost = line.customizations.reduce((sum, c) => sum + c.priceModifier, 0)
+    const ruleModifier = rules.reduce((sum, rule) => sum + rule.modifier, 0)
+    const unitPrice = line.basePrice + customizationsCost + ruleModifier
+    const totalPrice = round(unitPrice * line.quantity)
+    subtotal += totalPrice
+
+    return { unitPrice: round(unitPrice), totalPrice, appliedRules: rules }
+  })
+
+  return { items, subtotal }
+}
+
+function time(label: string, run: () => void): number {
+  run() // échauffement
+  const start = performance.now()
+  for (let i = 0; i < ITERATIONS; i++) run()
+  const perRun = (performance.now() - start) / ITERATIONS
+  console.log(`   ${label.padEnd(34)} ${perRun.toFixed(3)} ms/devis`)
+  return perRun
+}
+
+function benchmarkQuote() {
+  console.log(`\n🧾 Devis de ${LINE_COUNT} lignes (${ITERATIONS} itérations)`)
+  const lines = generateLines(LINE_COUNT)
+  const engine = createPricingEngine()
+  const batch = new QuoteBatch(LINE_COUNT)
+
+  const fillBatch = () => {
+    batch.reset()
+    for (const line of lines) {
+      let cost = 0
+      for (const c of line.customizations) cost += c.priceModifier
+      batch.push(line.basePrice, line.quantity, cost)
+    }
+  }
+
+  // Équivalence avec l'ancien calcul
+  const legacy = legacyQuote(lines)
+  fillBatch()
+  const { subtotal, totalQuantity } = engine.evaluateBatch(batch)
+  assert.equal(subtotal, legacy.subtotal)
+  for (let i = 0; i < lines.length; i++) {
+    const pricing = engine.priceLine(lines[i])
+    assert.equal(batch.totalPrice[i], legacy.items[i].totalPrice)
+    assert.equal(pricing.unitPrice, legacy.items[i].unitPrice)
+    assert.equal(engine.lineTotal(pricing, lines[i].quantity), legacy.items[i].totalPrice)
+    assert.deepEqual(pricing.appliedRules.map(r => r.modifier), legacy.items[i].appliedRules.map(r => r.modifier))
+  }
+  const totals = engine.quoteTotals(subtotal, totalQuantity, 'party')
+  console.log(`   Sous-total ${totals.subtotal} FCFA, remises ${totals.discountAmount}, TTC ${totals.totalAmount} (identique à l'ancien calcul)`)
+
+  const legacyTime = time('Ancien calcul (objets + if-chain)', () => legacyQuote(lines))
+  const batchTime = time('evaluateBatch (tableaux typés)', () => {
+    fillBatch()
+    engine.evaluateBatch(batch)
+  })
+  engine.clearCache()
+  const memoTime = time('priceLine mémoïsé', () => {
+    for (const line of lines) engine.lineTotal(engine.priceLine(line), line.quantity)
+  })
+
+  // Le mémo ne vise pas le débit brut (une ligne coûte quelques opérations) mais la stabilité :
+  // au rendu, chaque ligne inchangée renvoie le même objet, sans allocation
+  const stats = engine.getCacheStats()
+  const sample = lines[0]
+  assert.equal(engine.priceLine(sample), engine.priceLine({ ...sample, quantity: sample.quantity }))
+  console.log(`   Gain batch ×${(legacyTime / batchTime).toFixed(1)}, mémo ×${(legacyTime / memoTime).toFixed(1)} sans allocation (cache: ${stats.size} entrées, ${stats.hits} hits / ${stats.misses} misses)`)
+}
+
+function benchmarkBundle() {
+  console.log(`\n📦 Bundle de ${BUNDLE_SIZE} produits, ${BUNDLE_EDITS} changements de quantité`)
+  const initial: BundleLineInput[] = Array.from({ length: BUNDLE_SIZE }, (_, i) => {
+    const basePrice = pick(PRICES, i)
+    const quantity = pick(QUANTITIES, i * 3)
+    return { basePrice, quantity, subtotal: basePrice * quantity }
+  })
+
+  // Ancienne logique de useBundleCalculations : copie du tableau puis trois reduce
+  let products = initial
+  let start = performance.now()
+  let legacyTotals = { originalTotal: 0, estimatedTotal: 0, savings: 0 }
+  for (let edit = 0; edit < BUNDLE_EDITS; edit++) {
+    const target = edit % BUNDLE_SIZE
+    const quantity = pick(QUANTITIES, edit)
+    products = products.map((p, i) => i === target ? { ...p, quantity, subtotal: p.basePrice * quantity } : p)
+    const originalTotal = products.reduce((sum, p) => sum + p.basePrice * p.quantity, 0)
+    const estimatedTotal = products.reduce((sum, p) => sum + (p.subtotal ?? 0), 0)
+    legacyTotals = { originalTotal, estimatedTotal, savings: originalTotal - estimatedTotal }
+  }
+  const legacyTime = performance.now() - start
+
+  const lines = [...initial]
+  let totals = computeBundleTotals(lines)
+  start = performance.now()
+  for (let edit = 0; edit < BUNDLE_EDITS; edit++) {
+    const target = edit % BUNDLE_SIZE
+    const quantity = pick(QUANTITIES, edit)
+    const previous = lines[target]
+    const next = { basePrice: previous.basePrice, quantity, subtotal: previous.basePrice * quantity }
+    totals = applyBundleLineChange(totals, previous, next)
+    lines[target] = next
+  }
+  const incrementalTime = performance.now() - start
+
+  assert.equal(totals.originalTotal, legacyTotals.originalTotal)
+  assert.equal(totals.estimatedTotal, legacyTotals.estimatedTotal)
+  assert.deepEqual(totals, computeBundleTotals(lines))
+
+  console.log(`   Recalcul complet:       ${(legacyTime * 1000 / BUNDLE_EDITS).toFixed(2)} µs/changement`)
+  console.log(`   Mise à jour incrémentale: ${(incrementalTime * 1000 / BUNDLE_EDITS).toFixed(2)} µs/changement (×${(legacyTime / incrementalTime).toFixed(1)})`)
+}
+
+benchmarkQuote()
+benchmarkBundle()
+console.log('\n✅ Benchmark terminé, résultats identiques à l\'ancien calcul')
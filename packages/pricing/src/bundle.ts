@@ -0,0 +1,96 @@
+/**
+ * Totaux de bundle
+ * Une seule passe sur les lignes (au lieu d'un reduce par total) et mise à jour incrémentale
+ * quand une seule ligne change : l'édition d'une quantité ne recalcule pas tout le bundle.
+ */
+
+export interface BundleLineInput {
+  basePrice: number
+  quantity: number
+  /** Prix de la ligne dans le bundle (basePrice × quantity si absent) */
+  subtotal?: number
+}
+
+export interface BundleTotals {
+  /** Somme des prix catalogue (basePrice × quantity) */
+  originalTotal: number
+  /** Somme des sous-totaux de lignes */
+  estimatedTotal: number
+  savings: number
+  discountPercentage: number
+  totalProducts: number
+  totalQuantity: number
+}
+
+export const EMPTY_BUNDLE_TOTALS: Readonly<BundleTotals> = Object.freeze({
+  originalTotal: 0,
+  estimatedTotal: 0,
+  savings: 0,
+  discountPercentage: 0,
+  totalProducts: 0,
+  totalQuantity: 0
+})
+
+export function bundleLineSubtotal(basePrice: number, quantity: number): number {
+  return basePrice * quantity
+}
+
+export function bundleDiscountPercentage(originalTotal: number, estimatedTotal: number): number {
+  return originalTotal > 0 ? ((originalTotal - estimatedTotal) / originalTotal) * 100 : 0
+}
+
+function finalize(originalTotal: number, estimatedTotal: number, totalProducts: number, totalQuantity: number): BundleTotals {
+  return {
+    originalTotal,
+    estimatedTotal,
+    savings: originalTotal - estimatedTotal,
+    discountPercentage: bundleDiscountPercentage(originalTotal, estimatedTotal),
+    totalProducts,
+    totalQuantity
+  }
+}
+
+export function computeBundleTotals(products: readonly BundleLineInput[]): BundleTotals {
+  let originalTotal = 0
+  let estimatedTotal = 0
+  let totalQuantity = 0
+
+  for (let i = 0; i < products.length; i++) {
+    const product = products[i]
+    const catalogPrice = bundleLineSubtotal(product.basePrice, product.quantity)
+    originalTotal += catalogPrice
+    estimatedTotal += product.subtotal ?? catalogPrice
+    totalQuantity += product.quantity
+  }
+
+  return finalize(originalTotal, estimatedTotal, products.length, totalQuantity)
+}
+
+/**
+ * Totaux après ajout (previous = null), retrait (next = null) ou modification d'une ligne
+ */
+export function applyBundleLineChange(
+  totals: BundleTotals,
+  previous: BundleLineInput | null,
+  next: BundleLineInput | null
+): BundleTotals {
+  let { originalTotal, estimatedTotal, totalProducts, totalQuantity } = totals
+
+  if (previous) {
+    const catalogPrice = bundleLineSubtotal(previous.basePrice, previous.quantity)
+    originalTotal -= catalogPrice
+    estimatedTotal -= previous.subtotal ?? catalogPrice
+    totalQuantity -= previous.quantity
+    totalProducts--
+  }
+
+  if (next) {
+    const catalogPrice = bundleLineSubtotal(next.basePrice, next.quantity)
+    originalTotal += catalogPrice
+    estimatedTotal += next.subtotal ?? catalogPrice
+    totalQuantity += next.quantity
+    totalProducts++
+  }
+
+  return finalize(originalTotal, estimatedTotal, totalProducts, totalQuantity)
+}
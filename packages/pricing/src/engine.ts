@@ -0,0 +1,326 @@
+/**
+ * Moteur de tarification NS2PO
+ * Sans dépendance framework : utilisé par les composables (devis, bundles) et par les routes serveur.
+ *
+ * - priceLine() : prix unitaire d'une ligne, mémoïsé par (produit, tranche de quantité, personnalisations)
+ * - evaluateBatch() : évaluation d'un devis entier sur des tableaux typés (aucune allocation par ligne)
+ * - appliedRules() : détail des règles d'une tranche, mémoïsé par (tranche, prix de base)
+ * - quoteTotals() : remises globales, TVA et total à partir du sous-total
+ */
+
+import type { AppliedDiscount, AppliedRule } from '@ns2po/types'
+import {
+  DEFAULT_PRICING_CONFIG,
+  compileQuantityRules,
+  compileVolumeDiscounts,
+  findTier,
+  type PricingConfig
+} from './rules'
+
+const MEMO_MAX_ENTRIES = 5000
+
+export interface PricedCustomization {
+  optionId?: string
+  choiceId?: string
+  priceModifier?: number
+}
+
+export interface PriceLineInput {
+  /** Identifiant produit (clé de mémoïsation) */
+  productId?: string
+  basePrice: number
+  quantity: number
+  customizations?: readonly PricedCustomization[]
+}
+
+export interface UnitPricing {
+  tier: number
+  customizationsCost: number
+  /** Prix unitaire non arrondi : le total de ligne est arrondi après multiplication */
+  rawUnitPrice: number
+  unitPrice: number
+  appliedRules: readonly AppliedRule[]
+}
+
+export interface QuoteTotals {
+  subtotal: number
+  totalQuantity: number
+  discounts: AppliedDiscount[]
+  discountAmount: number
+  taxAmount: number
+  totalAmount: number
+}
+
+/**
+ * Lignes d'un devis en colonnes (structure of arrays)
+ * Réutilisable d'un calcul à l'autre : reset() puis push() ne réalloue qu'en cas de croissance.
+ */
+export class QuoteBatch {
+  length = 0
+  basePrice: Float64Array
+  quantity: Float64Array
+  customizationsCost: Float64Array
+  // Résultats de evaluateBatch() : prix unitaire non arrondi, total de ligne arrondi
+  tier: Int32Array
+  unitPrice: Float64Array
+  totalPrice: Float64Array
+
+  constructor(capacity = 64) {
+    this.basePrice = new Float64Array(capacity)
+    this.quantity = new Float64Array(capacity)
+    this.customizationsCost = new Float64Array(capacity)
+    this.tier = new Int32Array(capacity)
+    this.unitPrice = new Float64Array(capacity)
+    this.totalPrice = new Float64Array(capacity)
+  }
+
+  push(basePrice: number, quantity: number, customizationsCost = 0): number {
+    if (this.length === this.basePrice.length) {
+      this.grow(this.length * 2 || 64)
+    }
+
+    const index = this.length++
+    this.basePrice[index] = basePrice
+    this.quantity[index] = quantity
+    this.customizationsCost[index] = customizationsCost
+    return index
+  }
+
+  reset(): void {
+    this.length = 0
+  }
+
+  private grow(capacity: number): void {
+    const resize = <T extends Float64Array | Int32Array>(source: T): T => {
+      const target = new (source.constructor as new (size: number) => T)(capacity)
+      target.set(source)
+      return target
+    }
+
+    this.basePrice = resize(this.basePrice)
+    this.quantity = resize(this.quantity)
+    this.customizationsCost = resize(this.customizationsCost)
+    this.tier = resize(this.tier)
+    this.unitPrice = resize(this.unitPrice)
+    this.totalPrice = resize(this.totalPrice)
+  }
+}
+
+/**
+ * Clé stable d'un ensemble de personnalisations (indépendante de l'ordre de sélection)
+ */
+export function customizationSetKey(customizations: readonly PricedCustomization[] = []): string {
+  if (customizations.length === 0) return ''
+  if (customizations.length === 1) {
+    const c = customizations[0]
+    return `${c?.optionId ?? ''}:${c?.choiceId ?? ''}:${c?.priceModifier ?? 0}`
+  }
+
+  return customizations
+    .map(c => `${c?.optionId ?? ''}:${c?.choiceId ?? ''}:${c?.priceModifier ?? 0}`)
+    .sort()
+    .join(',')
+}
+
+export function createPricingEngine(overrides: Partial<PricingConfig> = {}) {
+  const config: PricingConfig = { ...DEFAULT_PRICING_CONFIG, ...overrides }
+  const quantityTable = compileQuantityRules(config.quantityRules)
+  const volumeTable = compileVolumeDiscounts(config.volumeDiscounts)
+  const customerDiscounts = new Map(
+    config.customerTypeDiscounts.map(discount => [discount.customerType, discount.discountPercentage])
+  )
+  const roundingFactor = Math.pow(10, config.roundingPrecision)
+
+  // produit → prix de base → tranche → personnalisations : pas de clé composite à construire et hacher
+  const memo = new Map<string, Map<number, Map<string, UnitPricing>[]>>()
+  let memoSize = 0
+  const rulesMemo = new Map<string, readonly AppliedRule[]>()
+  const memoStats = { hits: 0, misses: 0 }
+
+  const round = (amount: number): number => Math.round(amount * roundingFactor) / roundingFactor
+
+  /**
+   * Règles appliquées d'une tranche ; le modificateur ne dépend que du prix de base
+   */
+  const appliedRules = (tier: number, basePrice: number): readonly AppliedRule[] => {
+    const key = `${tier}|${basePrice}`
+    const cached = rulesMemo.get(key)
+    if (cached) return cached
+
+    const rules = Object.freeze(quantityTable.rules[tier].map((index) => {
+      const rule = config.quantityRules[index]
+      return Object.freeze({
+        ruleId: rule.id,
+        ruleName: rule.name,
+        modifier: basePrice * (rule.percentage / 100),
+        reason: rule.reason
+      })
+    }))
+
+    if (rulesMemo.size >= MEMO_MAX_ENTRIES) rulesMemo.clear()
+    rulesMemo.set(key, rules)
+    return rules
+  }
+
+  /**
+   * Prix unitaire d'une ligne, mémoïsé par (produit, tranche de quantité, personnalisations)
+   * Le résultat est partagé entre appels : ne pas le modifier.
+   */
+  const priceLine = (line: PriceLineInput): UnitPricing => {
+    // Borne simple : au-delà du plafond on repart d'un cache vide
+    if (memoSize >= MEMO_MAX_ENTRIES) {
+      memo.clear()
+      memoSize = 0
+    }
+
+    const tier = findTier(quantityTable, line.quantity)
+    const productId = line.productId ?? ''
+    let byPrice = memo.get(productId)
+    if (!byPrice) {
+      byPrice = new Map()
+      memo.set(productId, byPrice)
+    }
+    // Le prix de base fait partie de la clé : une modification du produit invalide l'entrée
+    let byTier = byPrice.get(line.basePrice)
+    if (!byTier) {
+      byTier = []
+      byPrice.set(line.basePrice, byTier)
+    }
+    let byCustomizations = byTier[tier]
+    if (!byCustomizations) {
+      byCustomizations = new Map()
+      byTier[tier] = byCustomizations
+    }
+
+    const setKey = customizationSetKey(line.customizations)
+    const cached = byCustomizations.get(setKey)
+    if (cached) {
+      memoStats.hits++
+      return cached
+    }
+    memoStats.misses++
+
+    let customizationsCost = 0
+    for (const customization of line.customizations || []) {
+      customizationsCost += customization?.priceModifier || 0
+    }
+
+    const rawUnitPrice = line.basePrice + customizationsCost + line.basePrice * quantityTable.factors[tier]
+    const pricing: UnitPricing = Object.freeze({
+      tier,
+      customizationsCost: round(customizationsCost),
+      rawUnitPrice,
+      unitPrice: round(rawUnitPrice),
+      appliedRules: appliedRules(tier, line.basePrice)
+    })
+
+    byCustomizations.set(setKey, pricing)
+    memoSize++
+    return pricing
+  }
+
+  const lineTotal = (pricing: UnitPricing, quantity: number): number => round(pricing.rawUnitPrice * quantity)
+
+  /**
+   * Évalue toutes les lignes d'un devis : tranche, prix unitaire et total arrondi par ligne
+   */
+  const evaluateBatch = (batch: QuoteBatch): { subtotal: number; totalQuantity: number } => {
+    const { basePrice, quantity, customizationsCost, tier, unitPrice, totalPrice } = batch
+    const factors = quantityTable.factors
+    let subtotal = 0
+    let totalQuantity = 0
+
+    for (let i = 0; i < batch.length; i++) {
+      const q = quantity[i]
+      const t = findTier(quantityTable, q)
+      const unit = basePrice[i] + customizationsCost[i] + basePrice[i] * factors[t]
+      const total = Math.round(unit * q * roundingFactor) / roundingFactor
+
+      tier[i] = t
+      unitPrice[i] = unit
+      totalPrice[i] = total
+      subtotal += total
+      totalQuantity += q
+    }
+
+    return { subtotal, totalQuantity }
+  }
+
+  /**
+   * Remises globales (volume, type de client), TVA et total
+   */
+  const quoteTotals = (subtotal: number, totalQuantity: number, customerType?: string): QuoteTotals => {
+    const discounts: AppliedDiscount[] = []
+
+    const volumeTier = findTier(volumeTable, totalQuantity)
+    const volumeRule = volumeTable.bestRule[volumeTier]
+    if (volumeRule !== -1) {
+      const volumeDiscount = config.volumeDiscounts[volumeRule]
+      discounts.push({
+        id: `volume-${volumeDiscount.minQuantity}`,
+        name: `Remise volume ${volumeDiscount.minQuantity}+`,
+        type: 'percentage',
+        value: volumeDiscount.discountPercentage,
+        amount: round(subtotal * (volumeDiscount.discountPercentage / 100)),
+        reason: `${volumeDiscount.discountPercentage}% de remise pour ${totalQuantity} articles`
+      })
+    }
+
+    const customerPercentage = customerType ? customerDiscounts.get(customerType) : undefined
+    if (customerPercentage !== undefined) {
+      discounts.push({
+        id: `customer-${customerType}`,
+        name: `Remise ${customerType}`,
+        type: 'percentage',
+        value: customerPercentage,
+        amount: round(subtotal * (customerPercentage / 100)),
+        reason: `Remise spéciale client ${customerType}`
+      })
+    }
+
+    let discountAmount = 0
+    for (const discount of discounts) discountAmount += discount.amount
+
+    const taxableAmount = subtotal - discountAmount
+    const taxAmount = taxableAmount * config.taxRate
+
+    return {
+      subtotal: round(subtotal),
+      totalQuantity,
+      discounts,
+      discountAmount: round(discountAmount),
+      taxAmount: round(taxAmount),
+      totalAmount: round(taxableAmount + taxAmount)
+    }
+  }
+
+  return {
+    config: config as Readonly<PricingConfig>,
+    round,
+    priceLine,
+    lineTotal,
+    appliedRules,
+    evaluateBatch,
+    quoteTotals,
+    getCacheStats: () => ({ ...memoStats, size: memoSize }),
+    clearCache: () => {
+      memo.clear()
+      memoSize = 0
+      rulesMemo.clear()
+    }
+  }
+}
+
+export type PricingEngine = ReturnType<typeof createPricingEngine>
+
+let defaultEngine: PricingEngine | null = null
+
+/**
+ * Moteur partagé avec la configuration par défaut (mémoïsation commune à toute l'application)
+ */
+export function getPricingEngine(): PricingEngine {
+  if (!defaultEngine) {
+    defaultEngine = createPricingEngine()
+  }
+  return defaultEngine
+}
@@ -0,0 +1,8 @@
+/**
+ * Package de tarification NS2PO
+ * Moteur pur (sans Vue ni Nitro) partagé par le calculateur de devis, les bundles et la validation serveur
+ */
+
+export * from './rules'
+export * from './engine'
+export * from './bundle'
@@ -0,0 +1,144 @@
+/**
+ * Règles de tarification NS2PO sous forme de données
+ * Les tranches de quantité sont précompilées en table (seuils triés + valeur par tranche) :
+ * trouver la tranche d'une quantité est une recherche dichotomique, sans chaîne de if ni allocation.
+ */
+
+import type { CustomerTypeDiscount, VolumeDiscount } from '@ns2po/types'
+
+export interface QuantityPriceRule {
+  id: string
+  name: string
+  minQuantity: number
+  /** Borne haute incluse (illimitée si absente) */
+  maxQuantity?: number
+  /** Variation du prix unitaire de base en % (négatif = remise) */
+  percentage: number
+  reason: string
+}
+
+export interface PricingConfig {
+  taxRate: number
+  roundingPrecision: number
+  /** Remises/majorations par ligne, cumulables, selon la quantité de la ligne */
+  quantityRules: QuantityPriceRule[]
+  /** Remise globale selon la quantité totale du devis (la meilleure tranche s'applique) */
+  volumeDiscounts: VolumeDiscount[]
+  customerTypeDiscounts: CustomerTypeDiscount[]
+}
+
+export const DEFAULT_QUANTITY_RULES: QuantityPriceRule[] = [
+  { id: 'bulk-1000', name: 'Remise volume 1000+', minQuantity: 1000, percentage: -25, reason: 'Remise 25% à partir de 1000 unités' },
+  { id: 'bulk-500', name: 'Remise volume 500+', minQuantity: 500, maxQuantity: 999, percentage: -20, reason: 'Remise 20% de 500 à 999 unités' },
+  { id: 'bulk-100', name: 'Remise volume 100+', minQuantity: 100, maxQuantity: 499, percentage: -15, reason: 'Remise 15% de 100 à 499 unités' },
+  { id: 'small-quantity', name: 'Surcoût petite quantité', minQuantity: 0, maxQuantity: 9, percentage: 20, reason: 'Surcoût 20% pour commande inférieure à 10 unités' }
+]
+
+export const DEFAULT_VOLUME_DISCOUNTS: VolumeDiscount[] = [
+  { minQuantity: 50, maxQuantity: 99, discountPercentage: 5 },
+  { minQuantity: 100, maxQuantity: 249, discountPercentage: 10 },
+  { minQuantity: 250, maxQuantity: 499, discountPercentage: 15 },
+  { minQuantity: 500, discountPercentage: 20 }
+]
+
+export const DEFAULT_CUSTOMER_TYPE_DISCOUNTS: CustomerTypeDiscount[] = [
+  { customerType: 'party', discountPercentage: 12 },
+  { customerType: 'organization', discountPercentage: 8 }
+]
+
+export const DEFAULT_PRICING_CONFIG: PricingConfig = {
+  taxRate: 0.18, // TVA Côte d'Ivoire 18%
+  roundingPrecision: 0, // Pas de décimales pour le FCFA
+  quantityRules: DEFAULT_QUANTITY_RULES,
+  volumeDiscounts: DEFAULT_VOLUME_DISCOUNTS,
+  customerTypeDiscounts: DEFAULT_CUSTOMER_TYPE_DISCOUNTS
+}
+
+interface QuantityRange {
+  minQuantity: number
+  maxQuantity?: number
+  percentage: number
+}
+
+export interface TierTable {
+  /** Borne basse de chaque tranche, triée : la tranche i couvre [thresholds[i], thresholds[i + 1]) */
+  thresholds: Float64Array
+  /** Somme des pourcentages applicables dans la tranche, en fraction (-0.25 = -25%) */
+  factors: Float64Array
+  /** Plus forte remise de la tranche, en % (règles exclusives) */
+  best: Float64Array
+  /** Index de la règle retenue pour `best` (-1 si aucune) */
+  bestRule: Int32Array
+  /** Index des règles applicables dans la tranche, dans l'ordre de la table source */
+  rules: readonly (readonly number[])[]
+}
+
+/**
+ * Précompile des règles par plage de quantité en table de tranches
+ * Chaque borne (min, max + 1) ouvre une tranche ; toutes les quantités d'une tranche
+ * ont exactement les mêmes règles applicables.
+ */
+export function compileTierTable(ranges: readonly QuantityRange[]): TierTable {
+  const bounds = new Set<number>([0])
+  for (const range of ranges) {
+    bounds.add(range.minQuantity)
+    if (range.maxQuantity !== undefined) bounds.add(range.maxQuantity + 1)
+  }
+
+  const thresholds = Float64Array.from([...bounds].sort((a, b) => a - b))
+  const factors = new Float64Array(thresholds.length)
+  const best = new Float64Array(thresholds.length)
+  const bestRule = new Int32Array(thresholds.length).fill(-1)
+  const rules: number[][] = []
+
+  thresholds.forEach((lower, tier) => {
+    const applicable: number[] = []
+    ranges.forEach((range, index) => {
+      if (lower < range.minQuantity) return
+      if (range.maxQuantity !== undefined && lower > range.maxQuantity) return
+
+      applicable.push(index)
+      factors[tier] += range.percentage / 100
+      // Égalité : la première règle de la table l'emporte
+      if (bestRule[tier] === -1 || range.percentage > best[tier]) {
+        best[tier] = range.percentage
+        bestRule[tier] = index
+      }
+    })
+    rules.push(applicable)
+  })
+
+  return { thresholds, factors, best, bestRule, rules }
+}
+
+/**
+ * Tranche d'une quantité (les quantités négatives tombent dans la première tranche)
+ */
+export function findTier(table: TierTable, quantity: number): number {
+  const thresholds = table.thresholds
+  let low = 0
+  let high = thresholds.length - 1
+
+  while (low < high) {
+    const mid = (low + high + 1) >> 1
+    if (thresholds[mid] <= quantity) {
+      low = mid
+    } else {
+      high = mid - 1
+    }
+  }
+
+  return low
+}
+
+export function compileQuantityRules(rules: readonly QuantityPriceRule[]): TierTable {
+  return compileTierTable(rules)
+}
+
+export function compileVolumeDiscounts(discounts: readonly VolumeDiscount[]): TierTable {
+  return compileTierTable(discounts.map(discount => ({
+    minQuantity: discount.minQuantity,
+    maxQuantity: discount.maxQuantity,
+    percentage: discount.discountPercentage
+  })))
+}